@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel, Field
-from typing import Literal, List, Optional
+from typing import AsyncIterator, Literal, List, Optional
 import structlog
 import os
 from openai import AsyncOpenAI
 
 from ..core.database import get_db
+from ..core.metrics import track_openai
+from ..core.rate_limit import ai_limiter
+from ..core.request_timing import timed
 from ..auth.dependencies import get_current_user
 from ..models.user import User
 from ..models.property import Property
+from ..services.llm_cache import llm_cache
 import json
 
 router = APIRouter()
@@ -20,6 +25,10 @@ logger = structlog.get_logger(__name__)
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
+CAPTION_MODEL = "gpt-4o-mini"
+CAPTION_TEMPERATURE = 0.7
+CAPTION_MAX_TOKENS = 500
+
 
 class TextOverlayData(BaseModel):
     content: str
@@ -45,7 +54,7 @@ class InstagramCaptionResponse(BaseModel):
     length: str
 
 
-@router.post("/generate-instagram-caption", response_model=InstagramCaptionResponse)
+@router.post("/generate-instagram-caption", response_model=InstagramCaptionResponse, dependencies=[Depends(ai_limiter.per_user)])
 async def generate_instagram_caption(
     request: InstagramCaptionRequest,
     current_user: User = Depends(get_current_user),
@@ -65,24 +74,7 @@ async def generate_instagram_caption(
             detail="OpenAI API is not configured. Please set OPENAI_API_KEY environment variable."
         )
 
-    # Get property information
-    result = await db.execute(
-        select(Property).where(Property.id == request.property_id)
-    )
-    property_obj = result.scalar_one_or_none()
-
-    if not property_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Property not found"
-        )
-
-    # Verify ownership
-    if property_obj.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this property"
-        )
+    property_obj = await _get_owned_property(db, request.property_id, current_user)
 
     logger.info("Generating Instagram caption",
                 property_id=request.property_id,
@@ -92,26 +84,35 @@ async def generate_instagram_caption(
     # Build context from property and video data
     context = _build_caption_context(property_obj, request.video_data, request.language, request.length)
 
+    system_prompt = _get_system_prompt(request.language)
+
+    async def call_openai() -> str:
+        with timed("openai"), track_openai("caption"):
+            response = await openai_client.chat.completions.create(
+                model=CAPTION_MODEL,  # Fast and cost-effective
+                messages=[
+                    {
+                        "role": "system",
+                        "content": system_prompt
+                    },
+                    {
+                        "role": "user",
+                        "content": context
+                    }
+                ],
+                temperature=CAPTION_TEMPERATURE,
+                max_tokens=CAPTION_MAX_TOKENS
+            )
+        return response.choices[0].message.content.strip()
+
     try:
-        # Call OpenAI API
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Fast and cost-effective
-            messages=[
-                {
-                    "role": "system",
-                    "content": _get_system_prompt(request.language)
-                },
-                {
-                    "role": "user",
-                    "content": context
-                }
-            ],
-            temperature=0.7,
-            max_tokens=500
+        # Call OpenAI API (identical property/video context is served from the shared cache)
+        caption = await llm_cache.aget_or_compute(
+            _caption_cache_key(system_prompt, context),
+            call_openai,
+            cacheable=bool
         )
 
-        caption = response.choices[0].message.content.strip()
-
         logger.info("Instagram caption generated successfully",
                     property_id=request.property_id,
                     caption_length=len(caption))
@@ -130,6 +131,139 @@ async def generate_instagram_caption(
         )
 
 
+@router.post("/generate-instagram-caption/stream", dependencies=[Depends(ai_limiter.per_user)])
+async def stream_instagram_caption(
+    request: InstagramCaptionRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream an Instagram caption as Server-Sent Events
+
+    Same input as /generate-instagram-caption, but tokens are forwarded as
+    they are generated. Events:
+    - `delta`: {"text": "..."} partial caption text
+    - `done`: {"caption", "language", "length"} full caption (cached for both endpoints)
+    - `error`: {"detail": "..."}
+    """
+
+    if not openai_client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="OpenAI API is not configured. Please set OPENAI_API_KEY environment variable."
+        )
+
+    property_obj = await _get_owned_property(db, request.property_id, current_user)
+
+    logger.info("Streaming Instagram caption",
+                property_id=request.property_id,
+                language=request.language,
+                length=request.length)
+
+    context = _build_caption_context(property_obj, request.video_data, request.language, request.length)
+    system_prompt = _get_system_prompt(request.language)
+    cache_key = _caption_cache_key(system_prompt, context)
+
+    # Release the DB connection now: the stream can last several seconds
+    await db.close()
+
+    async def stream_openai() -> AsyncIterator[str]:
+        with timed("openai"), track_openai("caption"):
+            stream = await openai_client.chat.completions.create(
+                model=CAPTION_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": context}
+                ],
+                temperature=CAPTION_TEMPERATURE,
+                max_tokens=CAPTION_MAX_TOKENS,
+                stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+
+    async def event_stream():
+        parts: List[str] = []
+        # Cached or in-flight captions (either endpoint) arrive as one delta;
+        # only a fully received caption is cached
+        chunks = llm_cache.astream_or_compute(cache_key, stream_openai)
+        try:
+            async for text in chunks:
+                parts.append(text)
+                yield _sse_event("delta", {"text": text})
+
+        except Exception as e:
+            logger.error("Failed to stream caption", error=str(e))
+            yield _sse_event("error", {"detail": f"Failed to generate caption: {str(e)}"})
+            return
+        finally:
+            # On disconnect, stop the OpenAI stream now rather than at garbage collection
+            await chunks.aclose()
+
+        caption = "".join(parts).strip()
+
+        logger.info("Instagram caption streamed successfully",
+                    property_id=request.property_id,
+                    caption_length=len(caption))
+
+        yield _sse_event("done", {"caption": caption, "language": request.language, "length": request.length})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens flush immediately
+        }
+    )
+
+
+@router.get("/cache-stats")
+async def get_llm_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit/miss statistics of the shared LLM response cache"""
+    return llm_cache.stats()
+
+
+async def _get_owned_property(db: AsyncSession, property_id: int, current_user: User) -> Property:
+    """Load a property and verify it belongs to the current user"""
+    result = await db.execute(
+        select(Property).where(Property.id == property_id)
+    )
+    property_obj = result.scalar_one_or_none()
+
+    if not property_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+
+    # Verify ownership
+    if property_obj.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this property"
+        )
+
+    return property_obj
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _caption_cache_key(system_prompt: str, context: str) -> str:
+    """Cache key for a caption request (shared by the JSON and streaming endpoints)"""
+    return llm_cache.make_key(
+        "instagram_caption", CAPTION_MODEL, CAPTION_TEMPERATURE,
+        system=system_prompt, context=context, max_tokens=CAPTION_MAX_TOKENS
+    )
+
+
 def _build_caption_context(
     property_obj: Property,
     video_data: Optional[VideoDataInput],
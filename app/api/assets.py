@@ -15,7 +15,8 @@ from app.models.asset import Asset
 from app.models.property import Property
 from app.schemas.asset import AssetResponse, AssetList, AssetUpdate
 from app.core.config import settings
-from app.infrastructure.storage.s3_service import S3StorageService
+from app.core.pagination import PageParams, paginate, split_page
+from app.infrastructure.storage.s3_service import get_s3_service
 
 logger = structlog.get_logger(__name__)
 
@@ -80,31 +81,33 @@ async def upload_asset(
         file_extension = Path(file.filename).suffix if file.filename else ('.mp4' if asset_type == 'video' else '.jpg')
         s3_key = f"assets/{current_user.id}/{property_id}/{asset_id}{file_extension}"
         
-        # Upload to S3 using centralized service
-        file_content = await file.read()
-        s3_service = S3StorageService()
+        # Stream the spooled upload to S3 in parts (never the whole file in memory)
+        s3_service = get_s3_service()
 
-        file_url = await s3_service.upload_file(
+        uploaded = await s3_service.upload_stream(
             key=s3_key,
-            content=file_content,
+            read=file.read,
             content_type=file.content_type,
             metadata={
                 'user_id': str(current_user.id),
                 'property_id': str(property_id),
                 'original_filename': file.filename or '',
                 'asset_type': asset_type
-            }
+            },
+            part_size=settings.ASSET_UPLOAD_PART_SIZE_MB * 1024 * 1024,
+            max_concurrency=settings.ASSET_UPLOAD_MAX_CONCURRENCY
         )
+        logger.info(f"📦 Asset streamed: {uploaded['size']} bytes, sha256 {uploaded['sha256']}")
 
         # Clean URL to prevent duplication
-        file_url = validate_and_clean_url(file_url)
+        file_url = validate_and_clean_url(uploaded['url'])
         
         # Create asset record
         asset = Asset(
             id=asset_id,
             title=title or (file.filename.split('.')[0] if file.filename else f"Asset {asset_id}"),
             file_url=file_url,
-            file_size=len(file_content),
+            file_size=uploaded['size'],
             status="uploaded",
             asset_type=asset_type,
             property_id=property_id,
@@ -147,10 +150,11 @@ async def upload_asset(
 async def list_assets(
     property_id: Optional[int] = None,
     asset_type: Optional[str] = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List user's assets, optionally filtered by property and asset type"""
+    """List user's assets (newest first, cursor-paginated), optionally filtered by property and asset type"""
     
     # Build base query
     stmt = select(Asset).where(Asset.user_id == current_user.id)
@@ -182,10 +186,10 @@ async def list_assets(
             stmt = stmt.where(Asset.asset_type == "image")
         # Add more asset type filters as needed
     
-    # Execute query
-    stmt = stmt.order_by(desc(Asset.created_at))
+    # Execute query (keyset page on ix_assets_user_property_created)
+    stmt = paginate(stmt, Asset.created_at, Asset.id, page)
     result = await db.execute(stmt)
-    assets = result.scalars().all()
+    assets, next_cursor = split_page(result.scalars().all(), page, lambda a: (a.created_at, a.id))
     
     return AssetList(
         assets=[AssetResponse(
@@ -203,7 +207,8 @@ async def list_assets(
             created_at=asset.created_at,
             updated_at=asset.updated_at
         ) for asset in assets],
-        total=len(assets)
+        total=len(assets),
+        next_cursor=next_cursor
     )
 
 
@@ -227,7 +232,7 @@ async def delete_asset(
     
     try:
         # Delete from S3 using centralized service
-        s3_service = S3StorageService()
+        s3_service = get_s3_service()
         s3_key = asset.file_url.replace(f"{settings.STORAGE_PUBLIC_BASE}/", "")
 
         await s3_service.delete_file(s3_key)
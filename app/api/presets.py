@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from typing import List
 import structlog
 import json
 
 from ..core.database import get_db
+from ..core.pagination import PageParams, paginate, split_page
 from ..auth.dependencies import get_current_user
 from ..models.user import User
 from ..models.preset import Preset
-from ..schemas.preset import PresetCreate, PresetUpdate, PresetResponse
+from ..schemas.preset import PresetCreate, PresetUpdate, PresetResponse, PresetList
 
 router = APIRouter()
 logger = structlog.get_logger(__name__)
@@ -57,22 +57,24 @@ async def create_preset(
     )
 
 
-@router.get("/", response_model=List[PresetResponse])
+@router.get("/", response_model=PresetList)
 async def list_presets(
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all user's presets"""
+    """List user's presets, newest first (cursor-paginated)"""
 
     result = await db.execute(
-        select(Preset)
-        .where(Preset.user_id == current_user.id)
-        .order_by(Preset.created_at.desc())
+        paginate(
+            select(Preset).where(Preset.user_id == current_user.id),
+            Preset.created_at, Preset.id, page
+        )
     )
-    presets = result.scalars().all()
+    presets, next_cursor = split_page(result.scalars().all(), page, lambda p: (p.created_at, p.id))
 
-    return [
-        PresetResponse(
+    return PresetList(
+        presets=[PresetResponse(
             id=preset.id,
             user_id=preset.user_id,
             name=preset.name,
@@ -82,9 +84,10 @@ async def list_presets(
             is_default=preset.is_default,
             created_at=preset.created_at,
             updated_at=preset.updated_at
-        )
-        for preset in presets
-    ]
+        ) for preset in presets],
+        total=len(presets),
+        next_cursor=next_cursor
+    )
 
 
 @router.get("/{preset_id}", response_model=PresetResponse)
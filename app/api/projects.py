@@ -2,7 +2,9 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import defer
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 from datetime import datetime
@@ -13,10 +15,21 @@ from ..auth.dependencies import get_current_user
 from ..models.user import User
 from ..models.video import Video
 from ..core.database import get_db
+from ..core.pagination import PageParams, paginate, split_page
+from ..services.project_content import (
+    compact_project_data,
+    hydrate_project,
+    hydrate_project_data,
+    load_content_assets,
+)
+from ..services.project_patch import PatchError, compile_patch
 
 router = APIRouter()
 logger = structlog.get_logger(__name__)
 
+# project_data keys the list thumbnail / duration are derived from
+DERIVED_FROM_KEYS = {'templateSlots', 'slotAssignments', 'contentVideos'}
+
 
 # Schemas
 class ProjectSaveRequest(BaseModel):
@@ -36,11 +49,83 @@ class ProjectResponse(BaseModel):
     status: str
     updated_at: str  # Replaced last_saved_at with updated_at
     created_at: str
+    version: int = 1  # Pass to PATCH /projects/{id}
+
+
+class ProjectSummary(BaseModel):
+    """Project row in lists (project_data is only returned by GET /projects/{id})"""
+    id: str
+    project_name: str
+    template_id: Optional[str]
+    property_id: int
+    thumbnail_url: Optional[str] = None
+    duration: Optional[int] = None
+    status: str
+    updated_at: str
+    created_at: str
+
+
+class PatchOperation(BaseModel):
+    """One JSON Patch (RFC 6902) operation: add, remove, replace or test"""
+    op: str
+    path: str  # JSON Pointer into project_data, e.g. /textOverlays/2/content
+    value: Any = None
+
+
+class ProjectPatchRequest(BaseModel):
+    version: int  # Version the client's edits are based on
+    operations: List[PatchOperation]
+
+
+class ProjectPatchResponse(BaseModel):
+    id: str
+    version: int
+    updated_at: str
 
 
 class ProjectListResponse(BaseModel):
-    projects: List[ProjectResponse]
-    total: int
+    projects: List[ProjectSummary]
+    total: int  # Projects in this page
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page
+
+
+def _derive_duration(project_data: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Total duration: end_time of the last templateSlot (None without slots)"""
+    template_slots = (project_data or {}).get('templateSlots') or []
+    if not template_slots:
+        return None
+    last_slot = max(template_slots, key=lambda s: s.get('end_time', 0))
+    total_duration = last_slot.get('end_time', 0)
+    logger.info("📊 Calculated total duration from templateSlots",
+               duration=total_duration,
+               num_slots=len(template_slots))
+    return int(total_duration)  # Store as integer seconds
+
+
+def _derive_thumbnail(project_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Thumbnail of the video assigned to the first SLOT (slot_0), else of the first contentVideo"""
+    if not project_data:
+        return None
+    slot_assignments = project_data.get('slotAssignments', [])  # Array, not dict!
+    content_videos = project_data.get('contentVideos', []) or []
+
+    # slotAssignments is an array: [{slotId: "slot_0", videoId: "abc-123"}, ...]
+    assigned_video_id = None
+    if isinstance(slot_assignments, list):
+        for assignment in slot_assignments:
+            if assignment.get('slotId') == 'slot_0':
+                assigned_video_id = assignment.get('videoId')
+                break
+
+    if assigned_video_id and content_videos:
+        for vid in content_videos:
+            if vid.get('id') == assigned_video_id:
+                return vid.get('thumbnail_url')
+        return None
+    if content_videos:
+        # Fallback: use first contentVideo if no slot assignments
+        return content_videos[0].get('thumbnail_url')
+    return None
 
 
 @router.post("/save", response_model=ProjectResponse)
@@ -62,6 +147,11 @@ async def save_project(
                 user_id=current_user.id,
                 has_project_data=bool(request.project_data))
 
+    # contentVideos are stored as asset references; derive from the hydrated form
+    content_assets = await load_content_assets(db, current_user.id, [request.project_data])
+    project_data = hydrate_project_data(request.project_data, content_assets)
+    stored_project_data = compact_project_data(request.project_data, content_assets)
+
     # Generate project name if not provided
     if not request.project_name:
         request.project_name = f"Project {datetime.now().strftime('%Y-%m-%d %H:%M')}"
@@ -88,52 +178,17 @@ async def save_project(
         # Update project
         video.project_name = request.project_name
         video.template_id = request.template_id
-        video.project_data = request.project_data
+        video.project_data = stored_project_data
         video.updated_at = datetime.utcnow()
 
-        # Calculate and update total duration from templateSlots (end_time of last slot)
-        if request.project_data and 'templateSlots' in request.project_data:
-            template_slots = request.project_data.get('templateSlots', [])
-            if template_slots:
-                # Get the last slot by order or by end_time
-                last_slot = max(template_slots, key=lambda s: s.get('end_time', 0))
-                total_duration = last_slot.get('end_time', 0)
-                video.duration = int(total_duration)  # Store as integer seconds
-                logger.info("📊 Calculated total duration from templateSlots",
-                           duration=total_duration,
-                           num_slots=len(template_slots))
-
-        # Auto-set thumbnail from first SLOT (slot_0), not first contentVideo
-        if request.project_data:
-            slot_assignments = request.project_data.get('slotAssignments', [])  # Array, not dict!
-            content_videos = request.project_data.get('contentVideos', [])
-
-            # Find which video is assigned to slot_0 (first slot in timeline)
-            # slotAssignments is an array: [{slotId: "slot_0", videoId: "abc-123"}, ...]
-            assigned_video_id = None
-            if isinstance(slot_assignments, list):
-                for assignment in slot_assignments:
-                    if assignment.get('slotId') == 'slot_0':
-                        assigned_video_id = assignment.get('videoId')
-                        break
-
-            if assigned_video_id and content_videos:
-                # Find the corresponding video in contentVideos
-                for vid in content_videos:
-                    if vid.get('id') == assigned_video_id:
-                        if 'thumbnail_url' in vid:
-                            video.thumbnail_url = vid['thumbnail_url']
-                            logger.info("🖼️ Thumbnail URL updated from slot_0 video",
-                                      video_id=assigned_video_id,
-                                      thumbnail_url=video.thumbnail_url)
-                        break
-            elif content_videos and len(content_videos) > 0:
-                # Fallback: use first contentVideo if no slot assignments
-                first_video = content_videos[0]
-                if 'thumbnail_url' in first_video:
-                    video.thumbnail_url = first_video['thumbnail_url']
-                    logger.info("🖼️ Thumbnail URL updated from first contentVideo (fallback)",
-                              thumbnail_url=video.thumbnail_url)
+        # Derived list columns (duration from templateSlots, thumbnail from slot_0)
+        total_duration = _derive_duration(project_data)
+        if total_duration is not None:
+            video.duration = total_duration
+        thumbnail_url = _derive_thumbnail(project_data)
+        if thumbnail_url:
+            video.thumbnail_url = thumbnail_url
+        video.version = Video.version + 1
 
         logger.info("✏️ Project fields updated", project_id=video.id)
 
@@ -142,50 +197,8 @@ async def save_project(
         video_id = str(uuid.uuid4())
         logger.info("🆕 Creating new project", video_id=video_id)
 
-        # Auto-set thumbnail from first SLOT (slot_0), not first contentVideo
-        thumbnail_url = None
-        if request.project_data:
-            slot_assignments = request.project_data.get('slotAssignments', [])  # Array, not dict!
-            content_videos = request.project_data.get('contentVideos', [])
-
-            # Find which video is assigned to slot_0 (first slot in timeline)
-            # slotAssignments is an array: [{slotId: "slot_0", videoId: "abc-123"}, ...]
-            assigned_video_id = None
-            if isinstance(slot_assignments, list):
-                for assignment in slot_assignments:
-                    if assignment.get('slotId') == 'slot_0':
-                        assigned_video_id = assignment.get('videoId')
-                        break
-
-            if assigned_video_id and content_videos:
-                # Find the corresponding video in contentVideos
-                for vid in content_videos:
-                    if vid.get('id') == assigned_video_id:
-                        if 'thumbnail_url' in vid:
-                            thumbnail_url = vid['thumbnail_url']
-                            logger.info("🖼️ Setting thumbnail from slot_0 video",
-                                      video_id=assigned_video_id,
-                                      thumbnail_url=thumbnail_url)
-                        break
-            elif content_videos and len(content_videos) > 0:
-                # Fallback: use first contentVideo if no slot assignments
-                first_video = content_videos[0]
-                if 'thumbnail_url' in first_video:
-                    thumbnail_url = first_video['thumbnail_url']
-                    logger.info("🖼️ Setting thumbnail from first contentVideo (fallback)",
-                              thumbnail_url=thumbnail_url)
-
-        # Calculate total duration from templateSlots (end_time of last slot)
-        total_duration = 0
-        if request.project_data and 'templateSlots' in request.project_data:
-            template_slots = request.project_data.get('templateSlots', [])
-            if template_slots:
-                # Get the last slot by order or by end_time
-                last_slot = max(template_slots, key=lambda s: s.get('end_time', 0))
-                total_duration = last_slot.get('end_time', 0)
-                logger.info("📊 Calculated total duration from templateSlots",
-                           duration=total_duration,
-                           num_slots=len(template_slots))
+        thumbnail_url = _derive_thumbnail(project_data)
+        total_duration = _derive_duration(project_data) or 0
 
         video = Video(
             id=video_id,
@@ -195,7 +208,7 @@ async def save_project(
             user_id=current_user.id,
             property_id=int(request.property_id),
             template_id=request.template_id,
-            project_data=request.project_data,
+            project_data=stored_project_data,
             thumbnail_url=thumbnail_url,
             source_type="viral_template_composer",
             status="draft",  # New status for composition projects
@@ -221,10 +234,11 @@ async def save_project(
         project_name=video.project_name or video.title,
         template_id=str(video.template_id) if video.template_id else None,
         property_id=video.property_id,
-        project_data=video.project_data or {},
+        project_data=project_data or {},
         status=video.status,
         updated_at=video.updated_at.isoformat(),
-        created_at=video.created_at.isoformat()
+        created_at=video.created_at.isoformat(),
+        version=video.version or 1
     )
 
     logger.info("✨ Project save completed successfully",
@@ -257,42 +271,54 @@ async def get_project(
             detail="Project not found"
         )
 
+    project_data = await hydrate_project(db, current_user.id, video.project_data)
+
     return ProjectResponse(
         id=video.id,
         project_name=video.project_name or video.title,
         template_id=str(video.template_id) if video.template_id else None,
         property_id=video.property_id,
-        project_data=video.project_data or {},
+        project_data=project_data or {},
         status=video.status,
         updated_at=video.updated_at.isoformat(),
-        created_at=video.created_at.isoformat()
+        created_at=video.created_at.isoformat(),
+        version=video.version or 1
     )
 
 
 @router.get("/list/{property_id}", response_model=ProjectListResponse)
 async def list_projects(
     property_id: int,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all projects for a property"""
+    """List projects for a property, most recently edited first (cursor-paginated)"""
 
+    # Keyset on (updated_at, id) keeps the "recently edited" order of the editor;
+    # heavy JSONB columns are never loaded for lists
     result = await db.execute(
-        select(Video).where(
-            Video.property_id == property_id,
-            Video.user_id == current_user.id,
-            Video.source_type == "viral_template_composer"
-        ).order_by(Video.updated_at.desc())
+        paginate(
+            select(Video)
+            .options(defer(Video.project_data), defer(Video.source_data))
+            .where(
+                Video.property_id == property_id,
+                Video.user_id == current_user.id,
+                Video.source_type == "viral_template_composer"
+            ),
+            Video.updated_at, Video.id, page
+        )
     )
-    videos = result.scalars().all()
+    videos, next_cursor = split_page(result.scalars().all(), page, lambda v: (v.updated_at, v.id))
 
     projects = [
-        ProjectResponse(
+        ProjectSummary(
             id=v.id,
             project_name=v.project_name or v.title,
             template_id=str(v.template_id) if v.template_id else None,
             property_id=v.property_id,
-            project_data=v.project_data or {},
+            thumbnail_url=v.thumbnail_url,
+            duration=v.duration,
             status=v.status,
             updated_at=v.updated_at.isoformat(),
             created_at=v.created_at.isoformat()
@@ -302,8 +328,95 @@ async def list_projects(
 
     return ProjectListResponse(
         projects=projects,
-        total=len(projects)
+        total=len(projects),
+        next_cursor=next_cursor
+    )
+
+
+@router.patch("/{project_id}", response_model=ProjectPatchResponse)
+async def patch_project(
+    project_id: str,
+    request: ProjectPatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply JSON Patch operations to project_data (autosave)
+
+    The patch is applied by Postgres in one `UPDATE ... WHERE version = :v`.
+    Returns 409 with the current version when the project changed since
+    `version` (reload it, then retry), and 422 when a `test` fails, a
+    path does not exist or an array index is invalid.
+    """
+    try:
+        patched, conditions, touched = compile_patch(
+            func.coalesce(Video.project_data, cast(literal('{}'), JSONB)),
+            request.operations
+        )
+    except PatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    # Thumbnail and duration only need recomputing when their inputs change
+    derive = bool(touched & DERIVED_FROM_KEYS)
+    returning = [Video.version, Video.updated_at] + ([Video.project_data] if derive else [])
+
+    result = await db.execute(
+        update(Video)
+        .where(
+            Video.id == project_id,
+            Video.user_id == current_user.id,
+            Video.version == request.version,
+            *conditions
+        )
+        .values(project_data=patched, version=Video.version + 1, updated_at=datetime.utcnow())
+        .returning(*returning)
+        .execution_options(synchronize_session=False)
     )
+    row = result.first()
+
+    if row is None:
+        current_version = (await db.execute(
+            select(Video.version).where(Video.id == project_id, Video.user_id == current_user.id)
+        )).scalar_one_or_none()
+        if current_version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        if current_version != request.version:
+            logger.info("⚔️ Project patch conflict", project_id=project_id,
+                        expected_version=request.version, current_version=current_version)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Project was modified", "current_version": current_version}
+            )
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Patch test failed, path not found or invalid array index"
+        )
+
+    if derive:
+        content_assets = await load_content_assets(db, current_user.id, [row.project_data])
+        project_data = hydrate_project_data(row.project_data, content_assets)
+        derived = {}
+        thumbnail_url = _derive_thumbnail(project_data)
+        if thumbnail_url:
+            derived["thumbnail_url"] = thumbnail_url
+        total_duration = _derive_duration(project_data)
+        if total_duration is not None:
+            derived["duration"] = total_duration
+        # Full contentVideos objects added by the patch go back to references
+        stored_project_data = compact_project_data(row.project_data, content_assets)
+        if stored_project_data != row.project_data:
+            derived["project_data"] = stored_project_data
+        if derived:
+            await db.execute(
+                update(Video).where(Video.id == project_id).values(**derived)
+                .execution_options(synchronize_session=False)
+            )
+
+    await db.commit()
+    logger.info("🩹 Project patched", project_id=project_id, version=row.version,
+                operations=len(request.operations))
+
+    return ProjectPatchResponse(id=project_id, version=row.version, updated_at=row.updated_at.isoformat())
 
 
 @router.patch("/{project_id}/rename")
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, insert, update, desc, asc, text
 from typing import List, Optional
 from datetime import datetime
+import json
 import structlog
 
 from ..core.database import get_db
@@ -114,7 +115,7 @@ async def get_template_history(
                 title=f"{hotel_name} - {country}" if country else hotel_name,  # Use hotel_name as title
                 hotel_name=hotel_name,
                 duration=row[2] if row[2] is not None else 30.0,
-                script=row[3] or "{}",
+                script=json.dumps(row[3]) if row[3] is not None else "{}",
                 video_link=row[4],
                 thumbnail_link=None,  # No longer in database
                 viewed_at=row[5].isoformat() if row[5] else None,
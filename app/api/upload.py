@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert
 from pydantic import BaseModel
 import uuid
-from typing import Optional
+from typing import Dict, List, Optional
 import structlog
 from botocore.exceptions import ClientError
 
@@ -14,8 +15,10 @@ from app.models.user import User
 from app.models.property import Property
 from app.models.asset import Asset
 from app.core.config import settings
-from app.infrastructure.storage.s3_service import S3StorageService
+from app.infrastructure.storage.s3_service import get_s3_service
 from app.shared.exceptions import StorageError
+from app.services import multipart_uploads
+from app.services.ingest import parse_video_key
 
 logger = structlog.get_logger(__name__)
 
@@ -44,6 +47,65 @@ class PresignedUrlResponse(BaseModel):
     expires_in: int
 
 
+class BatchDownloadUrlRequest(BaseModel):
+    keys: List[str]  # S3 keys or public file URLs
+    expires_in: int = 3600
+
+
+class BatchDownloadUrlResponse(BaseModel):
+    urls: Dict[str, str]
+    denied: List[str]
+    expires_in: int
+
+
+class MultipartCreateRequest(BaseModel):
+    file_name: str
+    content_type: str
+    property_id: int
+    file_size: int
+
+
+class MultipartCreateResponse(BaseModel):
+    upload_id: str
+    s3_key: str
+    file_url: str
+    part_size: int
+    part_count: int
+    expires_in: int
+
+
+class MultipartPartUrlsRequest(BaseModel):
+    part_numbers: List[int]
+
+
+class MultipartPartUrlsResponse(BaseModel):
+    upload_id: str
+    urls: Dict[int, str]
+    expires_in: int
+
+
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: str
+
+
+class MultipartPartsReport(BaseModel):
+    parts: List[CompletedPart]
+
+
+class MultipartStatusResponse(BaseModel):
+    upload_id: str
+    s3_key: str
+    part_size: int
+    part_count: int
+    completed_parts: List[int]
+    missing_parts: List[int]
+
+
+class MultipartCompleteRequest(BaseModel):
+    parts: List[CompletedPart] = []  # Accepted for compatibility; completion reads the parts from S3
+
+
 class CompleteUploadRequest(BaseModel):
     property_id: int
     s3_key: str
@@ -52,24 +114,16 @@ class CompleteUploadRequest(BaseModel):
     content_type: str
 
 
-@router.options("/presigned-url")
-async def options_presigned_url():
-    """Handle CORS preflight for presigned URL generation"""
-    return {"message": "CORS preflight OK"}
-
-@router.post("/presigned-url", response_model=PresignedUrlResponse)
-async def get_presigned_url(
-    request: PresignedUrlRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get presigned URL for direct S3 upload"""
-
-    logger.info(f"🔗 Presigned URL requested: {request.file_name} for user {current_user.id}")
-
-    # Validate property ownership
+async def _validate_video_upload(
+    db: AsyncSession,
+    current_user: User,
+    property_id: int,
+    file_name: str,
+    content_type: str
+) -> None:
+    """Check property ownership and that the file is a video"""
     stmt = select(Property).where(
-        and_(Property.id == request.property_id, Property.user_id == current_user.id)
+        and_(Property.id == property_id, Property.user_id == current_user.id)
     )
     result = await db.execute(stmt)
     property_obj = result.scalar_one_or_none()
@@ -91,8 +145,8 @@ async def get_presigned_url(
     ]
 
     is_video = (
-        request.content_type in allowed_video_types or
-        any(request.file_name.lower().endswith(ext) for ext in ['.mp4', '.mov', '.avi', '.wmv'])
+        content_type in allowed_video_types or
+        any(file_name.lower().endswith(ext) for ext in ['.mp4', '.mov', '.avi', '.wmv'])
     )
 
     if not is_video:
@@ -101,19 +155,44 @@ async def get_presigned_url(
             detail="Only video files are allowed"
         )
 
+
+def _new_video_key(user_id: int, property_id: int, file_name: str) -> str:
+    video_id = str(uuid.uuid4())
+    file_extension = file_name.split('.')[-1] if '.' in file_name else 'mp4'
+    return f"videos/{user_id}/{property_id}/{video_id}.{file_extension}"
+
+
+def _video_content_type(content_type: str) -> str:
+    """Video files must be stored with a video/* Content-Type"""
+    return content_type if content_type.startswith('video/') else 'video/mp4'
+
+
+@router.options("/presigned-url")
+async def options_presigned_url():
+    """Handle CORS preflight for presigned URL generation"""
+    return {"message": "CORS preflight OK"}
+
+@router.post("/presigned-url", response_model=PresignedUrlResponse)
+async def get_presigned_url(
+    request: PresignedUrlRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get presigned URL for direct S3 upload"""
+
+    logger.info(f"🔗 Presigned URL requested: {request.file_name} for user {current_user.id}")
+
+    await _validate_video_upload(db, current_user, request.property_id, request.file_name, request.content_type)
+
     try:
         # Generate unique S3 key
-        video_id = str(uuid.uuid4())
-        file_extension = request.file_name.split('.')[-1] if '.' in request.file_name else 'mp4'
-        s3_key = f"videos/{current_user.id}/{request.property_id}/{video_id}.{file_extension}"
+        s3_key = _new_video_key(current_user.id, request.property_id, request.file_name)
 
         # Generate presigned POST URL using centralized service
-        s3_service = S3StorageService()
+        s3_service = get_s3_service()
 
         # Ensure video files have correct Content-Type
-        content_type = request.content_type
-        if not content_type.startswith('video/'):
-            content_type = 'video/mp4'  # Default to mp4 for video files
+        content_type = _video_content_type(request.content_type)
 
         fields = {
             "Content-Type": content_type,
@@ -188,9 +267,12 @@ async def complete_upload(
             detail="Property not found or not owned by user"
         )
 
+    if settings.INGEST_EVENTS_ENABLED:
+        return await _register_upload(request, current_user, db)
+
     try:
         # Verify file exists in S3 using centralized service
-        s3_service = S3StorageService()
+        s3_service = get_s3_service()
         try:
             await s3_service.get_file_metadata(request.s3_key)
         except StorageError as e:
@@ -280,6 +362,56 @@ async def complete_upload(
         )
 
 
+async def _register_upload(
+    request: CompleteUploadRequest,
+    current_user: User,
+    db: AsyncSession
+) -> dict:
+    """
+    Event-driven ingest: the S3 notification consumer creates the asset and
+    runs the analysis. Here we only record the file name as title, with an
+    upsert so it does not matter whether the notification came first.
+    """
+    event = parse_video_key(request.s3_key, request.file_size)
+    if not event or event.user_id != current_user.id or event.property_id != request.property_id:
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+
+    stmt = insert(Asset).values(
+        id=event.asset_id,
+        title=request.file_name.split('.')[0],
+        file_url=validate_and_clean_url(f"{settings.STORAGE_PUBLIC_BASE}/{request.s3_key}"),
+        file_size=request.file_size,
+        status="uploaded",
+        asset_type="video",
+        property_id=request.property_id,
+        user_id=current_user.id
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Asset.id],
+        set_={"title": stmt.excluded.title}
+    ).returning(Asset.status)
+
+    try:
+        result = await db.execute(stmt)
+        status = result.scalar_one()
+        await db.commit()
+    except Exception as e:
+        logger.error(f"❌ Upload registration failed: {e}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to complete upload: {str(e)}"
+        )
+
+    logger.info(f"✅ Upload registered: {event.asset_id} ({status})")
+
+    return {
+        "message": "Upload completed successfully",
+        "video_id": event.asset_id,
+        "status": status
+    }
+
+
 @router.options("/reprocess-video/{video_id}")
 async def options_reprocess_video(video_id: str):
     """Handle CORS preflight for video reprocessing"""
@@ -425,7 +557,7 @@ async def get_download_url(
         )
 
     try:
-        s3_service = S3StorageService()
+        s3_service = get_s3_service()
 
         # Generate presigned URL for download/viewing
         download_url = await s3_service.generate_presigned_url(
@@ -443,4 +575,323 @@ async def get_download_url(
         raise HTTPException(
             status_code=500,
             detail="Failed to generate download URL"
-        )
\ No newline at end of file
+        )
+
+
+def _extract_s3_key(value: str) -> str:
+    """Accept a bare S3 key or a public file URL and return the key"""
+    if value.startswith(f"{settings.STORAGE_PUBLIC_BASE}/"):
+        return value.replace(f"{settings.STORAGE_PUBLIC_BASE}/", "", 1).split('?')[0]
+    if 'amazonaws.com/' in value:
+        key = value.split('amazonaws.com/')[-1].split('?')[0]
+        bucket_prefix = f"{settings.bucket_name}/"
+        return key[len(bucket_prefix):] if key.startswith(bucket_prefix) else key
+    return value.lstrip('/')
+
+
+async def _owned_keys(db: AsyncSession, user_id: int, keys: List[str]) -> set:
+    """
+    Keys the user may read, resolved with at most two queries.
+
+    Uploads are namespaced by user id (videos/{user}/..., assets/{user}/...);
+    thumbnails are keyed by asset id and generated videos by property id.
+    """
+    allowed = set()
+    thumbnail_ids: Dict[str, List[str]] = {}
+    property_ids: Dict[int, List[str]] = {}
+
+    for key in keys:
+        parts = key.split('/')
+        if len(parts) < 2:
+            continue
+        if parts[0] in ('videos', 'assets') and parts[1] == str(user_id):
+            allowed.add(key)
+        elif parts[0] == 'thumbnails':
+            asset_id = parts[1].rsplit('.', 1)[0]
+            thumbnail_ids.setdefault(asset_id, []).append(key)
+        elif parts[0] == 'generated-videos' and parts[1].isdigit():
+            property_ids.setdefault(int(parts[1]), []).append(key)
+
+    if thumbnail_ids:
+        result = await db.execute(
+            select(Asset.id).where(
+                and_(Asset.id.in_(list(thumbnail_ids)), Asset.user_id == user_id)
+            )
+        )
+        for asset_id in result.scalars():
+            allowed.update(thumbnail_ids[asset_id])
+
+    if property_ids:
+        result = await db.execute(
+            select(Property.id).where(
+                and_(Property.id.in_(list(property_ids)), Property.user_id == user_id)
+            )
+        )
+        for property_id in result.scalars():
+            allowed.update(property_ids[property_id])
+
+    return allowed
+
+
+@router.post("/download-urls", response_model=BatchDownloadUrlResponse)
+async def get_download_urls(
+    request: BatchDownloadUrlRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sign download URLs for a whole library page in one call
+
+    Returns a map of requested key/URL -> presigned URL. Keys the user does
+    not own are listed in `denied`. Signatures are cached per expiry bucket,
+    so repeated views reuse the same URLs.
+    """
+    if len(request.keys) > settings.S3_PRESIGN_BATCH_MAX_KEYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many keys (max {settings.S3_PRESIGN_BATCH_MAX_KEYS})"
+        )
+    if not 60 <= request.expires_in <= settings.S3_PRESIGN_MAX_EXPIRES_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"expires_in must be between 60 and {settings.S3_PRESIGN_MAX_EXPIRES_SECONDS} seconds"
+        )
+
+    requested = {value: _extract_s3_key(value) for value in request.keys if value}
+    allowed = await _owned_keys(db, current_user.id, list(set(requested.values())))
+
+    try:
+        s3_service = get_s3_service()
+        signed = await s3_service.presign_get_urls(sorted(allowed), request.expires_in)
+    except StorageError as e:
+        logger.error(f"❌ Batch download URL generation failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate download URLs"
+        )
+
+    return BatchDownloadUrlResponse(
+        urls={value: signed[key] for value, key in requested.items() if key in signed},
+        denied=[value for value, key in requested.items() if key not in allowed],
+        expires_in=request.expires_in
+    )
+
+
+# === MULTIPART UPLOADS ===
+# Large files: the browser uploads parts in parallel straight to S3, reports
+# them as they finish and can resume after an interruption. Once complete,
+# the client calls /upload/complete exactly as after a presigned POST.
+
+async def _get_owned_session(upload_id: str, current_user: User) -> dict:
+    session = await multipart_uploads.get_session(upload_id)
+    if not session or session["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    return session
+
+
+@router.post("/multipart", response_model=MultipartCreateResponse)
+async def create_multipart_upload(
+    request: MultipartCreateRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a resumable multipart upload for a large video"""
+
+    logger.info(f"📦 Multipart upload requested: {request.file_name} ({request.file_size} bytes) for user {current_user.id}")
+
+    await _validate_video_upload(db, current_user, request.property_id, request.file_name, request.content_type)
+
+    if not 0 < request.file_size <= settings.MULTIPART_MAX_FILE_SIZE_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size must be between 1 byte and {settings.MULTIPART_MAX_FILE_SIZE_MB}MB"
+        )
+
+    try:
+        s3_key = _new_video_key(current_user.id, request.property_id, request.file_name)
+        part_size = multipart_uploads.compute_part_size(request.file_size)
+        part_count = -(-request.file_size // part_size)
+
+        upload_id = await get_s3_service().create_multipart_upload(
+            key=s3_key,
+            content_type=_video_content_type(request.content_type)
+        )
+
+        await multipart_uploads.save_session(upload_id, {
+            "user_id": current_user.id,
+            "property_id": request.property_id,
+            "s3_key": s3_key,
+            "file_name": request.file_name,
+            "file_size": request.file_size,
+            "part_size": part_size,
+            "part_count": part_count
+        })
+
+        logger.info(f"✅ Multipart upload created: {s3_key} ({part_count} parts of {part_size} bytes)")
+
+        return MultipartCreateResponse(
+            upload_id=upload_id,
+            s3_key=s3_key,
+            file_url=validate_and_clean_url(f"{settings.STORAGE_PUBLIC_BASE}/{s3_key}"),
+            part_size=part_size,
+            part_count=part_count,
+            expires_in=settings.MULTIPART_UPLOAD_TTL_HOURS * 3600
+        )
+
+    except StorageError as e:
+        logger.error(f"❌ Multipart upload creation failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start upload")
+
+
+@router.post("/multipart/{upload_id}/part-urls", response_model=MultipartPartUrlsResponse)
+async def get_multipart_part_urls(
+    upload_id: str,
+    request: MultipartPartUrlsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Presign PUT URLs for a batch of parts"""
+    session = await _get_owned_session(upload_id, current_user)
+
+    part_numbers = sorted(set(request.part_numbers))
+    if len(part_numbers) > settings.MULTIPART_MAX_PARTS_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many parts (max {settings.MULTIPART_MAX_PARTS_PER_REQUEST} per request)"
+        )
+    if any(n < 1 or n > session["part_count"] for n in part_numbers):
+        raise HTTPException(status_code=400, detail=f"Part numbers must be between 1 and {session['part_count']}")
+
+    try:
+        urls = await get_s3_service().presign_upload_parts(
+            session["s3_key"],
+            upload_id,
+            part_numbers,
+            expires_in=settings.MULTIPART_PART_URL_EXPIRES_SECONDS
+        )
+    except StorageError as e:
+        logger.error(f"❌ Part URL generation failed for {upload_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate part upload URLs")
+
+    return MultipartPartUrlsResponse(
+        upload_id=upload_id,
+        urls=urls,
+        expires_in=settings.MULTIPART_PART_URL_EXPIRES_SECONDS
+    )
+
+
+@router.get("/multipart/{upload_id}", response_model=MultipartStatusResponse)
+async def get_multipart_upload_status(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Parts already uploaded and parts left (used to resume)"""
+    session = await _get_owned_session(upload_id, current_user)
+    parts = await multipart_uploads.get_recorded_parts(upload_id)
+    return MultipartStatusResponse(
+        upload_id=upload_id,
+        s3_key=session["s3_key"],
+        part_size=session["part_size"],
+        part_count=session["part_count"],
+        completed_parts=sorted(parts),
+        missing_parts=multipart_uploads.missing_parts(session, parts)
+    )
+
+
+@router.post("/multipart/{upload_id}/parts", response_model=MultipartStatusResponse)
+async def report_multipart_parts(
+    upload_id: str,
+    request: MultipartPartsReport,
+    current_user: User = Depends(get_current_user)
+):
+    """Record parts the client finished uploading (part number + ETag)"""
+    session = await _get_owned_session(upload_id, current_user)
+
+    if any(p.part_number < 1 or p.part_number > session["part_count"] for p in request.parts):
+        raise HTTPException(status_code=400, detail=f"Part numbers must be between 1 and {session['part_count']}")
+
+    parts = await multipart_uploads.record_parts(
+        upload_id,
+        {p.part_number: p.etag for p in request.parts}
+    )
+    return MultipartStatusResponse(
+        upload_id=upload_id,
+        s3_key=session["s3_key"],
+        part_size=session["part_size"],
+        part_count=session["part_count"],
+        completed_parts=sorted(parts),
+        missing_parts=multipart_uploads.missing_parts(session, parts)
+    )
+
+
+@router.post("/multipart/{upload_id}/complete")
+async def complete_multipart_upload(
+    upload_id: str,
+    request: MultipartCompleteRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Assemble the parts into the final object.
+
+    ETags and sizes come from S3 (ListParts), not from the reported parts:
+    an upload whose parts do not add up to the declared file size is aborted.
+    """
+    session = await _get_owned_session(upload_id, current_user)
+    s3_service = get_s3_service()
+
+    try:
+        uploaded = await s3_service.list_uploaded_parts(session["s3_key"], upload_id)
+        uploaded = {n: part for n, part in uploaded.items() if n <= session["part_count"]}
+
+        missing = multipart_uploads.missing_parts(session, uploaded)
+        if missing:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete: {len(missing)} parts missing (first: {missing[0]})"
+            )
+
+        mismatched = multipart_uploads.mismatched_parts(session, {n: size for n, (_, size) in uploaded.items()})
+        if mismatched:
+            logger.warning(f"🚫 Multipart upload {upload_id} does not match its declared size, aborting")
+            await s3_service.abort_multipart_upload(session["s3_key"], upload_id)
+            await multipart_uploads.delete_session(upload_id)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Upload aborted: part {mismatched[0]} does not match the declared file size"
+            )
+
+        parts = {n: etag for n, (etag, _) in uploaded.items()}
+
+        file_url = await s3_service.complete_multipart_upload(session["s3_key"], upload_id, parts)
+        await multipart_uploads.delete_session(upload_id)
+
+        logger.info(f"✅ Multipart upload completed: {session['s3_key']}")
+
+        return {
+            "message": "Upload assembled successfully",
+            "upload_id": upload_id,
+            "s3_key": session["s3_key"],
+            "file_url": validate_and_clean_url(file_url),
+            "file_size": session["file_size"]
+        }
+
+    except HTTPException:
+        raise
+    except StorageError as e:
+        logger.error(f"❌ Multipart upload completion failed for {upload_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to complete upload: {str(e)}")
+
+
+@router.delete("/multipart/{upload_id}")
+async def abort_multipart_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Abort an upload and discard its parts"""
+    session = await _get_owned_session(upload_id, current_user)
+
+    if not await get_s3_service().abort_multipart_upload(session["s3_key"], upload_id):
+        raise HTTPException(status_code=500, detail="Failed to abort upload")
+    await multipart_uploads.delete_session(upload_id)
+
+    logger.info(f"🗑️ Multipart upload aborted: {session['s3_key']}")
+    return {"message": "Upload aborted", "upload_id": upload_id}
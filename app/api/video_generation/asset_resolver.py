@@ -0,0 +1,90 @@
+"""Batch asset resolution for video generation"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import Asset
+
+logger = logging.getLogger(__name__)
+
+USABLE_STATUSES = ('uploaded', 'ready', 'completed')
+URL_SCHEMES = ('https://', 'http://', 's3://')
+
+# Clip durations may overrun the measured asset duration by rounding
+DURATION_TOLERANCE_SECONDS = 0.1
+
+_SESSION_KEY = 'video_generation_asset_resolver'
+
+
+class AssetResolver:
+    """
+    Per-request asset loader shared by script generation and payload preparation.
+
+    Ids are loaded with one `WHERE id IN (...)` query and kept in an identity
+    map, so resolving the same clips again costs nothing. Only assets owned
+    by `user_id` are returned.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: Optional[int] = None):
+        self.db = db
+        self.user_id = user_id
+        self._assets: Dict[str, Optional[Asset]] = {}
+
+    @classmethod
+    def for_session(cls, db: AsyncSession, user_id: Optional[int] = None) -> "AssetResolver":
+        """The resolver of this request's session (created on first use)"""
+        resolver = db.info.get(_SESSION_KEY)
+        if resolver is None or resolver.user_id != user_id:
+            resolver = cls(db, user_id)
+            db.info[_SESSION_KEY] = resolver
+        return resolver
+
+    async def load(self, asset_ids: Iterable[Any]) -> Dict[str, Optional[Asset]]:
+        """Load every unknown id in one query; returns the requested ids (None when missing)"""
+        wanted = {str(asset_id) for asset_id in asset_ids if asset_id}
+        missing = [asset_id for asset_id in wanted if asset_id not in self._assets]
+        if missing:
+            stmt = select(Asset).where(Asset.id.in_(missing))
+            if self.user_id is not None:
+                stmt = stmt.where(Asset.user_id == self.user_id)
+            found = {asset.id: asset for asset in (await self.db.execute(stmt)).scalars().all()}
+            for asset_id in missing:
+                self._assets[asset_id] = found.get(asset_id)
+            logger.info(f"📦 Resolved {len(found)}/{len(missing)} assets in one query")
+        return {asset_id: self._assets[asset_id] for asset_id in wanted}
+
+    async def load_property(self, property_id: int) -> List[Asset]:
+        """Usable assets of a property (also added to the identity map)"""
+        stmt = select(Asset).where(
+            Asset.property_id == property_id,
+            Asset.status.in_(USABLE_STATUSES)
+        )
+        if self.user_id is not None:
+            stmt = stmt.where(Asset.user_id == self.user_id)
+        assets = (await self.db.execute(stmt)).scalars().all()
+        for asset in assets:
+            self._assets[asset.id] = asset
+        return list(assets)
+
+    def get(self, asset_id: Any) -> Optional[Asset]:
+        return self._assets.get(str(asset_id)) if asset_id else None
+
+
+def validate_clip_asset(asset: Optional[Asset], duration: Optional[float]) -> List[str]:
+    """Problems that would make a render fail or look wrong (empty when the clip is usable)"""
+    if asset is None:
+        return ["asset not found"]
+
+    problems = []
+    if not asset.file_url or not asset.file_url.startswith(URL_SCHEMES):
+        problems.append(f"invalid file_url {asset.file_url!r}")
+    if asset.status not in USABLE_STATUSES:
+        problems.append(f"asset status is '{asset.status}'")
+    if duration is not None and duration <= 0:
+        problems.append(f"non-positive clip duration {duration}")
+    if asset.duration and duration is not None and duration > asset.duration + DURATION_TOLERANCE_SECONDS:
+        problems.append(f"clip duration {duration}s exceeds asset duration {asset.duration}s")
+    return problems
@@ -2,15 +2,20 @@
 
 import logging
 import json
-import boto3
-import asyncio
+import time
 from typing import List, Dict
 from botocore.exceptions import ClientError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.models.asset import Asset
+from app.core.config import settings
+from app.core.tracing import TRACEPARENT_KEY, start_span
+from app.infrastructure.aws.clients import get_aws_clients
 from app.models.user import User
+from app.services.fair_scheduler import render_scheduler
+from app.services.render_jobs import get_render_job, record_render_stages, transition_render_job
+from app.services.video_quota import video_quota
+from .asset_resolver import URL_SCHEMES, AssetResolver, validate_clip_asset
 
 logger = logging.getLogger(__name__)
 
@@ -39,74 +44,50 @@ async def prepare_aws_lambda_payload(
         if custom_script and 'clips' in custom_script:
             clips = custom_script['clips']
             logger.info(f"🎬 Found {len(clips)} clips in custom_script (like local version)")
-
-            for i, clip in enumerate(clips):
-                logger.info(f"🔍 Processing clip {i + 1}: {clip}")
-
-                # Get video_id from clip
-                video_id_from_clip = clip.get("video_id", "")
-                logger.info(f"🔍 Video ID from clip: '{video_id_from_clip}'")
-
-                video_url = ""
-                if video_id_from_clip and video_id_from_clip != "" and db:
-                    try:
-                        # Fetch asset from database to get file_url
-                        result = await db.execute(select(Asset).filter(Asset.id == video_id_from_clip))
-                        asset = result.scalar_one_or_none()
-
-                        if asset and asset.file_url:
-                            video_url = asset.file_url
-                            logger.info(f"✅ FOUND ASSET FILE_URL: '{video_id_from_clip}' -> '{video_url}'")
-                        else:
-                            logger.warning(f"⚠️ Asset not found or no file_url: {video_id_from_clip}")
-                            video_url = clip.get("video_url", "")
-                    except Exception as db_error:
-                        logger.error(f"❌ Database error fetching asset {video_id_from_clip}: {str(db_error)}")
-                        video_url = clip.get("video_url", "")
-                else:
-                    logger.warning(f"⚠️ No video_id in clip or no database session")
-                    video_url = clip.get("video_url", "")
-
-                # Use exact same structure as local version
-                segment_duration = clip.get("duration", 3)
-                logger.info(f"🕒 Clip {i + 1} duration: {segment_duration} seconds (from custom_script)")
-
-                segment = {
-                    "id": f"segment_{i + 1}",
-                    "video_url": video_url,
-                    "start_time": clip.get("start_time", 0),
-                    "end_time": clip.get("end_time", segment_duration),
-                    "duration": segment_duration,
-                    "order": clip.get("order", i + 1)
-                }
-                logger.info(f"✅ Created segment {i + 1} with duration {segment_duration}s and video_url: '{video_url}'")
-                segments.append(segment)
         else:
             logger.error("❌ No custom_script.clips found! Cannot process like local version")
-            # Fallback to slot assignments
+            # Fallback to slot assignments (3s segments)
             logger.info(f"🔍 FALLBACK: Processing {len(slot_assignments)} slot assignments")
-            for i, assignment in enumerate(slot_assignments):
-                asset_id = assignment.get("videoId", "")
-                video_url = ""
-                if asset_id and db:
-                    try:
-                        result = await db.execute(select(Asset).filter(Asset.id == asset_id))
-                        asset = result.scalar_one_or_none()
-                        if asset and asset.file_url:
-                            video_url = asset.file_url
-                    except Exception as db_error:
-                        logger.error(f"❌ Database error in fallback fetching asset {asset_id}: {str(db_error)}")
-                        video_url = ""
-
-                segment = {
-                    "id": f"segment_{i + 1}",
-                    "video_url": video_url,
-                    "start_time": 0,
-                    "end_time": 3,
-                    "duration": 3,
-                    "order": i + 1
-                }
-                segments.append(segment)
+            clips = [
+                {"video_id": assignment.get("videoId", ""), "start_time": 0, "end_time": 3, "duration": 3, "order": i + 1}
+                for i, assignment in enumerate(slot_assignments)
+            ]
+
+        # All clip assets in one query, validated in the same pass
+        resolver = AssetResolver.for_session(db, current_user.id) if db else None
+        if resolver:
+            await resolver.load(clip.get("video_id") for clip in clips)
+
+        invalid_clips = []
+        for i, clip in enumerate(clips):
+            video_id_from_clip = clip.get("video_id", "")
+            segment_duration = clip.get("duration", 3)
+            asset = resolver.get(video_id_from_clip) if resolver else None
+
+            if asset is not None:
+                video_url = asset.file_url
+            else:
+                logger.warning(f"⚠️ Asset not found for clip {i + 1}: '{video_id_from_clip}', using clip video_url")
+                video_url = clip.get("video_url", "")
+
+            problems = validate_clip_asset(asset, segment_duration) if asset is not None else []
+            if not video_url or not video_url.startswith(URL_SCHEMES):
+                problems.append(f"no usable video_url ({video_url!r})")
+                invalid_clips.append(i + 1)
+            for problem in problems:
+                logger.warning(f"⚠️ Clip {i + 1} ({video_id_from_clip}): {problem}")
+
+            segments.append({
+                "id": f"segment_{i + 1}",
+                "video_url": video_url,
+                "start_time": clip.get("start_time", 0),
+                "end_time": clip.get("end_time", segment_duration),
+                "duration": segment_duration,
+                "order": clip.get("order", i + 1)
+            })
+
+        if invalid_clips:
+            raise ValueError(f"Clips without a usable video: {invalid_clips}")
 
         logger.info(f"🎯 SEGMENTS READY FOR LAMBDA: {len(segments)} segments with file URLs")
 
@@ -177,24 +158,9 @@ async def invoke_aws_lambda_video_generation(payload: Dict) -> Dict:
     try:
         logger.info(f"🚀 Invoking AWS Lambda for video generation")
 
-        # Get AWS credentials from settings
         from app.core.config import settings
-        aws_access_key_id = settings.S3_ACCESS_KEY_ID
-        aws_secret_access_key = settings.S3_SECRET_ACCESS_KEY
-        aws_region = settings.AWS_REGION
         lambda_function_name = settings.AWS_LAMBDA_FUNCTION_NAME
 
-        if not aws_access_key_id or not aws_secret_access_key:
-            raise ValueError("AWS credentials not found in environment variables")
-
-        # Create Lambda client
-        lambda_client = boto3.client(
-            'lambda',
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=aws_region
-        )
-
         # Prepare Lambda event payload
         lambda_event = {
             "body": json.dumps(payload),
@@ -209,8 +175,9 @@ async def invoke_aws_lambda_video_generation(payload: Dict) -> Dict:
             logger.info(f"  Segment {i+1}: '{segment.get('video_url', 'MISSING')}'")
         logger.info(f"🔍 Full Lambda payload JSON: {json.dumps(lambda_event, indent=2)}")
 
-        # Invoke Lambda function asynchronously
-        response = lambda_client.invoke(
+        # Invoke Lambda function asynchronously (shared client, off the event loop)
+        response = await get_aws_clients().call(
+            'lambda', 'invoke',
             FunctionName=lambda_function_name,
             InvocationType='Event',
             Payload=json.dumps(lambda_event)
@@ -246,8 +213,6 @@ async def invoke_mediaconvert_job(
         logger.info(f"🎬 Invoking MediaConvert for job {job_id}")
 
         # Invoke Lambda with MediaConvert routing
-        lambda_client = boto3.client('lambda', region_name='eu-west-1')
-
         lambda_payload = {
             "body": json.dumps({
                 "job_id": job_id,
@@ -258,13 +223,11 @@ async def invoke_mediaconvert_job(
             })
         }
 
-        response = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: lambda_client.invoke(
-                FunctionName='hospup-video-generator',
-                InvocationType='Event',
-                Payload=json.dumps(lambda_payload)
-            )
+        response = await get_aws_clients().call(
+            'lambda', 'invoke',
+            FunctionName='hospup-video-generator',
+            InvocationType='Event',
+            Payload=json.dumps(lambda_payload)
         )
 
         logger.info(f"✅ MediaConvert job invoked successfully for {job_id}")
@@ -280,42 +243,151 @@ async def invoke_mediaconvert_job(
         raise e
 
 
+async def invoke_mediaconvert_render(
+    db: AsyncSession,
+    payload: Dict,
+    started_at: float,
+    queued_at: float = None
+) -> Dict:
+    """
+    Invoke the MediaConvert Lambda for a prepared render and move its job to `submitted`.
+
+    On failure the render job is failed, its quota refunded and its fair
+    scheduler slot released, then the error is re-raised. `queued_at` is set
+    for renders that waited in the fair scheduler (recorded as `fair_queue`).
+    """
+    job_id = payload["job_id"]
+    dispatched_at = time.time()
+
+    # Shared client on the AWS executor: never blocks the event loop
+    try:
+        with start_span(
+            "lambda.invoke",
+            traceparent=payload.get(TRACEPARENT_KEY),
+            function="hospup-video-generator",
+            job_id=job_id,
+            priority=payload.get("priority")
+        ) as invoke_span:
+            payload[TRACEPARENT_KEY] = invoke_span.traceparent
+            response = await get_aws_clients().call(
+                'lambda', 'invoke',
+                FunctionName='hospup-video-generator',
+                InvocationType='Event',  # Async invocation
+                Payload=json.dumps(payload)
+            )
+    except Exception as aws_error:
+        # The render never started: fail the job and give the quota back
+        try:
+            render_job = await get_render_job(db, job_id, for_update=True)
+            if render_job and transition_render_job(render_job, "failed", error_message=str(aws_error)):
+                await video_quota.refund_render_job(db, render_job)
+            await db.commit()
+        except Exception as db_error:
+            logger.error(f"❌ Failed to mark render job {job_id} as failed: {str(db_error)}")
+        if settings.FAIR_SCHEDULING_ENABLED:
+            await render_scheduler.release_tracked(job_id)
+        raise
+
+    logger.info(f"✅ MediaConvert Lambda invoked (StatusCode: {response['StatusCode']})")
+
+    try:
+        # A fast callback may already have moved the job past `submitted`
+        render_job = await get_render_job(db, job_id, for_update=True)
+        if render_job and transition_render_job(render_job, "submitted"):
+            stages = {"api_submit": {"start": started_at, "end": time.time()}}
+            if queued_at:
+                stages["fair_queue"] = {"start": queued_at, "end": dispatched_at}
+            record_render_stages(render_job, stages, "api")
+        await db.commit()
+    except Exception as db_error:
+        logger.error(f"❌ Failed to mark render job {job_id} as submitted: {str(db_error)}")
+
+    return response
+
+
+async def dispatch_fair_renders() -> int:
+    """
+    Submit the bulk renders the fair scheduler lets run now (periodic task).
+
+    Each render holds its tenant's slot until its callback reaches a final
+    status (app/api/videos.py) or the lease expires. An expired lease puts
+    the render back in the queue, so only jobs still `queued` are submitted:
+    a render whose callback was lost is not started twice.
+    """
+    from app.core.database import AsyncSessionLocal
+
+    dispatched = 0
+    while True:
+        lease = await render_scheduler.dequeue()
+        if lease is None:
+            break
+        item = lease.payload
+        job_id = item["payload"]["job_id"]
+        try:
+            async with AsyncSessionLocal() as db:
+                render_job = await get_render_job(db, job_id)
+                if render_job is None or render_job.status != "queued":
+                    logger.info(f"⏭️ Fair-scheduled render {job_id} already {render_job.status if render_job else 'gone'}, not submitting")
+                    await render_scheduler.release(lease.lease_id)
+                    continue
+                await render_scheduler.track(job_id, lease.lease_id)
+                await invoke_mediaconvert_render(db, item["payload"], item["started_at"], queued_at=item["queued_at"])
+            dispatched += 1
+        except Exception as e:
+            logger.error(f"❌ Fair-scheduled render {job_id} failed to start: {str(e)}")
+
+    if dispatched:
+        logger.info(f"⚖️ Dispatched {dispatched} fair-scheduled renders")
+    return dispatched
+
+
 async def get_mediaconvert_job_status(job_id: str) -> Dict:
     """
     Get video status from database only
     MediaConvert jobs are tracked via EventBridge webhook, not direct polling
+
+    `job_id` may be our render job id, a MediaConvert job id or a video id;
+    all three resolve through indexed lookups (render_jobs / videos primary key).
     """
     try:
         from app.core.database import AsyncSessionLocal
         from app.models.video import Video
-        from sqlalchemy import select, or_
+        from app.services.render_jobs import find_render_job, STAGE_PROGRESS
 
         logger.info(f"📊 Checking video status from database for job: {job_id}")
 
         async with AsyncSessionLocal() as db:
-            # Find video by job_id in description or by video_id
-            result = await db.execute(
-                select(Video).where(
-                    or_(
-                        Video.description.contains(job_id),
-                        Video.id == job_id
-                    )
-                ).limit(1)
-            )
+            render_job = await find_render_job(db, job_id=job_id, video_id=job_id)
+            video_id = render_job.video_id if render_job else job_id
+
+            result = await db.execute(select(Video).where(Video.id == video_id))
             video = result.scalar_one_or_none()
 
             if video:
                 logger.info(f"✅ Found video {video.id} in database: status={video.status}")
+                if render_job:
+                    progress = STAGE_PROGRESS.get(render_job.status, 50)
+                else:
+                    progress = 100 if video.status == "completed" else 50
+
+                error_message = None
+                if video.status == "failed":
+                    error_message = (render_job.error_message if render_job else None) or "Video generation failed"
+
+                completed_at = None
+                if video.status == "completed":
+                    completed_at = (render_job.completed_at if render_job and render_job.completed_at else video.updated_at)
+
                 return {
                     "jobId": job_id,
                     "status": video.status.upper() if video.status else "PROCESSING",
-                    "progress": 100 if video.status == "completed" else 50,
+                    "progress": progress,
                     "video_id": str(video.id),
                     "file_url": video.file_url,
                     "outputUrl": video.file_url,
                     "createdAt": video.created_at.isoformat() if video.created_at else None,
-                    "completedAt": video.updated_at.isoformat() if video.status == "completed" and video.updated_at else None,
-                    "errorMessage": None if video.status != "failed" else "Video generation failed"
+                    "completedAt": completed_at.isoformat() if completed_at else None,
+                    "errorMessage": error_message
                 }
             else:
                 logger.warning(f"⚠️ Video not found in database for job {job_id}")
@@ -4,54 +4,34 @@ import logging
 import json
 from typing import List, Dict, Any
 
+from app.core.metrics import track_openai
+from app.core.request_timing import timed
 from app.models.asset import Asset
 from app.models.property import Property
-from app.models.template import Template
+from app.models.template import Template, build_slot_descriptors, normalize_script
+from app.services.llm_cache import llm_cache
 from .schemas import SlotAssignment
 
 logger = logging.getLogger(__name__)
 
 
-def parse_template_slots(script: Any) -> List[Dict[str, Any]]:
-    """Parse template script to extract slots information"""
+def _is_json_object(text: str) -> bool:
+    """Only cache OpenAI answers that parse, so a bad response is retried next time"""
     try:
-        if not script:
-            return []
-
-        # Handle both dict and string formats
-        if isinstance(script, str):
-            # Remove == prefix if present
-            clean_script = script.strip()
-            while clean_script.startswith('='):
-                clean_script = clean_script[1:].strip()
-            script_data = json.loads(clean_script)
-        else:
-            script_data = script
-
-        # Handle two formats:
-        # 1. Old format: {"clips": [{"order":1,...}]}
-        # 2. New format: [{"order":1,...}]
-        if isinstance(script_data, dict):
-            clips = script_data.get('clips', [])
-        elif isinstance(script_data, list):
-            clips = script_data
-        else:
-            logger.warning(f"Unexpected script format: {type(script_data)}")
-            return []
+        return isinstance(json.loads(text), dict)
+    except (TypeError, ValueError):
+        return False
 
-        slots = []
-        for i, clip in enumerate(clips):
-            slot = {
-                'id': f"slot_{i}",
-                'order': clip.get('order', i + 1),
-                'duration': clip.get('duration', clip.get('end', 0) - clip.get('start', 0) or 3),
-                'description': clip.get('description', f'Slot {i + 1}'),
-                'start_time': clip.get('start', 0),
-                'end_time': clip.get('end', clip.get('start', 0) + clip.get('duration', 3))
-            }
-            slots.append(slot)
 
-        return slots
+def parse_template_slots(template: Any) -> List[Dict[str, Any]]:
+    """
+    Slots of a template: its precomputed slot_descriptors, or the slots of a
+    raw script (dict, clip list or JSON text) for callers without a row
+    """
+    try:
+        if isinstance(template, Template):
+            return list(template.slot_descriptors or [])
+        return build_slot_descriptors(normalize_script(template))
 
     except Exception as e:
         logger.error(f"❌ Error parsing template script: {str(e)}")
@@ -182,21 +162,32 @@ OUTPUT FORMAT (JSON only, no markdown):
 
 IMPORTANT: Return ONLY valid JSON, no markdown blocks, no extra text."""
 
-        # Call OpenAI API (using gpt-4o-mini for speed - 15x faster than gpt-4)
-        logger.info("🤖 Calling OpenAI API for smart video matching...")
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Much faster and cheaper than gpt-4
-            messages=[
-                {"role": "system", "content": "You are an expert AI video editor for luxury hospitality marketing. Match videos to slots by carefully reading slot descriptions and video titles/descriptions. Look for matching keywords and themes. Every slot MUST have a video, never leave empty, never reuse videos."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Balanced for accuracy and creativity
-            max_tokens=2000,
-            response_format={"type": "json_object"}  # Force JSON output
-        )
+        system_prompt = "You are an expert AI video editor for luxury hospitality marketing. Match videos to slots by carefully reading slot descriptions and video titles/descriptions. Look for matching keywords and themes. Every slot MUST have a video, never leave empty, never reuse videos."
+        model = "gpt-4o-mini"  # Much faster and cheaper than gpt-4
+        temperature = 0.3  # Balanced for accuracy and creativity
+
+        def call_openai() -> str:
+            # Call OpenAI API (using gpt-4o-mini for speed - 15x faster than gpt-4)
+            logger.info("🤖 Calling OpenAI API for smart video matching...")
+            with timed("openai"), track_openai("smart_match"):
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=temperature,
+                    max_tokens=2000,
+                    response_format={"type": "json_object"}  # Force JSON output
+                )
+            return response.choices[0].message.content.strip()
 
-        # Parse the response
-        ai_response = response.choices[0].message.content.strip()
+        # Identical asset/slot/property inputs produce the same prompt: reuse the answer
+        cache_key = llm_cache.make_key(
+            "smart_match", model, temperature,
+            system=system_prompt, prompt=prompt
+        )
+        ai_response = llm_cache.get_or_compute(cache_key, call_openai, cacheable=_is_json_object)
         logger.info(f"🤖 OpenAI response: {ai_response[:200]}...")
 
         # Try to parse the JSON response
@@ -3,12 +3,19 @@
 import logging
 import uuid
 import json
-from fastapi import APIRouter, Depends, HTTPException
+import time
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
 from app.auth.dependencies import get_current_user
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import ai_limiter, video_generation_limiter
+from app.core.tracing import TRACEPARENT_KEY, current_trace_id, current_traceparent, start_span, traced
 from app.models.user import User
 from app.models.property import Property
 from app.models.asset import Asset
@@ -22,6 +29,8 @@ from .schemas import (
     VideoGenerationResponse,
     MediaConvertRequest,
     MediaConvertJobResponse,
+    MediaConvertBatchRequest,
+    MediaConvertBatchResponse,
     VideoStatusResponse
 )
 from .matching_service import parse_template_slots, perform_smart_matching
@@ -29,15 +38,29 @@ from .script_service import create_script_from_timeline
 from .aws_service import (
     prepare_aws_lambda_payload,
     invoke_aws_lambda_video_generation,
+    invoke_mediaconvert_render,
     get_mediaconvert_job_status
 )
+from app.services.quota import QuotaService
+from app.services.render_jobs import create_render_job, get_render_job, record_render_stages, transition_render_job
+from app.services.fair_scheduler import render_scheduler
+from app.services.video_quota import video_quota
+from app.shared.exceptions import QuotaExceededError
+from app.services.job_events import job_event_broker, TERMINAL_EVENT_STATUSES
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+STATUS_STREAM_HEARTBEAT_SECONDS = 15
+STATUS_STREAM_MAX_SECONDS = 30 * 60
 
-@router.post("/smart-match", response_model=SmartMatchResponse)
+# Render lanes: editor clicks are served before batches and backfills
+RENDER_PRIORITY_INTERACTIVE = "interactive"
+RENDER_PRIORITY_BULK = "bulk"
+
+
+@router.post("/smart-match", response_model=SmartMatchResponse, dependencies=[Depends(ai_limiter.per_user)])
 async def smart_match_videos_to_slots(
     request: SmartMatchRequest,
     current_user: User = Depends(get_current_user),
@@ -84,8 +107,8 @@ async def smart_match_videos_to_slots(
 
         logger.info(f"📚 Found {len(assets)} assets for property {property.name}")
 
-        # Parse template script to get slots
-        template_slots = parse_template_slots(template.script)
+        # Precomputed template slots
+        template_slots = parse_template_slots(template)
 
         if not template_slots:
             raise HTTPException(status_code=404, detail="No slots found in template")
@@ -128,7 +151,7 @@ async def smart_match_videos_to_slots(
         raise HTTPException(status_code=500, detail=f"Smart matching failed: {str(e)}")
 
 
-@router.post("/smart-match-ai", response_model=SmartMatchResponse)
+@router.post("/smart-match-ai", response_model=SmartMatchResponse, dependencies=[Depends(ai_limiter.per_user)])
 async def smart_match_videos_ai(
     request: SmartMatchRequest,
     current_user: User = Depends(get_current_user),
@@ -175,8 +198,8 @@ async def smart_match_videos_ai(
 
         logger.info(f"📚 Found {len(assets)} assets for property {property.name}")
 
-        # Parse template script to get slots
-        template_slots = parse_template_slots(template.script)
+        # Precomputed template slots
+        template_slots = parse_template_slots(template)
 
         if not template_slots:
             raise HTTPException(status_code=404, detail="No slots found in template")
@@ -231,7 +254,8 @@ async def smart_match_videos_ai(
         raise HTTPException(status_code=500, detail=f"AI matching failed: {str(e)}")
 
 
-@router.post("/generate-from-viral-template", response_model=VideoGenerationResponse)
+@router.post("/generate-from-viral-template", response_model=VideoGenerationResponse, dependencies=[Depends(video_generation_limiter.per_user)])
+@traced("video.generate_from_viral_template")
 async def generate_video_from_viral_template(
     request: VideoGenerationRequest,
     current_user: User = Depends(get_current_user),
@@ -239,6 +263,7 @@ async def generate_video_from_viral_template(
 ):
     """Generate a video from viral template with slot assignments and text overlays"""
     new_video = None
+    started_at = time.time()
 
     try:
         logger.info(f"🎬 Video generation request from user {current_user.id} for property {request.property_id}")
@@ -296,8 +321,7 @@ async def generate_video_from_viral_template(
 
             if template:
                 try:
-                    template_script_data = json.loads(template.script)
-                    template_clips = template_script_data.get('clips', [])
+                    template_clips = template.slot_descriptors or []
 
                     logger.info(f"📋 Template has {len(template_clips)} clips defined")
 
@@ -306,7 +330,8 @@ async def generate_video_from_viral_template(
                         text_overlays=text_overlays,
                         template_clips=template_clips,
                         property_id=property_id,
-                        db=db
+                        db=db,
+                        user_id=current_user.id
                     )
 
                     logger.info(f"✅ Generated custom script: {len(custom_script.get('clips', []))} clips, {len(custom_script.get('texts', []))} texts, {custom_script.get('total_duration', 0)}s total")
@@ -330,7 +355,7 @@ async def generate_video_from_viral_template(
         new_video = Video(
             id=str(uuid.uuid4()),
             title=f"Generated from {template_id}" if template_id else "Generated Video",
-            description=f"Video generated from viral template for {property.name} [JOB:{job_id}]",
+            description=f"Video generated from viral template for {property.name}",
             property_id=property_id,
             user_id=current_user.id,
             status='queued',
@@ -339,15 +364,37 @@ async def generate_video_from_viral_template(
             thumbnail_url=None
         )
 
-        # Save to database
+        # Save to database (quota charge + video + render job in one transaction)
+        user_id = current_user.id
+        quota_period = None
         try:
+            quota_period = await QuotaService.reserve_video(current_user, db)
             db.add(new_video)
+            await db.flush()
+            render_job = create_render_job(
+                db,
+                job_id=job_id,
+                video_id=new_video.id,
+                user_id=user_id,
+                property_id=property_id,
+                generation_method="aws_mediaconvert",
+                quota_period=quota_period,
+                trace_id=current_trace_id()
+            )
             await db.commit()
             await db.refresh(new_video)
-            logger.info(f"✅ Video generation queued with ID: {new_video.id}")
+            logger.info(f"✅ Video generation queued with ID: {new_video.id} (job {job_id})")
+        except QuotaExceededError as quota_error:
+            logger.warning(f"🚫 Monthly video quota reached for user {user_id}: {quota_error.message}")
+            raise HTTPException(
+                status_code=403,
+                detail=f"Monthly video limit reached ({quota_error.details['current']}/{quota_error.details['limit']} videos this month)."
+            )
         except Exception as db_error:
             logger.error(f"❌ Database error creating video record: {str(db_error)}")
             await db.rollback()
+            if quota_period:
+                await video_quota.cancel_reservation(user_id, quota_period)
             raise HTTPException(status_code=500, detail="Database error while creating video record")
 
         # MEDIACONVERT ROUTING
@@ -375,17 +422,26 @@ async def generate_video_from_viral_template(
             logger.error(f"❌ Failed to prepare AWS payload: {str(payload_error)}")
             try:
                 new_video.status = 'failed'
+                if transition_render_job(render_job, "failed", error_message=str(payload_error)):
+                    await video_quota.refund_render_job(db, render_job)
                 await db.commit()
             except:
                 pass
             raise HTTPException(status_code=500, detail=f"Failed to prepare video generation: {str(payload_error)}")
 
         try:
-            lambda_result = await invoke_aws_lambda_video_generation(aws_payload)
+            # Trace context travels with the payload (Lambda → MediaConvert → SQS → callbacks)
+            with start_span("lambda.invoke", job_id=job_id) as invoke_span:
+                aws_payload[TRACEPARENT_KEY] = invoke_span.traceparent
+                lambda_result = await invoke_aws_lambda_video_generation(aws_payload)
 
             # Update video status
             try:
-                new_video.status = 'processing'
+                # Fresh, locked row: a fast callback may already have moved the job on
+                render_job = await get_render_job(db, job_id, for_update=True) or render_job
+                if transition_render_job(render_job, "submitted"):
+                    new_video.status = 'processing'
+                    record_render_stages(render_job, {"api_submit": {"start": started_at, "end": time.time()}}, "api")
                 await db.commit()
             except Exception as db_error:
                 logger.error(f"❌ Database error updating video status: {str(db_error)}")
@@ -401,6 +457,9 @@ async def generate_video_from_viral_template(
 
             try:
                 new_video.status = 'failed'
+                render_job = await get_render_job(db, job_id, for_update=True) or render_job
+                if transition_render_job(render_job, "failed", error_message=str(aws_error)):
+                    await video_quota.refund_render_job(db, render_job)
                 await db.commit()
             except Exception as db_error:
                 logger.error(f"❌ Failed to update video status to failed: {str(db_error)}")
@@ -427,7 +486,7 @@ async def generate_video_from_viral_template(
         raise HTTPException(status_code=500, detail=f"Video generation failed: {str(e)}")
 
 
-@router.post("/aws-generate", response_model=VideoGenerationResponse)
+@router.post("/aws-generate", response_model=VideoGenerationResponse, dependencies=[Depends(video_generation_limiter.per_user)])
 async def aws_generate_video_async(
     request: VideoGenerationRequest,
     current_user: User = Depends(get_current_user),
@@ -438,117 +497,206 @@ async def aws_generate_video_async(
     return await generate_video_from_viral_template(request, current_user, db)
 
 
-@router.post("/generate", response_model=MediaConvertJobResponse)
-async def generate_video_mediaconvert(
+async def _submit_mediaconvert_render(
     request: MediaConvertRequest,
-    db: AsyncSession = Depends(get_db)
-):
-    """🎯 OPTIMIZED: MediaConvert (clips) → ECS FFmpeg (text overlay)"""
+    db: AsyncSession,
+    priority: str,
+    user_id: Optional[int] = None
+) -> MediaConvertJobResponse:
+    """
+    Charge the quota, record the render job and invoke the MediaConvert Lambda.
+
+    `priority` picks the render lane (RENDER_PRIORITY_*): MediaConvert queue
+    priority and the SQS queue of the FFmpeg worker, which serves
+    interactive jobs first. With FAIR_SCHEDULING_ENABLED, bulk renders are
+    queued per tenant instead and submitted by dispatch_fair_renders.
+
+    With `user_id` (authenticated callers), existing videos must belong to
+    that user and new video records are created for them. A database error
+    fails the job (500) before anything is invoked.
+    """
+    started_at = time.time()
+    # Generate IDs if not provided
+    video_id = request.video_id or str(uuid.uuid4())
+    job_id = request.job_id or str(uuid.uuid4())
+    tenant_id = None
+
+    print(f"🎯 OPTIMIZED video generation: MediaConvert → ECS FFmpeg")
+    print(f"📊 Payload: property_id={request.property_id}, video_id={video_id}, job_id={job_id}")
+    print(f"📹 Data: {len(request.segments)} segments (→ MediaConvert), {len(request.text_overlays)} overlays (→ ECS FFmpeg)")
+    logger.info(f"🎯 OPTIMIZED workflow starting")
+    logger.info(f"📊 Payload: property_id={request.property_id}, video_id={video_id}, job_id={job_id}")
+    logger.info(f"📹 Segments: {len(request.segments)}, Text overlays: {len(request.text_overlays)}")
+
+    # Update or create video record in database
+    quota_period = None
+    quota_user_id = None
     try:
-        # Generate IDs if not provided
-        video_id = request.video_id or str(uuid.uuid4())
-        job_id = request.job_id or str(uuid.uuid4())
-
-        print(f"🎯 OPTIMIZED video generation: MediaConvert → ECS FFmpeg")
-        print(f"📊 Payload: property_id={request.property_id}, video_id={video_id}, job_id={job_id}")
-        print(f"📹 Data: {len(request.segments)} segments (→ MediaConvert), {len(request.text_overlays)} overlays (→ ECS FFmpeg)")
-        logger.info(f"🎯 OPTIMIZED workflow starting")
-        logger.info(f"📊 Payload: property_id={request.property_id}, video_id={video_id}, job_id={job_id}")
-        logger.info(f"📹 Segments: {len(request.segments)}, Text overlays: {len(request.text_overlays)}")
-
-        # Update or create video record in database
-        try:
-            # Check if video already exists (from project save)
-            existing_video_result = await db.execute(
-                text("SELECT id, user_id FROM videos WHERE id = :video_id"),
-                {"video_id": video_id}
+        # Check if video already exists (from project save)
+        existing_video_result = await db.execute(
+            text("SELECT id, user_id, property_id FROM videos WHERE id = :video_id"),
+            {"video_id": video_id}
+        )
+        existing_video = existing_video_result.fetchone()
+
+        if existing_video and user_id is not None and existing_video[1] != user_id:
+            raise HTTPException(status_code=404, detail=f"Video {video_id} not found")
+
+        if existing_video:
+            # Charge the project owner's monthly quota (same transaction)
+            owner = await db.get(User, existing_video[1])
+            quota_user_id = existing_video[1]
+            quota_period = await QuotaService.reserve_video(owner, db) if owner else None
+
+            # Update existing video record to "processing" status
+            await db.execute(
+                text("""
+                    UPDATE videos
+                    SET status = :status,
+                        description = :description,
+                        duration = :duration,
+                        updated_at = NOW()
+                    WHERE id = :video_id
+                """),
+                {
+                    "status": "processing",
+                    "description": "Optimized: MediaConvert + ECS",
+                    "duration": request.total_duration,
+                    "video_id": video_id
+                }
             )
-            existing_video = existing_video_result.fetchone()
-
-            if existing_video:
-                # Update existing video record to "processing" status
-                await db.execute(
-                    text("""
-                        UPDATE videos
-                        SET status = :status,
-                            description = :description,
-                            duration = :duration,
-                            updated_at = NOW()
-                        WHERE id = :video_id
-                    """),
-                    {
-                        "status": "processing",
-                        "description": f"Optimized: MediaConvert + ECS job {job_id}",
-                        "duration": request.total_duration,
-                        "video_id": video_id
-                    }
-                )
-                await db.commit()
-                logger.info(f"✅ Video record updated (draft → processing): {video_id}")
-            else:
-                # Create new video record
+            create_render_job(
+                db,
+                job_id=job_id,
+                video_id=video_id,
+                user_id=existing_video[1],
+                property_id=existing_video[2],
+                generation_method="mediaconvert_ecs",
+                quota_period=quota_period,
+                trace_id=current_trace_id()
+            )
+            await db.commit()
+            tenant_id = existing_video[1]
+            logger.info(f"✅ Video record updated (draft → processing): {video_id}")
+        else:
+            # Create new video record
+            if user_id is None:
                 result = await db.execute(text("SELECT id FROM users LIMIT 1"))
                 first_user = result.fetchone()
                 user_id = first_user[0] if first_user else None
 
-                if user_id:
-                    new_video = Video(
-                        id=video_id,
-                        title=f"Generated Video {video_id[:8]}",
-                        description=f"Optimized: MediaConvert + ECS job {job_id}",
-                        property_id=int(request.property_id) if request.property_id.isdigit() else None,
-                        user_id=user_id,
-                        status="processing",
-                        duration=request.total_duration
-                    )
-                    db.add(new_video)
-                    await db.commit()
-                    logger.info(f"✅ Video record created: {video_id}")
-                else:
-                    logger.warning("⚠️ No users found, skipping video record")
-        except Exception as db_error:
-            logger.error(f"❌ Database error: {str(db_error)}")
-
-        # 🎯 OPTIMIZED WORKFLOW: Invoke MediaConvert Lambda
-        import boto3
-        import json as json_lib
-
-        lambda_client = boto3.client('lambda', region_name='eu-west-1')
-
-        # Prepare payload for MediaConvert Lambda
-        mediaconvert_payload = {
-            "property_id": request.property_id,
-            "video_id": video_id,
-            "job_id": job_id,
-            "segments": request.segments,
-            "text_overlays": request.text_overlays,
-            "custom_script": request.custom_script or {},
-            "total_duration": request.total_duration,
-            "webhook_url": request.webhook_url or f"https://web-production-b52f.up.railway.app/api/v1/videos/ffmpeg-callback"
-        }
+            if user_id:
+                # Charge the new video's owner (same transaction)
+                owner = await db.get(User, user_id)
+                quota_user_id = user_id
+                quota_period = await QuotaService.reserve_video(owner, db) if owner else None
+
+                new_video = Video(
+                    id=video_id,
+                    title=f"Generated Video {video_id[:8]}",
+                    description="Optimized: MediaConvert + ECS",
+                    property_id=int(request.property_id) if request.property_id.isdigit() else None,
+                    user_id=user_id,
+                    status="processing",
+                    duration=request.total_duration
+                )
+                db.add(new_video)
+                await db.flush()
+                create_render_job(
+                    db,
+                    job_id=job_id,
+                    video_id=video_id,
+                    user_id=user_id,
+                    property_id=new_video.property_id,
+                    generation_method="mediaconvert_ecs",
+                    quota_period=quota_period,
+                    trace_id=current_trace_id()
+                )
+                await db.commit()
+                tenant_id = user_id
+                logger.info(f"✅ Video record created: {video_id}")
+            else:
+                logger.warning("⚠️ No users found, skipping video record")
+    except QuotaExceededError as quota_error:
+        logger.warning(f"🚫 Monthly video quota reached for video {video_id}: {quota_error.message}")
+        raise HTTPException(
+            status_code=403,
+            detail=f"Monthly video limit reached ({quota_error.details['current']}/{quota_error.details['limit']} videos this month)."
+        )
+    except HTTPException:
+        raise
+    except Exception as db_error:
+        # Without its video / render job rows the render could not be tracked
+        await db.rollback()
+        if quota_period:
+            await video_quota.cancel_reservation(quota_user_id, quota_period)
+        logger.error(f"❌ Database error for video {video_id}: {str(db_error)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Video generation failed: could not record video {video_id}"
+        )
+
+    # 🎯 OPTIMIZED WORKFLOW: Invoke MediaConvert Lambda
+    # Prepare payload for MediaConvert Lambda
+    mediaconvert_payload = {
+        "property_id": request.property_id,
+        "video_id": video_id,
+        "job_id": job_id,
+        "segments": request.segments,
+        "text_overlays": request.text_overlays,
+        "custom_script": request.custom_script or {},
+        "total_duration": request.total_duration,
+        "webhook_url": request.webhook_url or f"https://web-production-b52f.up.railway.app/api/v1/videos/ffmpeg-callback",
+        "priority": priority  # MediaConvert queue priority + worker SQS lane
+    }
+
+    # Remote parent of the invoke span, also when the render is dispatched later
+    mediaconvert_payload[TRACEPARENT_KEY] = current_traceparent()
+
+    if priority == RENDER_PRIORITY_BULK and settings.FAIR_SCHEDULING_ENABLED and tenant_id:
+        try:
+            queued = await render_scheduler.enqueue(
+                str(tenant_id),
+                {"payload": mediaconvert_payload, "started_at": started_at, "queued_at": time.time()}
+            )
+            logger.info(f"⚖️ Render {job_id} queued for user {tenant_id} ({queued} waiting)")
+            return MediaConvertJobResponse(
+                job_id=job_id,
+                video_id=video_id,
+                status="QUEUED",
+                message="Queued: submitted to MediaConvert in fair order across accounts"
+            )
+        except Exception as scheduler_error:
+            logger.warning(f"⚠️ Fair scheduler unavailable, submitting render {job_id} directly: {str(scheduler_error)}")
 
-        logger.info(f"🚀 Invoking MediaConvert Lambda: hospup-video-generator")
-        print(f"🚀 Invoking MediaConvert Lambda with {len(request.segments)} clips")
+    logger.info(f"🚀 Invoking MediaConvert Lambda: hospup-video-generator")
+    print(f"🚀 Invoking MediaConvert Lambda with {len(request.segments)} clips")
 
-        response = lambda_client.invoke(
-            FunctionName='hospup-video-generator',
-            InvocationType='Event',  # Async invocation
-            Payload=json_lib.dumps(mediaconvert_payload)
-        )
+    await invoke_mediaconvert_render(db, mediaconvert_payload, started_at)
+    print(f"✅ MediaConvert Lambda invoked successfully")
+    print(f"   → MediaConvert will assemble clips (GPU, 3-10s)")
+    print(f"   → Then ECS FFmpeg will add text overlays (CPU, 5-15s)")
+    print(f"   → Total expected: 8-25s")
 
-        logger.info(f"✅ MediaConvert Lambda invoked (StatusCode: {response['StatusCode']})")
-        print(f"✅ MediaConvert Lambda invoked successfully")
-        print(f"   → MediaConvert will assemble clips (GPU, 3-10s)")
-        print(f"   → Then ECS FFmpeg will add text overlays (CPU, 5-15s)")
-        print(f"   → Total expected: 8-25s")
-
-        return MediaConvertJobResponse(
-            job_id=job_id,
-            video_id=video_id,
-            status="SUBMITTED",
-            message=f"OPTIMIZED: MediaConvert assembling clips → ECS FFmpeg will add texts"
-        )
+    return MediaConvertJobResponse(
+        job_id=job_id,
+        video_id=video_id,
+        status="SUBMITTED",
+        message=f"OPTIMIZED: MediaConvert assembling clips → ECS FFmpeg will add texts"
+    )
 
+
+@router.post("/generate", response_model=MediaConvertJobResponse, dependencies=[Depends(video_generation_limiter.per_client)])
+@traced("video.generate")
+async def generate_video_mediaconvert(
+    request: MediaConvertRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """🎯 OPTIMIZED: MediaConvert (clips) → ECS FFmpeg (text overlay), interactive lane"""
+    try:
+        return await _submit_mediaconvert_render(request, db, RENDER_PRIORITY_INTERACTIVE)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Video generation failed: {str(e)}")
         logger.error(f"❌ Video generation failed: {str(e)}")
@@ -558,6 +706,54 @@ async def generate_video_mediaconvert(
         )
 
 
+@router.post("/generate-batch", response_model=MediaConvertBatchResponse)
+@traced("video.generate_batch")
+async def generate_video_batch(
+    request: MediaConvertBatchRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk renders (batches, backfills) on the bulk lane.
+
+    The whole batch spends one rate limit token per job up front. Each job
+    is then submitted like /generate (own quota charge and commit) for the
+    current user's videos; a failed job is reported in `failed` without
+    stopping the batch. With fair scheduling on, jobs come back `QUEUED`
+    and start in turn with other accounts' renders.
+    """
+    cost = len(request.jobs)
+    if settings.RATE_LIMIT_ENABLED and video_generation_limiter.rate_per_minute > 0 and cost > video_generation_limiter.burst:
+        # Would never fit in the bucket, whatever the wait
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: at most {video_generation_limiter.burst} jobs per request."
+        )
+    await video_generation_limiter.enforce(f"user:{current_user.id}", response, cost=cost)
+
+    submitted = []
+    failed = []
+    for job in request.jobs:
+        try:
+            submitted.append(await _submit_mediaconvert_render(job, db, RENDER_PRIORITY_BULK, user_id=current_user.id))
+        except HTTPException as e:
+            await db.rollback()
+            failed.append({"video_id": job.video_id, "job_id": job.job_id, "status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Batch video generation failed for video {job.video_id}: {str(e)}")
+            failed.append({
+                "video_id": job.video_id,
+                "job_id": job.job_id,
+                "status_code": 500,
+                "detail": f"Video generation failed: {str(e)}"
+            })
+
+    logger.info(f"📦 Batch render: {len(submitted)} submitted, {len(failed)} failed")
+    return MediaConvertBatchResponse(jobs=submitted, failed=failed)
+
+
 @router.get("/status/{job_id}", response_model=VideoStatusResponse)
 async def get_video_status(
     job_id: str,
@@ -579,3 +775,76 @@ async def get_video_status(
             status_code=500,
             detail=f"Status check failed: {str(e)}"
         )
+
+
+@router.get("/jobs/{job_id}/timeline")
+async def get_render_timeline(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Where a render's time went: stage timings reported by each pipeline component"""
+    render_job = await get_render_job(db, job_id)
+    if not render_job or render_job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Render job not found")
+
+    finished_at = render_job.completed_at or render_job.failed_at
+    return {
+        "job_id": render_job.job_id,
+        "video_id": render_job.video_id,
+        "trace_id": render_job.trace_id,
+        "status": render_job.status,
+        "created_at": render_job.created_at.isoformat() if render_job.created_at else None,
+        "finished_at": finished_at.isoformat() if finished_at else None,
+        "total_ms": int((finished_at - render_job.created_at).total_seconds() * 1000) if finished_at and render_job.created_at else None,
+        "stages": render_job.stage_timeline or [],
+    }
+
+
+@router.get("/events/{job_id}")
+async def stream_video_status(job_id: str, request: Request):
+    """
+    Push video generation status as Server-Sent Events
+
+    Sends one `status` snapshot (same fields as /status/{job_id}), then every
+    state transition published by the AWS/FFmpeg callbacks and worker progress
+    reports. `job_id` may also be a video id. The stream closes once the job
+    is COMPLETED or FAILED. No DB session is held after the snapshot.
+    """
+
+    async def event_stream():
+        # Subscribe before reading the snapshot so no transition is missed in between
+        async with job_event_broker.subscribe(job_id) as queue:
+            snapshot = await get_mediaconvert_job_status(job_id)
+            yield _sse_event("status", snapshot)
+            if snapshot.get("status") in TERMINAL_EVENT_STATUSES:
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + STATUS_STREAM_MAX_SECONDS
+            while loop.time() < deadline:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STATUS_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield _sse_event("status", event)
+                if event.get("status") in TERMINAL_EVENT_STATUSES:
+                    return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -1,6 +1,6 @@
 """Pydantic schemas for video generation"""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 
 
@@ -56,6 +56,16 @@ class MediaConvertJobResponse(BaseModel):
     message: str
 
 
+class MediaConvertBatchRequest(BaseModel):
+    """Bulk renders (batches, backfills), served after interactive renders"""
+    jobs: List[MediaConvertRequest] = Field(..., min_length=1, max_length=50)
+
+
+class MediaConvertBatchResponse(BaseModel):
+    jobs: List[MediaConvertJobResponse]
+    failed: List[Dict[str, Any]]  # video_id, job_id, status_code, detail
+
+
 class VideoStatusResponse(BaseModel):
     """Response schema for video status check"""
     jobId: str
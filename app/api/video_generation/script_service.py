@@ -1,11 +1,10 @@
 """Script generation service for video composition"""
 
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.models.video import Video
+from .asset_resolver import AssetResolver, validate_clip_asset
 
 logger = logging.getLogger(__name__)
 
@@ -13,41 +12,35 @@ logger = logging.getLogger(__name__)
 async def create_script_from_timeline(
     slot_assignments: List[Dict],
     text_overlays: List[Dict],
-    template_clips: List[Dict],
+    template_clips: List[Dict],  # Template.slot_descriptors
     property_id: int,
-    db: AsyncSession
+    db: AsyncSession,
+    user_id: Optional[int] = None
 ) -> Dict:
     """
     Generate custom script from slot assignments exactly like local system
     Reproduces the logic from /hospup/src/app/dashboard/compose/[templateId]/page.tsx:191-229
     """
-    # Get videos for this property to match assignments
+    # Property assets in one query, indexed by id (shared with payload preparation)
+    resolver = AssetResolver.for_session(db, user_id)
     try:
-        videos_result = await db.execute(
-            select(Video).filter(
-                Video.property_id == property_id,
-                Video.status.in_(['uploaded', 'ready', 'completed']),
-                Video.video_type == 'uploaded'
-            )
-        )
-        content_videos = videos_result.scalars().all()
+        content_assets = await resolver.load_property(property_id)
     except Exception as db_error:
-        logger.error(f"❌ Database error fetching videos for property {property_id}: {str(db_error)}")
-        content_videos = []
+        logger.error(f"❌ Database error fetching assets for property {property_id}: {str(db_error)}")
+        content_assets = []
 
-    logger.info(f"📹 Found {len(content_videos)} content videos for property {property_id}")
+    logger.info(f"📹 Found {len(content_assets)} content assets for property {property_id}")
+
+    # Template slots by id, with their position for sorting
+    slot_positions = {clip.get('id'): i for i, clip in enumerate(template_clips)}
+    slots_by_id = {clip.get('id'): clip for clip in template_clips}
 
     # Create clips from assignments
     clips = []
 
-    # Filter and sort assignments by slot order
+    # Filter and sort assignments by template slot order
     valid_assignments = [a for a in slot_assignments if a.get('videoId')]
-
-    # Sort by template clip order
-    valid_assignments.sort(key=lambda a: next(
-        (i for i, clip in enumerate(template_clips) if clip.get('id') == a.get('slotId')),
-        999
-    ))
+    valid_assignments.sort(key=lambda a: slot_positions.get(a.get('slotId'), 999))
 
     logger.info(f"🎬 Processing {len(valid_assignments)} valid slot assignments")
 
@@ -55,25 +48,26 @@ async def create_script_from_timeline(
         slot_id = assignment.get('slotId')
         video_id = assignment.get('videoId')
 
-        # Find corresponding template slot
-        template_slot = next((clip for clip in template_clips if clip.get('id') == slot_id), None)
+        template_slot = slots_by_id.get(slot_id)
+        asset = resolver.get(video_id)
 
-        # Find corresponding video
-        video = next((v for v in content_videos if str(v.id) == str(video_id)), None)
+        if template_slot and asset:
+            duration = template_slot.get('duration', 3)
+            for problem in validate_clip_asset(asset, duration):
+                logger.warning(f"⚠️ Slot {slot_id} asset {asset.id}: {problem}")
 
-        if template_slot and video:
             clip = {
                 'order': index + 1,
-                'duration': template_slot.get('duration', 3),
+                'duration': duration,
                 'description': template_slot.get('description', f'Segment {index + 1}'),
-                'video_url': video.file_url or '',
-                'video_id': str(video.id),
-                'start_time': template_slot.get('start', 0),
-                'end_time': template_slot.get('end', template_slot.get('duration', 3))
+                'video_url': asset.file_url or '',
+                'video_id': str(asset.id),
+                'start_time': template_slot.get('start_time', 0),
+                'end_time': template_slot.get('end_time', template_slot.get('duration', 3))
             }
             clips.append(clip)
 
-            logger.info(f"📋 Clip {index+1}: '{clip['description']}' - {clip['duration']}s - {video.title}")
+            logger.info(f"📋 Clip {index+1}: '{clip['description']}' - {clip['duration']}s - {asset.title}")
         else:
             logger.warning(f"⚠️ Could not create clip for assignment slot:{slot_id} video:{video_id}")
 
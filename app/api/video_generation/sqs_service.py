@@ -3,21 +3,20 @@
 Remplace l'invocation Lambda → MediaConvert
 """
 
-import boto3
 import json
 import logging
 import os
 from typing import List, Dict, Any
 
+from app.infrastructure.aws.clients import get_aws_clients
+
 logger = logging.getLogger(__name__)
 
 # Configuration
 AWS_REGION = os.environ.get('AWS_DEFAULT_REGION', 'eu-west-1')
 SQS_QUEUE_URL = os.environ.get('SQS_QUEUE_URL', 'https://sqs.eu-west-1.amazonaws.com/412655955859/hospup-video-jobs')
 
-sqs_client = boto3.client('sqs', region_name=AWS_REGION)
-
-def send_video_job_to_sqs(
+async def send_video_job_to_sqs(
     property_id: str,
     video_id: str,
     job_id: str,
@@ -64,8 +63,9 @@ def send_video_job_to_sqs(
         logger.info(f"   Queue: {SQS_QUEUE_URL}")
         logger.info(f"   Segments: {len(segments)}, Overlays: {len(text_overlays)}")
 
-        # Envoyer à SQS
-        response = sqs_client.send_message(
+        # Envoyer à SQS (client partagé, non bloquant)
+        response = await get_aws_clients().call(
+            'sqs', 'send_message',
             QueueUrl=SQS_QUEUE_URL,
             MessageBody=json.dumps(job_payload),
             MessageAttributes={
@@ -97,13 +97,15 @@ def send_video_job_to_sqs(
         raise Exception(f"SQS send failed: {str(e)}")
 
 
-def get_queue_depth() -> int:
+async def get_queue_depth() -> int:
     """
     Récupère le nombre de messages en attente dans la queue
     Utile pour monitoring et autoscaling
     """
     try:
-        response = sqs_client.get_queue_attributes(
+        response = await get_aws_clients().call(
+            'sqs', 'get_queue_attributes',
+            timeout=5,
             QueueUrl=SQS_QUEUE_URL,
             AttributeNames=['ApproximateNumberOfMessages']
         )
@@ -7,16 +7,24 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, Optional
 import logging
 import json
 import uuid
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import PageParams, paginate, split_page
 from app.models.video import Video
 from app.auth.dependencies import get_current_user
 from app.models.user import User
+from app.core.tracing import start_span
+from app.services.render_jobs import find_render_job, record_render_stages, render_status_from_callback, transition_render_job, STAGE_PROGRESS, TERMINAL_STATUSES
+from app.services.fair_scheduler import render_scheduler
+from app.services.job_events import build_status_event, publish_job_event
+from app.services.project_content import hydrate_project, hydrate_projects
+from app.services.video_quota import video_quota
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
@@ -42,6 +50,10 @@ class MediaConvertCallback(BaseModel):
     processing_time: Optional[str] = None  # FFmpeg Lambda format
     duration: Optional[float] = None    # FFmpeg Lambda format
     segments_processed: Optional[int] = None  # FFmpeg Lambda format
+    ecs_message_id: Optional[str] = None  # SQS message id du job ECS FFmpeg
+    traceparent: Optional[str] = None  # Contexte de trace W3C propagé par le pipeline
+    timings: Optional[Dict[str, Any]] = None  # {étape: {"start": epoch_s, "end": epoch_s}}
+    source: Optional[str] = None  # Composant émetteur (video-generator, mediaconvert-callback, ecs-worker)
 
 class VideoUpdateRequest(BaseModel):
     """
@@ -127,7 +139,9 @@ async def aws_mediaconvert_callback(
     # Log tous les callbacks pour debugging
     logger.info(f"🔄 AWS CALLBACK RECEIVED: job_id={callback_data.job_id}, status={callback_data.status}")
     logger.info(f"📋 Full callback data: {callback_data.dict()}")
-    return await process_video_callback(callback_data, db)
+    with start_span("render.callback", traceparent=callback_data.traceparent,
+                    status=callback_data.status, job_id=callback_data.job_id, source=callback_data.source):
+        return await process_video_callback(callback_data, db)
 
 # Endpoint séparé pour FFmpeg Lambda (pour éviter les conflits de validation)
 class FFmpegCallback(BaseModel):
@@ -141,6 +155,12 @@ class FFmpegCallback(BaseModel):
     processing_time: Optional[str] = None
     segments_processed: Optional[int] = None
     error: Optional[str] = None
+    mediaconvert_job_id: Optional[str] = None
+    ecs_message_id: Optional[str] = None
+    progress: Optional[int] = None
+    traceparent: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None
+    source: Optional[str] = None
 
     # Extra fields that Lambda might send
     total_duration: Optional[float] = None  # Fallback if duration not set
@@ -167,9 +187,45 @@ async def aws_ffmpeg_callback(
         thumbnail_url=callback_data.thumbnail_url,
         video_id=callback_data.video_id,
         error=callback_data.error,
-        duration=final_duration
+        duration=final_duration,
+        mediaconvert_job_id=callback_data.mediaconvert_job_id,
+        ecs_message_id=callback_data.ecs_message_id,
+        progress=callback_data.progress,
+        traceparent=callback_data.traceparent,
+        timings=callback_data.timings,
+        source=callback_data.source
+    )
+    with start_span("render.callback", traceparent=callback_data.traceparent,
+                    status=callback_data.status, job_id=callback_data.job_id, source=callback_data.source):
+        return await process_video_callback(compat_data, db)
+
+class WorkerProgressEvent(BaseModel):
+    """Progression envoyée par le worker ECS FFmpeg pendant le traitement"""
+    job_id: str
+    video_id: Optional[str] = None
+    stage: str  # downloading, rendering, uploading...
+    progress: Optional[int] = None
+    message: Optional[str] = None
+
+    class Config:
+        extra = "ignore"
+
+@router.post("/worker-progress")
+async def worker_progress_callback(event: WorkerProgressEvent):
+    """
+    📡 Progression du worker: publiée directement aux clients abonnés, sans écriture en base
+    """
+    await publish_job_event(
+        build_status_event(
+            job_id=event.job_id,
+            video_id=event.video_id,
+            status="processing",
+            progress=event.progress,
+            stage=event.stage
+        ),
+        keys=[event.job_id, event.video_id]
     )
-    return await process_video_callback(compat_data, db)
+    return {"status": "success"}
 
 async def process_video_callback(
     callback_data: MediaConvertCallback,
@@ -188,20 +244,22 @@ async def process_video_callback(
     try:
         logger.info(f"🔄 AWS MediaConvert callback received: {callback_data.dict()}")
         
-        # Trouver la vidéo correspondante
-        # On peut utiliser soit video_id (si fourni) soit job_id pour matcher
-        video_query = select(Video)
-
-        if callback_data.video_id:
-            video_query = video_query.where(Video.id == callback_data.video_id)
-        else:
-            # Si pas de video_id, chercher par job_id dans le title ou description
-            video_query = video_query.where(
-                Video.description.contains(callback_data.job_id)
-            )
+        # Retrouver le render job (index unique sur job_id / mediaconvert_job_id)
+        # Locked until commit: concurrent callbacks for one job apply in turn
+        render_job = await find_render_job(
+            db,
+            job_id=callback_data.job_id,
+            mediaconvert_job_id=callback_data.mediaconvert_job_id,
+            video_id=callback_data.video_id,
+            for_update=True
+        )
 
-        result = await db.execute(video_query)
-        video = result.scalar_one_or_none()
+        # Trouver la vidéo correspondante (clé primaire, jamais de recherche dans la description)
+        video = None
+        video_id = callback_data.video_id or (render_job.video_id if render_job else None)
+        if video_id:
+            result = await db.execute(select(Video).where(Video.id == video_id))
+            video = result.scalar_one_or_none()
 
         if not video:
             logger.warning(f"❌ Video not found for job_id: {callback_data.job_id}")
@@ -252,16 +310,43 @@ async def process_video_callback(
             updates["status"] = "completed"
             logger.info(f"✅ Video {video.id} marked as completed with file_url: {updates.get('file_url')}")
 
-        elif callback_data.status == "ERROR":
+        elif callback_data.status in ("ERROR", "FAILED"):
             # Support des deux formats d'erreur
             error_msg = callback_data.error or callback_data.error_message or "Unknown error"
             logger.error(f"❌ Video generation failed for video {video.id}: {error_msg}")
             updates["status"] = "failed"
 
-        elif callback_data.status == "PROGRESSING":
-            logger.info(f"⏳ MediaConvert job progressing for video {video.id}: {callback_data.progress}%")
+        elif callback_data.status in ("PROGRESSING", "POST_PROCESSING", "SUBMITTED"):
+            logger.info(f"⏳ Job {callback_data.status.lower()} for video {video.id}: {callback_data.progress}%")
             updates["status"] = "processing"
-        
+
+        # Mettre à jour le render job (identifiants + état)
+        render_job_changed = False
+        if render_job:
+            if callback_data.mediaconvert_job_id and not render_job.mediaconvert_job_id:
+                render_job.mediaconvert_job_id = callback_data.mediaconvert_job_id
+                render_job_changed = True
+            if callback_data.ecs_message_id and not render_job.ecs_message_id:
+                render_job.ecs_message_id = callback_data.ecs_message_id
+                render_job_changed = True
+
+            # Durées par étape mesurées par le composant (timeline du job)
+            if callback_data.timings and record_render_stages(render_job, callback_data.timings, callback_data.source or "callback"):
+                render_job_changed = True
+
+            new_render_status = render_status_from_callback(callback_data.status)
+            if new_render_status:
+                error_msg = callback_data.error or callback_data.error_message
+                if transition_render_job(render_job, new_render_status, error_message=error_msg):
+                    render_job_changed = True
+                    if new_render_status == "failed":
+                        await video_quota.refund_render_job(db, render_job)
+                    if new_render_status in TERMINAL_STATUSES and settings.FAIR_SCHEDULING_ENABLED:
+                        # Free the tenant's bulk render slot for the next queued render
+                        await render_scheduler.release_tracked(render_job.job_id)
+        else:
+            logger.warning(f"⚠️ No render job found for job_id {callback_data.job_id} (legacy job?)")
+
         # Appliquer les mises à jour
         if updates:
             update_stmt = (
@@ -271,13 +356,32 @@ async def process_video_callback(
             )
 
             await db.execute(update_stmt)
-            await db.commit()
 
+        if updates or render_job_changed:
+            await db.commit()
             logger.info(f"✅ Video {video.id} updated: {updates}")
 
+            # Pousser la transition aux clients abonnés (SSE)
+            job_id = render_job.job_id if render_job else callback_data.job_id
+            progress = STAGE_PROGRESS.get(render_job.status) if render_job else callback_data.progress
+            await publish_job_event(
+                build_status_event(
+                    job_id=job_id,
+                    video_id=video.id,
+                    status=updates.get("status", video.status),
+                    progress=progress,
+                    file_url=updates.get("file_url", video.file_url),
+                    error_message=(callback_data.error or callback_data.error_message) if updates.get("status") == "failed" else None,
+                    stage=render_job.status if render_job else callback_data.status.lower()
+                ),
+                keys=[job_id, video.id]
+            )
+
         return {
             "status": "success",
             "video_id": video.id,
+            "job_id": render_job.job_id if render_job else callback_data.job_id,
+            "render_status": render_job.status if render_job else None,
             "updates_applied": updates,
             "callback_processed_at": datetime.utcnow().isoformat()
         }
@@ -381,19 +485,29 @@ async def get_video(
                 detail="Video not found or access denied"
             )
         
+        project_data = await hydrate_project(db, current_user.id, video.project_data)
+
         return {
             "id": video.id,
             "title": video.title,
+            "project_name": video.project_name,
             "description": video.description,
             "property_id": video.property_id,
             "user_id": video.user_id,
+            "template_id": str(video.template_id) if video.template_id else None,
             "status": video.status,
             "duration": video.duration,
             "file_url": video.file_url,
             "video_url": video.file_url,  # Frontend compatibility
             "thumbnail_url": video.thumbnail_url,
+            "source_type": video.source_type,
+            "generation_method": video.generation_method,
             "created_at": video.created_at.isoformat() if video.created_at else None,
-            "updated_at": video.updated_at.isoformat() if video.updated_at else None
+            "updated_at": video.updated_at.isoformat() if video.updated_at else None,
+            "completed_at": video.completed_at.isoformat() if video.completed_at else None,
+            # Détail : payload complet (les listes ne chargent pas project_data)
+            "project_data": project_data if project_data else None,
+            "contentVideos": project_data.get("contentVideos", []) if project_data else [],
         }
         
     except HTTPException:
@@ -509,6 +623,8 @@ async def duplicate_video(
 
         logger.info(f"✅ Video {video_id} duplicated to {duplicated.id} by user {current_user.id}")
 
+        project_data = await hydrate_project(db, current_user.id, duplicated.project_data)
+
         return {
             "id": duplicated.id,
             "title": duplicated.title,
@@ -527,8 +643,8 @@ async def duplicate_video(
             "created_at": duplicated.created_at.isoformat() if duplicated.created_at else None,
             "updated_at": duplicated.updated_at.isoformat() if duplicated.updated_at else None,
             "completed_at": duplicated.completed_at.isoformat() if duplicated.completed_at else None,
-            "project_data": duplicated.project_data if duplicated.project_data else None,
-            "contentVideos": duplicated.project_data.get("contentVideos", []) if duplicated.project_data else []
+            "project_data": project_data if project_data else None,
+            "contentVideos": project_data.get("contentVideos", []) if project_data else []
         }
 
     except HTTPException:
@@ -543,26 +659,41 @@ async def duplicate_video(
 
 @router.get("/")
 async def list_user_videos(
+    page: PageParams = Depends(),
+    include_project_data: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    📋 Lister toutes les vidéos de l'utilisateur
+    📋 Lister les vidéos de l'utilisateur (plus récentes d'abord, pagination par curseur)
+
+    Réponse {videos, total, next_cursor} comme /assets et /projects :
+    passer next_cursor en ?cursor= pour la page suivante.
+    project_data (JSONB volumineux) n'est chargé que si include_project_data=true ;
+    GET /videos/{video_id} renvoie toujours le payload complet.
     """
     try:
         from ..models.template import Template
-        from sqlalchemy.orm import joinedload
-
-        # Join with templates table to get video_link and audio
-        result = await db.execute(
-            select(Video, Template)
-            .outerjoin(Template, Video.template_id == Template.id)
-            .where(Video.user_id == current_user.id)
-            .order_by(Video.created_at.desc())
-        )
-        rows = result.all()
+        from sqlalchemy.orm import defer
+
+        stmt = select(Video, Template.video_link, Template.audio).outerjoin(
+            Template, Video.template_id == Template.id
+        ).where(Video.user_id == current_user.id)
+        stmt = stmt.options(defer(Video.source_data))
+        if not include_project_data:
+            stmt = stmt.options(defer(Video.project_data))
+
+        # Join with templates table to get video_link and audio (only those two columns)
+        result = await db.execute(paginate(stmt, Video.created_at, Video.id, page))
+        rows, next_cursor = split_page(result.all(), page, lambda row: (row[0].created_at, row[0].id))
+
+        # contentVideos of every listed project hydrated with one asset query
+        if include_project_data:
+            project_datas = await hydrate_projects(db, current_user.id, [row[0].project_data for row in rows])
+        else:
+            project_datas = [None] * len(rows)
 
-        return [
+        videos = [
             {
                 "id": video.id,
                 "title": video.title,
@@ -581,16 +712,17 @@ async def list_user_videos(
                 "created_at": video.created_at.isoformat() if video.created_at else None,
                 "updated_at": video.updated_at.isoformat() if video.updated_at else None,
                 "completed_at": video.completed_at.isoformat() if video.completed_at else None,
-                # Include full project_data for draft projects (contains textOverlays, contentVideos, etc.)
-                "project_data": video.project_data if video.project_data else None,
+                # project_data only on request (contains textOverlays, contentVideos, etc.)
+                "project_data": project_data or None,
                 # Backward compatibility: also expose contentVideos separately
-                "contentVideos": video.project_data.get("contentVideos", []) if video.project_data else [],
+                "contentVideos": (project_data or {}).get("contentVideos", []),
                 # Template data (video_link and audio from associated template)
-                "video_link": template.video_link if template else None,
-                "audio": template.audio if template else None,
+                "video_link": video_link,
+                "audio": audio,
             }
-            for video, template in rows
+            for (video, video_link, audio), project_data in zip(rows, project_datas)
         ]
+        return {"videos": videos, "total": len(videos), "next_cursor": next_cursor}
 
     except Exception as e:
         logger.error(f"❌ Error listing videos for user {current_user.id}: {str(e)}")
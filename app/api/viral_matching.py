@@ -3,7 +3,7 @@ API endpoints for viral video matching and reconstruction.
 Adapted for Railway/Supabase cloud architecture with OpenAI GPT intelligence.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 import uuid
@@ -12,10 +12,12 @@ import logging
 
 from app.auth.dependencies import get_current_user
 from app.core.database import get_db
+from app.core.rate_limit import ai_limiter
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.models.template import Template
 from app.services.ai_matching_service import ai_matching_service
+from app.services.template_catalog import template_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -50,67 +52,48 @@ class SmartMatchRequest(BaseModel):
 
 # Supabase-powered viral templates system
 # Templates are now stored in Supabase database and accessed via Template model
+def _catalog_response(request: Request, body: bytes, etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Pre-rendered JSON with a strong ETag; 304 when the client already has it"""
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/viral-templates")
 async def list_viral_templates(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
+    country: Optional[str] = Query(None, description="Filter by country (case-insensitive)"),
+    property_type: Optional[str] = Query(None, description="Filter by property type (case-insensitive)"),
+    min_views: Optional[int] = Query(None, ge=0, description="Minimum views"),
+    slots: Optional[int] = Query(None, ge=0, description="Exact number of slots"),
+    min_duration: Optional[float] = Query(None, ge=0, description="Minimum total slot duration (seconds)"),
+    max_duration: Optional[float] = Query(None, ge=0, description="Maximum total slot duration (seconds)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all templates if omitted)"),
+    offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    List all available viral video templates from Supabase database - ASYNC VERSION
+    List viral video templates, most viewed first - served from the template catalog cache.
+
+    The total number of matching templates is returned in X-Total-Count.
     """
     try:
-        logger.info(f"📚 Fetching viral templates from Supabase (category: {category})")
-
-        from sqlalchemy import select
+        body, etag, total = await template_catalog.list_page(
+            db,
+            country=country,
+            property_type=property_type,
+            min_views=min_views,
+            slots=slots,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            limit=limit,
+            offset=offset
+        )
+        return _catalog_response(request, body, etag, {"X-Total-Count": str(total)})
 
-        # Get all templates from Supabase, ordered by views descending - ASYNC QUERY
-        stmt = select(Template).order_by(Template.views.desc())
-        result = await db.execute(stmt)
-        templates_db = result.scalars().all()
-
-        logger.info(f"📊 Found {len(templates_db)} templates in Supabase")
-
-        # Debug: log the first template raw data
-        if templates_db:
-            first_template = templates_db[0]
-            logger.info(f"🔍 First template debug: id={first_template.id}, hotel_name='{first_template.hotel_name}', views={first_template.views}")
-
-        result_templates = []
-        for template in templates_db:
-            try:
-                # Handle JSONB script field safely - parse if it's a string with == prefix
-                script_data = template.script
-                if script_data is None:
-                    script_data = {}
-                elif isinstance(script_data, str):
-                    # Handle string format with == prefix
-                    clean_script = script_data.strip()
-                    while clean_script.startswith('='):
-                        clean_script = clean_script[1:].strip()
-                    try:
-                        import json
-                        script_data = json.loads(clean_script)
-                    except json.JSONDecodeError:
-                        script_data = {}
-
-                # Use to_dict() which handles all fields correctly
-                template_dict = template.to_dict()
-
-                # Add computed duration range fields
-                duration = float(template.duration) if template.duration else 30.0
-                template_dict["total_duration_min"] = max(15.0, duration - 5)
-                template_dict["total_duration_max"] = min(60.0, duration + 10)
-                result_templates.append(template_dict)
-                logger.info(f"✅ Processed template: {template.hotel_name} ({template.country})")
-            except Exception as template_error:
-                logger.error(f"❌ Error processing template {template.id}: {str(template_error)}")
-                logger.error(f"🔍 Template data: hotel_name={template.hotel_name}, views={template.views}, likes={template.likes}")
-                continue
-
-        logger.info(f"🎯 Returning {len(result_templates)} processed templates")
-        return result_templates
-            
     except Exception as e:
         logger.error(f"❌ Error listing templates from Supabase: {str(e)}")
         import traceback
@@ -120,56 +103,20 @@ async def list_viral_templates(
 @router.get("/viral-templates/{template_id}")
 async def get_viral_template(
     template_id: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get a specific viral video template from Supabase - ASYNC VERSION
+    Get a specific viral video template - served from the template catalog cache
     """
     try:
-        logger.info(f"🔍 Fetching template {template_id} from Supabase")
-
-        from sqlalchemy import select
-
-        # Query template from Supabase database - ASYNC QUERY
-        stmt = select(Template).where(
-            Template.id == template_id,
-        )
-        result = await db.execute(stmt)
-        template = result.scalars().first()
-
-        if not template:
+        rendered = await template_catalog.detail(db, template_id)
+        if not rendered:
             raise HTTPException(status_code=404, detail="Template not found")
 
-        # Handle JSONB script field safely - parse if it's a string with == prefix
-        script_data = template.script
-        if script_data is None:
-            script_data = {}
-        elif isinstance(script_data, str):
-            # Handle string format with == prefix
-            clean_script = script_data.strip()
-            while clean_script.startswith('='):
-                clean_script = clean_script[1:].strip()
-            try:
-                import json
-                script_data = json.loads(clean_script)
-            except json.JSONDecodeError:
-                script_data = {}
-
-        # Log basic template info
-        if script_data and 'clips' in script_data:
-            logger.info(f"📋 Template {template.hotel_name} has {len(script_data['clips'])} clips")
-
-        # Use to_dict() which handles all fields correctly
-        template_dict = template.to_dict()
-
-        # Override script with parsed version and add duration range fields
-        template_dict["script"] = script_data
-        duration = float(template.duration) if template.duration else 30.0
-        template_dict["total_duration_min"] = max(15.0, duration - 5)
-        template_dict["total_duration_max"] = min(60.0, duration + 10)
-
-        return template_dict
+        body, etag = rendered
+        return _catalog_response(request, body, etag)
 
     except HTTPException:
         raise
@@ -177,7 +124,7 @@ async def get_viral_template(
         logger.error(f"❌ Error getting template from Supabase: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting template: {str(e)}")
 
-@router.post("/smart-match", response_model=ViralTemplateResponse)
+@router.post("/smart-match", response_model=ViralTemplateResponse, dependencies=[Depends(ai_limiter.per_user)])
 async def smart_match_template(
     request: SmartMatchRequest,
     db: AsyncSession = Depends(get_db),
@@ -201,19 +148,15 @@ async def smart_match_template(
         if not property:
             raise HTTPException(status_code=404, detail="Property not found")
 
-        # Get available templates from Supabase database - ASYNC QUERY
-        if request.exclude_template_id:
-            stmt = stmt.where(Template.id != request.exclude_template_id)
-
-        result = await db.execute(stmt)
-        templates_db = result.scalars().all()
+        # Available templates from the catalog cache (already in dict format for the AI service)
+        available_templates = [
+            template for template in await template_catalog.templates(db)
+            if template["id"] != request.exclude_template_id
+        ]
 
-        if not templates_db:
+        if not available_templates:
             raise HTTPException(status_code=404, detail="No viral templates available")
 
-        # Convert to dict format for AI service compatibility
-        available_templates = [template.to_dict() for template in templates_db]
-
         # 🧠 AI-POWERED MATCHING using OpenAI GPT + intelligent fallback
         logger.info(f"🔍 Smart matching for: '{request.user_description}' (property: {property.name})")
 
@@ -274,13 +217,7 @@ async def get_viral_matching_stats(
         result = await db.execute(stmt)
         templates = result.scalars().all()
         total_views = sum(t.views or 0 for t in templates)
-        total_clips = 0
-
-        # Count clips in scripts
-        for template in templates:
-            if template.script and isinstance(template.script, dict):
-                clips = template.script.get('clips', [])
-                total_clips += len(clips)
+        total_clips = sum(t.slots or 0 for t in templates)
 
         return {
             "viral_templates": {
@@ -413,6 +350,7 @@ async def seed_templates(
             db.add(new_template)
 
         await db.commit()
+        await template_catalog.invalidate()
 
         return {
             "status": "success",
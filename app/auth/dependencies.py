@@ -6,9 +6,11 @@ from sqlalchemy.exc import TimeoutError as SQLTimeoutError, DisconnectionError
 import asyncio
 import structlog
 
+from ..core.config import settings
 from ..core.database import get_db
 from ..models.user import User
 from .security import verify_access_token
+from .user_cache import user_cache
 
 logger = structlog.get_logger(__name__)
 
@@ -52,6 +54,13 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
+    # Cached user: requests that need nothing else from the DB never take a connection
+    cache_version = None
+    if settings.USER_CACHE_ENABLED:
+        user, cache_version = await user_cache.get(int(user_id))
+        if user is not None:
+            return user
+
     # Get user from database with timeout and retry handling
     max_retries = 2
     retry_count = 0
@@ -99,6 +108,9 @@ async def get_current_user(
             detail="User not found"
         )
     
+    if settings.USER_CACHE_ENABLED:
+        await user_cache.set(user, cache_version)
+
     # DEBUG: Log successful authentication
     logger.info("Authentication successful", 
                user_id=user.id, 
@@ -114,6 +126,6 @@ async def get_current_user_optional(
 ) -> Optional[User]:
     """Get current user if authenticated, otherwise return None"""
     try:
-        return await get_current_user(access_token, db)
+        return await get_current_user(access_token, None, db)
     except HTTPException:
         return None
\ No newline at end of file
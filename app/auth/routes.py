@@ -3,7 +3,6 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie,
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import redis
 import structlog
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
@@ -11,6 +10,8 @@ import secrets
 
 from ..core.database import get_db
 from ..core.config import settings
+from ..core.rate_limit import check_fixed_window
+from ..core.redis import get_redis
 from ..models.user import User
 from .security import verify_password, get_password_hash, create_access_token, create_refresh_token, verify_refresh_token
 from .schemas import UserCreate, UserLogin, AuthResponse, UserResponse, TokenResponse
@@ -19,19 +20,10 @@ from .dependencies import get_current_user
 router = APIRouter(prefix="/auth", tags=["authentication"])
 logger = structlog.get_logger(__name__)
 
-# Rate limiting using Redis
-def check_rate_limit(key: str, max_attempts: int = 5, window_seconds: int = 300) -> bool:
+# Rate limiting using the shared Redis pool
+async def check_rate_limit(key: str, max_attempts: int = 5, window_seconds: int = 300) -> bool:
     """Check if rate limit exceeded"""
-    try:
-        redis_client = redis.from_url(settings.REDIS_URL)
-        current = redis_client.incr(key)
-        if current == 1:
-            redis_client.expire(key, window_seconds)
-        redis_client.close()
-        return current <= max_attempts
-    except Exception as e:
-        logger.warning("Rate limit check failed", error=str(e))
-        return True  # Allow if Redis is down
+    return await check_fixed_window(key, max_attempts, window_seconds)
 
 @router.post("/register", response_model=AuthResponse)
 async def register(
@@ -43,7 +35,7 @@ async def register(
     
     # Rate limiting
     rate_limit_key = f"register:{user_data.email}"
-    if not check_rate_limit(rate_limit_key, max_attempts=3):
+    if not await check_rate_limit(rate_limit_key, max_attempts=3):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many registration attempts. Please try again later."
@@ -264,9 +256,7 @@ async def google_login(request: Request):
 
     # Store state in Redis with 10 minute expiry
     try:
-        redis_client = redis.from_url(settings.REDIS_URL)
-        redis_client.setex(f"oauth_state:{state}", 600, "valid")
-        redis_client.close()
+        await get_redis().setex(f"oauth_state:{state}", 600, "valid")
     except Exception as e:
         logger.warning("Failed to store OAuth state", error=str(e))
 
@@ -294,10 +284,7 @@ async def google_callback(
 
     # Verify state token
     try:
-        redis_client = redis.from_url(settings.REDIS_URL)
-        stored_state = redis_client.get(f"oauth_state:{state}")
-        redis_client.delete(f"oauth_state:{state}")
-        redis_client.close()
+        stored_state = await get_redis().getdel(f"oauth_state:{state}")
 
         if not stored_state:
             raise HTTPException(
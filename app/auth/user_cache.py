@@ -0,0 +1,209 @@
+"""
+Two-tier cache of authenticated users
+
+get_current_user runs on every authenticated request; with a small DB pool
+the user lookup alone competed with real queries. Users are now cached:
+
+- in process: a small LRU with a TTL of a few seconds (no I/O on a hit)
+- in Redis: `user_cache:data:{id}`, stamped with the per-user version
+  `user_cache:version:{id}` and read together with it in one MGET
+
+invalidate() bumps the version, so every process stops trusting the
+Redis copy immediately and a refill racing with the change is discarded;
+other processes' local copies expire within USER_CACHE_LOCAL_TTL_SECONDS.
+ORM commits that touch a User (plan or profile changes) invalidate it
+automatically; writes made outside the ORM are bounded by the TTLs.
+
+Cached users are detached instances holding the columns below (no password
+hash, no relationships): enough for ids, quotas and /auth/me.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..core.config import settings
+from ..core.redis import get_redis
+from ..models.user import User
+
+logger = structlog.get_logger(__name__)
+
+VERSION_KEY_PREFIX = "user_cache:version:"
+DATA_KEY_PREFIX = "user_cache:data:"
+
+CACHED_COLUMNS = (
+    "id",
+    "email",
+    "plan_type",
+    "properties_purchased",
+    "custom_properties_limit",
+    "custom_monthly_videos",
+    "created_at",
+    "updated_at",
+)
+_DATETIME_COLUMNS = ("created_at", "updated_at")
+
+
+def _user_fields(user: User) -> Dict[str, Any]:
+    return {column: getattr(user, column) for column in CACHED_COLUMNS}
+
+
+def _build_user(fields: Dict[str, Any]) -> User:
+    """Fresh detached User per request, so callers never share an instance"""
+    user = User(**fields)
+    make_transient_to_detached(user)
+    return user
+
+
+def _encode(fields: Dict[str, Any], version: str) -> str:
+    data = {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in fields.items()}
+    return json.dumps({"version": version, "user": data})
+
+
+def _decode(raw: str) -> Tuple[str, Dict[str, Any]]:
+    payload = json.loads(raw)
+    fields = payload["user"]
+    for column in _DATETIME_COLUMNS:
+        if fields.get(column):
+            fields[column] = datetime.fromisoformat(fields[column])
+    return str(payload["version"]), fields
+
+
+class UserCache:
+    """In-process LRU in front of a versioned Redis copy"""
+
+    def __init__(self, max_entries: int, local_ttl_seconds: float, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.local_ttl_seconds = local_ttl_seconds
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> Tuple[Optional[User], Optional[str]]:
+        """
+        Cached user (or None) and the version to stamp a refill with.
+
+        The version is None when Redis is unavailable; the refill then only
+        goes to the local tier.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.local_hits += 1
+                return _build_user(entry[1]), None
+            self._entries.pop(user_id, None)
+
+        try:
+            version, raw = await get_redis().mget(
+                f"{VERSION_KEY_PREFIX}{user_id}", f"{DATA_KEY_PREFIX}{user_id}"
+            )
+        except Exception as e:
+            logger.warning("User cache read failed", user_id=user_id, error=str(e))
+            self.misses += 1
+            return None, None
+
+        version = version or "0"
+        if raw:
+            try:
+                cached_version, fields = _decode(raw)
+                if cached_version == version:
+                    self._set_local(user_id, fields)
+                    self.redis_hits += 1
+                    return _build_user(fields), version
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Discarding unreadable cached user", user_id=user_id, error=str(e))
+
+        self.misses += 1
+        return None, version
+
+    async def set(self, user: User, version: Optional[str]) -> None:
+        """Cache a user just loaded from the database under the version read before the load"""
+        fields = _user_fields(user)
+        self._set_local(user.id, fields)
+        if version is None:
+            return
+        try:
+            await get_redis().set(f"{DATA_KEY_PREFIX}{user.id}", _encode(fields, version), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning("User cache write failed", user_id=user.id, error=str(e))
+
+    async def invalidate(self, user_id: int) -> None:
+        """Call after changing a user outside the ORM (plan, limits, profile)"""
+        self.discard_local(user_id)
+        try:
+            redis = get_redis()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(f"{VERSION_KEY_PREFIX}{user_id}")
+                pipe.delete(f"{DATA_KEY_PREFIX}{user_id}")
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("User cache invalidation failed", user_id=user_id, error=str(e))
+
+    def discard_local(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+    def _set_local(self, user_id: int, fields: Dict[str, Any]) -> None:
+        self._entries[user_id] = (time.monotonic() + self.local_ttl_seconds, fields)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Global cache shared by all requests of this process
+user_cache = UserCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    local_ttl_seconds=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+_PENDING_KEY = "user_cache_invalidate"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = {
+        obj.id for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        user_cache.discard_local(user_id)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync sessions (workers) have no loop: the Redis copy expires with its TTL
+        return
+    for user_id in user_ids:
+        loop.create_task(user_cache.invalidate(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
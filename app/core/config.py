@@ -89,6 +89,59 @@ class Settings(BaseSettings):
     S3_SECRET_ACCESS_KEY: str = ""
     S3_ENDPOINT_URL: Optional[str] = None
     STORAGE_PUBLIC_BASE: str = "https://s3.eu-west-1.amazonaws.com/hospup-files"
+    S3_PRESIGN_CACHE_MAX_ENTRIES: int = 20000  # Cached presigned GET URLs per process
+    S3_PRESIGN_MAX_EXPIRES_SECONDS: int = 86400  # Upper bound accepted from clients
+    S3_PRESIGN_BATCH_MAX_KEYS: int = 500  # Keys per batch signing request
+
+    # Multipart uploads (large videos, parallel + resumable)
+    MULTIPART_PART_SIZE_MB: int = 16
+    MULTIPART_MAX_FILE_SIZE_MB: int = 10240
+    MULTIPART_MAX_PARTS_PER_REQUEST: int = 100  # Part URLs signed per call
+    MULTIPART_PART_URL_EXPIRES_SECONDS: int = 3600
+    MULTIPART_UPLOAD_TTL_HOURS: int = 24  # Older unfinished uploads are aborted
+    MULTIPART_SWEEP_INTERVAL_SECONDS: int = 3600
+
+    # Server-side streaming of /assets/upload (peak memory ~ (concurrency + 1) * part size)
+    ASSET_UPLOAD_PART_SIZE_MB: int = 8  # S3 minimum is 5MB
+    ASSET_UPLOAD_MAX_CONCURRENCY: int = 4
+
+    # === UPLOAD INGEST (S3 notifications) ===
+    INGEST_EVENTS_ENABLED: bool = False  # /upload/complete no longer ingests when on
+    INGEST_QUEUE_URL: Optional[str] = None
+    INGEST_MAX_CONCURRENCY: int = 4  # Analyses run in parallel per consumer
+    INGEST_VISIBILITY_TIMEOUT_SECONDS: int = 900
+    INGEST_STALE_PROCESSING_MINUTES: int = 30  # Reclaim 'processing' assets after a crash
+
+    # === FAIR SCHEDULING (per-tenant DRR for bulk renders and ingest) ===
+    FAIR_SCHEDULING_ENABLED: bool = False
+    FAIR_SCHEDULER_QUANTUM: int = 1  # Credit per round; a render costs 1, an upload 1 per 100MB
+    FAIR_SCHEDULER_TENANT_MAX_RENDERS: int = 5  # Soft: exceeded only when no other tenant waits
+    FAIR_SCHEDULER_MAX_RENDERS_IN_FLIGHT: int = 20  # Bulk renders submitted and not finished
+    FAIR_SCHEDULER_RENDER_LEASE_SECONDS: int = 1800  # Slot freed if the render callback never comes
+    FAIR_SCHEDULER_DISPATCH_INTERVAL_SECONDS: float = 2.0
+    FAIR_SCHEDULER_TENANT_MAX_INGEST: int = 2  # Analyses per tenant across consumers (soft)
+    FAIR_SCHEDULER_INGEST_LEASE_SECONDS: int = 2400  # Longer than INGEST_STALE_PROCESSING_MINUTES: a requeued upload can reclaim its asset
+    FAIR_SCHEDULER_INGEST_COST_MB: int = 100
+
+    # === TEMPLATE CATALOG CACHE ===
+    TEMPLATE_CATALOG_VERSION_CHECK_SECONDS: float = 5.0  # How stale a process may serve the catalog
+    TEMPLATE_CATALOG_CHANGE_CHECK_SECONDS: int = 60  # Fingerprint poll for writes made outside the API
+    TEMPLATE_CATALOG_LOCAL_TTL_SECONDS: int = 300  # Rebuild interval when Redis is unavailable
+
+    # === AUTHENTICATED USER CACHE ===
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL_SECONDS: int = 60  # Redis copy, versioned per user
+    USER_CACHE_LOCAL_TTL_SECONDS: float = 5.0  # In-process copy (bounds cross-process staleness)
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # === HEALTH PROBES ===
+    HEALTH_PROBE_INTERVAL_SECONDS: int = 15  # Background DB / Redis / S3 / queue probes for /readyz
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 5.0
+    HEALTH_STALE_AFTER_SECONDS: int = 60  # /readyz fails if probes stopped running
+
+    # === PAGINATION ===
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 200
 
     # === EXTERNAL APIS ===
     OPENAI_API_KEY: str
@@ -96,11 +149,26 @@ class Settings(BaseSettings):
     OPENAI_MAX_TOKENS: int = 2000
     OPENAI_TEMPERATURE: float = 0.7
 
+    # === AI RESPONSE CACHE ===
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 3600  # 1 hour
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_TEMPERATURE_BUCKET: float = 0.1
+    LLM_CACHE_LOCK_WAIT_SECONDS: float = 60.0  # Followers then call OpenAI themselves
+
     # === AWS LAMBDA ===
     AWS_REGION: str = "eu-west-1"
     AWS_LAMBDA_FUNCTION_NAME: str = "hospup-video-generator"
     AWS_LAMBDA_TIMEOUT: int = 900  # 15 minutes
 
+    # === AWS CLIENTS (async facade) ===
+    AWS_EXECUTOR_MAX_WORKERS: int = 32  # Threads running blocking boto3 calls
+    AWS_MAX_POOL_CONNECTIONS: int = 50  # Keep-alive connections per client
+    AWS_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AWS_READ_TIMEOUT_SECONDS: float = 60.0
+    AWS_CALL_TIMEOUT_SECONDS: float = 30.0  # Default per-call timeout
+    AWS_TRANSFER_TIMEOUT_SECONDS: float = 600.0  # Uploads/downloads of media files
+
     # === AWS MEDIACONVERT ===
     AWS_MEDIACONVERT_ENDPOINT: Optional[str] = None
     MEDIACONVERT_ENDPOINT: Optional[str] = None
@@ -110,12 +178,20 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_DEFAULT: int = 1000  # per hour
     RATE_LIMIT_VIDEO_GENERATION: int = 5  # per minute
-    RATE_LIMIT_BURST_SIZE: int = 10
+    RATE_LIMIT_BURST_SIZE: int = 10  # Generation requests allowed back to back
+    RATE_LIMIT_AI: int = 30  # per minute (smart matching, captions)
+    RATE_LIMIT_AI_BURST_SIZE: int = 10
+    TRUSTED_PROXY_HOPS: int = 1  # Proxies appending to X-Forwarded-For (Railway edge); 0 = ignore the header
 
     # === MONITORING ===
     HEALTH_CHECK_ENABLED: bool = True
     METRICS_ENABLED: bool = True
     SENTRY_DSN: Optional[str] = None
+    TRACING_ENABLED: bool = True
+    TRACE_EXPORT_PATH: Optional[str] = None  # JSON lines of OTLP spans (tests/local); logged when unset
+    REQUEST_TIMING_ENABLED: bool = False  # Server-Timing header + per-request timing logs
+    REQUEST_TIMING_SLOW_MS: int = 1000
+    REQUEST_TIMING_SLOW_SAMPLE_RATE: float = 1.0  # Share of slow requests logged with their statements
 
     # === EMAIL (NOTIFICATIONS) ===
     SMTP_HOST: Optional[str] = None
@@ -130,6 +206,9 @@ class Settings(BaseSettings):
     MAX_VIDEOS_PER_USER_PRO: int = 50
     MAX_PROPERTIES_PER_USER: int = 10
     MAX_FILE_SIZE_MB: int = 100
+    VIDEO_QUOTA_ENABLED: bool = True
+    VIDEO_QUOTA_KEY_TTL_SECONDS: int = 40 * 24 * 3600  # Monthly counters outlive their month
+    VIDEO_QUOTA_RECONCILE_INTERVAL_SECONDS: int = 300
 
     def __init__(self, **kwargs):
         # Clean environment variables before validation
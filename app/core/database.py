@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from sqlalchemy import create_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
+from .metrics import TimedQueuePool
 import structlog
 
 # Create declarative base for models
@@ -38,6 +40,7 @@ else:
 engine = create_async_engine(
     sqlalchemy_url,
     echo=False,
+    poolclass=TimedQueuePool if settings.METRICS_ENABLED else AsyncAdaptedQueuePool,
     pool_size=2,  # Only async pool - no more dual sync+async pools
     max_overflow=0,  # No overflow - strict limit
     pool_pre_ping=True,
@@ -1,12 +1,19 @@
 """
-Database health check utilities
+Database health check utilities and background readiness probes
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from datetime import datetime
+from typing import Dict, Optional, Tuple
 import asyncio
+import time
 import structlog
 
+from .config import settings
 from .database import AsyncSessionLocal
+from .metrics import set_render_queue_depth
+from .redis import get_redis
+from ..infrastructure.aws.clients import get_aws_clients
 
 logger = structlog.get_logger(__name__)
 
@@ -51,4 +58,106 @@ async def check_database_health() -> dict:
         health_status["database"]["error"] = error_msg
         logger.error(error_msg, exception=str(e))
     
-    return health_status
\ No newline at end of file
+    return health_status
+
+async def _timed(probe) -> dict:
+    """Run a probe with the shared timeout; returns status, latency_ms and error"""
+    start_time = asyncio.get_event_loop().time()
+    try:
+        details = await asyncio.wait_for(probe(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS) or {}
+        status = "healthy"
+        error = None
+    except asyncio.TimeoutError:
+        details, status, error = {}, "unhealthy", "timeout"
+    except Exception as e:
+        details, status, error = {}, "unhealthy", str(e)[:100]
+    latency_ms = round((asyncio.get_event_loop().time() - start_time) * 1000, 2)
+    return {"status": status, "latency_ms": latency_ms, "error": error, **details}
+
+
+async def _probe_database() -> dict:
+    async with AsyncSessionLocal() as db:
+        (await db.execute(text("SELECT 1"))).fetchone()
+    return {}
+
+
+async def _probe_redis() -> dict:
+    await get_redis().ping()
+    return {}
+
+
+async def _probe_s3() -> dict:
+    await get_aws_clients().call('s3', 'head_bucket', timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS, Bucket=settings.bucket_name)
+    return {}
+
+
+async def _probe_queue() -> dict:
+    from app.api.video_generation.sqs_service import get_queue_depth
+
+    depth = await get_queue_depth()
+    set_render_queue_depth(depth)
+    if depth < 0:
+        raise RuntimeError("queue depth unavailable")
+    return {"depth": depth}
+
+
+class HealthMonitor:
+    """
+    Readiness probes run in the background, served from memory.
+
+    /readyz and /health only read the last snapshot, so load balancer
+    traffic costs no I/O. The database and Redis are required for
+    readiness; S3 and the render queue only degrade the status. A snapshot
+    older than HEALTH_STALE_AFTER_SECONDS (probe loop stuck) is not ready.
+    """
+
+    REQUIRED = ("database", "redis")
+    PROBES = {
+        "database": _probe_database,
+        "redis": _probe_redis,
+        "s3": _probe_s3,
+        "queue": _probe_queue,
+    }
+
+    def __init__(self):
+        self._components: Dict[str, dict] = {}
+        self._checked_at: Optional[float] = None
+        self._checked_at_iso: Optional[str] = None
+
+    async def run_probes(self) -> None:
+        names = list(self.PROBES)
+        results = await asyncio.gather(*(_timed(self.PROBES[name]) for name in names))
+        self._components = dict(zip(names, results))
+        self._checked_at = time.monotonic()
+        self._checked_at_iso = datetime.utcnow().isoformat()
+
+        unhealthy = [name for name, result in self._components.items() if result["status"] != "healthy"]
+        if unhealthy:
+            logger.warning("Health probes failing", components=unhealthy)
+
+    def snapshot(self) -> Tuple[bool, dict]:
+        """(ready, report) from the last probe run"""
+        if self._checked_at is None:
+            return False, {"status": "starting", "components": {}, "checked_at": None}
+
+        age = time.monotonic() - self._checked_at
+        required_ok = all(self._components.get(name, {}).get("status") == "healthy" for name in self.REQUIRED)
+        all_ok = all(result["status"] == "healthy" for result in self._components.values())
+        ready = required_ok and age <= settings.HEALTH_STALE_AFTER_SECONDS
+
+        if not ready:
+            status = "unhealthy"
+        elif all_ok:
+            status = "healthy"
+        else:
+            status = "degraded"
+        return ready, {
+            "status": status,
+            "components": self._components,
+            "checked_at": self._checked_at_iso,
+            "age_seconds": round(age, 1),
+        }
+
+
+# Global monitor, probed by a periodic task started in the application lifespan
+health_monitor = HealthMonitor()
@@ -0,0 +1,115 @@
+"""
+Prometheus metrics for the API
+
+Served on GET /metrics when METRICS_ENABLED (single uvicorn process, so the
+default registry is enough):
+
+- hospup_http_request_duration_seconds{method, route, status}: route is the
+  path template (`/api/v1/videos/{video_id}`), never the raw URL
+- hospup_db_pool_*: connections checked out / overflow / pool size, read at
+  scrape time, and how long checkouts waited for a free connection
+- hospup_openai_request_duration_seconds{operation} and
+  hospup_openai_rate_limited_total{operation} (HTTP 429)
+- hospup_render_queue_depth: set by the background queue health probe, so
+  scrapes cost no SQS call
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import structlog
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = structlog.get_logger(__name__)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "hospup_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge("hospup_db_pool_checked_out", "Database connections in use")
+DB_POOL_OVERFLOW = Gauge("hospup_db_pool_overflow", "Database connections opened beyond pool_size")
+DB_POOL_SIZE = Gauge("hospup_db_pool_size", "Configured database pool size")
+DB_POOL_WAIT_SECONDS = Histogram(
+    "hospup_db_pool_wait_seconds",
+    "Time spent waiting for a database connection",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5),
+)
+OPENAI_REQUEST_SECONDS = Histogram(
+    "hospup_openai_request_duration_seconds",
+    "OpenAI completion latency",
+    ["operation"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+OPENAI_RATE_LIMITED = Counter(
+    "hospup_openai_rate_limited_total",
+    "OpenAI calls rejected with HTTP 429",
+    ["operation"],
+)
+RENDER_QUEUE_DEPTH = Gauge("hospup_render_queue_depth", "Messages waiting in the render SQS queue")
+
+_UNMATCHED_ROUTE = "unmatched"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool recording how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+
+def set_render_queue_depth(depth: int) -> None:
+    if depth >= 0:
+        RENDER_QUEUE_DEPTH.set(depth)
+
+
+@contextmanager
+def track_openai(operation: str) -> Iterator[None]:
+    """Record the latency of one OpenAI call and count 429 responses"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        if getattr(e, "status_code", None) == 429:
+            OPENAI_RATE_LIMITED.labels(operation=operation).inc()
+        raise
+    finally:
+        OPENAI_REQUEST_SECONDS.labels(operation=operation).observe(time.perf_counter() - start)
+
+
+def install_metrics(app: FastAPI, engine: AsyncEngine) -> None:
+    """Add the latency middleware and the /metrics endpoint (call only when METRICS_ENABLED)"""
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                method=request.method,
+                route=getattr(route, "path", _UNMATCHED_ROUTE),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        pool = engine.sync_engine.pool
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        DB_POOL_SIZE.set(pool.size())
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+    logger.info("Prometheus metrics enabled", path="/metrics")
@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination
+
+Lists are ordered by (sort column DESC, id DESC) and continue from an opaque
+cursor holding the last row's values, so every page is one index range scan
+of `limit + 1` rows, however deep the client scrolls. Pair each list with a
+composite index ending in (sort column DESC, id DESC).
+
+Rows with a NULL sort value come first, as in the index (DESC is NULLS
+FIRST in Postgres), and are paged by id alone.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, and_, or_, tuple_
+
+from .config import settings
+
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints (`?limit=&cursor=`)"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, description="Page size"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+    ):
+        self.limit = min(limit or settings.PAGINATION_DEFAULT_LIMIT, settings.PAGINATION_MAX_LIMIT)
+        self.cursor = cursor
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: Any) -> str:
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if row_id is None:
+            raise ValueError("cursor without id")
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(stmt: Select, sort_column, id_column, page: PageParams) -> Select:
+    """Order newest first and continue after the cursor; fetches one extra row to detect more pages"""
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor)
+        if sort_value is None:
+            # Still in the NULL block: its remaining rows, then every dated row
+            stmt = stmt.where(or_(
+                and_(sort_column.is_(None), id_column < row_id),
+                sort_column.isnot(None)
+            ))
+        else:
+            stmt = stmt.where(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    return stmt.order_by(sort_column.desc().nulls_first(), id_column.desc()).limit(page.limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any],
+    page: PageParams,
+    key: Callable[[Any], Tuple[Optional[datetime], Any]]
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row and build the cursor of the next page (None on the last page)"""
+    items = list(rows[:page.limit])
+    if len(rows) <= page.limit or not items:
+        return items, None
+    return items, encode_cursor(*key(items[-1]))
@@ -0,0 +1,91 @@
+"""
+Periodic background jobs
+
+Small housekeeping loops (sweepers, probes, reconciliation) started in the
+application lifespan. Each job runs on its own asyncio task; failures are
+logged and retried on the next tick instead of killing the loop.
+"""
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, List, Optional
+
+import structlog
+
+from .redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run an async callable every `interval` seconds.
+
+    With `lock_key`, a Redis lock (SET NX EX) ensures only one API process
+    runs a given tick, which is what cluster-wide sweepers want.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        initial_delay: float = 0.0,
+        lock_key: Optional[str] = None
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.lock_key = lock_key
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name=f"periodic:{self.name}")
+            logger.info("Periodic task started", task=self.name, interval=self.interval)
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        # Jitter the first run so several workers do not fire together
+        await asyncio.sleep(self.initial_delay + random.uniform(0, min(self.interval, 5.0)))
+        while True:
+            try:
+                if await self._acquire():
+                    await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Periodic task failed", task=self.name, error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def _acquire(self) -> bool:
+        if not self.lock_key:
+            return True
+        # Held for (almost) one interval: the next tick on any process may run again
+        ttl = max(int(self.interval * 0.9), 1)
+        return bool(await get_redis().set(self.lock_key, self.name, nx=True, ex=ttl))
+
+
+_tasks: List[PeriodicTask] = []
+
+
+def register_periodic_task(task: PeriodicTask) -> PeriodicTask:
+    """Start a task and keep it for shutdown"""
+    _tasks.append(task)
+    task.start()
+    return task
+
+
+async def stop_periodic_tasks() -> None:
+    """Cancel every registered task (application shutdown)"""
+    while _tasks:
+        await _tasks.pop().stop()
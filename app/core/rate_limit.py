@@ -0,0 +1,164 @@
+"""
+Redis rate limiting
+
+Token buckets evaluated atomically in Lua on the shared Redis pool: each
+caller holds up to `burst` tokens, refilled at `rate_per_minute`, and every
+request spends one. Limits are shared by all API processes. Redis errors
+fail open (logged) so an outage does not take the API down with it.
+
+Used as route dependencies:
+
+    @router.post("/generate", dependencies=[Depends(video_generation_limiter.per_user)])
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import structlog
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from ..auth.dependencies import get_current_user
+from ..models.user import User
+from .config import settings
+from .redis import get_redis
+
+logger = structlog.get_logger(__name__)
+
+KEY_PREFIX = "rate_limit:"
+
+# KEYS[1] bucket hash; ARGV: refill rate (tokens/s), capacity, cost.
+# Uses the Redis clock so every API process sees the same time.
+_TOKEN_BUCKET_LUA = """
+if redis.replicate_commands then redis.replicate_commands() end
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+# KEYS[1] counter; ARGV[1] window in seconds
+_FIXED_WINDOW_LUA = """
+local current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return current
+"""
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class TokenBucketLimiter:
+    """Per-caller token bucket; `per_user` / `per_client` are FastAPI dependencies"""
+
+    def __init__(self, name: str, rate_per_minute: int, burst: int):
+        self.name = name
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(burst, 1)
+
+    async def hit(self, identity: str, cost: int = 1) -> RateLimitResult:
+        """Spend `cost` tokens for a caller; allowed when Redis is unavailable"""
+        try:
+            script = get_redis().register_script(_TOKEN_BUCKET_LUA)
+            allowed, tokens, retry_after = await script(
+                keys=[f"{KEY_PREFIX}{self.name}:{identity}"],
+                args=[self.rate_per_minute / 60.0, self.burst, cost]
+            )
+            return RateLimitResult(bool(int(allowed)), int(float(tokens)), float(retry_after))
+        except Exception as e:
+            logger.warning("Rate limit check failed", limiter=self.name, error=str(e))
+            return RateLimitResult(True, self.burst, 0.0)
+
+    async def enforce(self, identity: str, response: Optional[Response] = None, cost: int = 1) -> None:
+        """Raise 429 (with Retry-After) when the caller's bucket holds fewer than `cost` tokens"""
+        if not settings.RATE_LIMIT_ENABLED or self.rate_per_minute <= 0:
+            return
+
+        result = await self.hit(identity, cost)
+        headers = {
+            "X-RateLimit-Limit": str(self.rate_per_minute),
+            "X-RateLimit-Remaining": str(max(result.remaining, 0)),
+        }
+        if not result.allowed:
+            retry_after = max(int(result.retry_after + 0.999), 1)
+            logger.warning("Rate limit exceeded", limiter=self.name, identity=identity, retry_after=retry_after)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many requests. Please retry in {retry_after}s.",
+                headers={**headers, "Retry-After": str(retry_after)}
+            )
+        if response is not None:
+            response.headers.update(headers)
+
+    async def per_user(self, response: Response, current_user: User = Depends(get_current_user)) -> None:
+        await self.enforce(f"user:{current_user.id}", response)
+
+    async def per_client(self, request: Request, response: Response) -> None:
+        await self.enforce(f"ip:{client_ip(request)}", response)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Caller address as seen by our own proxies.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For, so the entry TRUSTED_PROXY_HOPS from the right is the
+    client; anything further left is set by the caller and never trusted.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and hops > 0:
+        entries = [entry.strip() for entry in forwarded.split(",") if entry.strip()]
+        if len(entries) >= hops:
+            return entries[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+async def check_fixed_window(key: str, max_attempts: int, window_seconds: int) -> bool:
+    """Count an attempt in a fixed window; False once `max_attempts` is exceeded"""
+    try:
+        script = get_redis().register_script(_FIXED_WINDOW_LUA)
+        current = await script(keys=[f"{KEY_PREFIX}{key}"], args=[window_seconds])
+        return int(current) <= max_attempts
+    except Exception as e:
+        logger.warning("Rate limit check failed", key=key, error=str(e))
+        return True  # Allow if Redis is down
+
+
+# Render submissions fill MediaConvert / ECS queues
+video_generation_limiter = TokenBucketLimiter(
+    "video_generation",
+    rate_per_minute=settings.RATE_LIMIT_VIDEO_GENERATION,
+    burst=settings.RATE_LIMIT_BURST_SIZE
+)
+
+# OpenAI-backed endpoints (smart matching, captions)
+ai_limiter = TokenBucketLimiter(
+    "ai",
+    rate_per_minute=settings.RATE_LIMIT_AI,
+    burst=settings.RATE_LIMIT_AI_BURST_SIZE
+)
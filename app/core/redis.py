@@ -0,0 +1,45 @@
+"""
+Shared async Redis client
+
+One connection pool per process, sized by REDIS_MAX_CONNECTIONS, reused by
+pub/sub, caches and rate limiting instead of opening a connection per call.
+"""
+
+from typing import Optional
+
+import redis.asyncio as aioredis
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+_pool: Optional[aioredis.ConnectionPool] = None
+_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the process-wide async Redis client (created on first use)"""
+    global _pool, _client
+    if _client is None:
+        _pool = aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            decode_responses=True,
+        )
+        _client = aioredis.Redis(connection_pool=_pool)
+        logger.info("Redis connection pool created", max_connections=settings.REDIS_MAX_CONNECTIONS)
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared client and its pool (application shutdown)"""
+    global _pool, _client
+    if _client is not None:
+        await _client.close()
+    if _pool is not None:
+        await _pool.disconnect()
+    _client = None
+    _pool = None
@@ -0,0 +1,151 @@
+"""
+Per-request timing breakdown (Server-Timing)
+
+Opt-in with REQUEST_TIMING_ENABLED. The middleware gives each request a
+RequestTimings collector in a context variable; hot paths add their time:
+
+- db: SQLAlchemy cursor events on the engine (duration and query count)
+- s3 / lambda / sqs / ...: AsyncAWSClients.run, per AWS service
+- openai: `with timed("openai"):` around completions
+
+Responses carry `Server-Timing: db;dur=41.2;desc="6 queries", s3;dur=..., app;dur=...,
+total;dur=...` where `app` is the time not spent in any timed call (Python,
+serialization, waiting for a pool connection). Concurrent calls of one kind
+overlap, so their sum can exceed the wall time.
+
+Every request is logged with its breakdown; requests slower than
+REQUEST_TIMING_SLOW_MS are sampled (REQUEST_TIMING_SLOW_SAMPLE_RATE) with
+their most frequent statements. When disabled nothing is installed and
+timed() is one context variable lookup.
+"""
+
+import contextvars
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import structlog
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+_current: contextvars.ContextVar[Optional["RequestTimings"]] = contextvars.ContextVar("request_timings", default=None)
+
+_QUERY_START_KEY = "request_timing_query_start"
+_STATEMENT_PREVIEW_CHARS = 120
+
+
+class RequestTimings:
+    """Time spent per category during one request"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.statements: Counter = Counter()
+
+    def add(self, category: str, seconds: float) -> None:
+        self.durations[category] = self.durations.get(category, 0.0) + seconds
+        self.counts[category] = self.counts.get(category, 0) + 1
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def breakdown(self) -> Dict[str, float]:
+        """Milliseconds per category, plus `app` (untimed remainder) and `total`"""
+        total_ms = self.total_ms
+        result = {category: round(seconds * 1000, 1) for category, seconds in self.durations.items()}
+        result["app"] = round(max(total_ms - sum(result.values()), 0.0), 1)
+        result["total"] = round(total_ms, 1)
+        return result
+
+    def server_timing(self) -> str:
+        entries: List[str] = []
+        for category, duration_ms in self.breakdown().items():
+            entry = f"{category};dur={duration_ms}"
+            if category == "db":
+                entry += f';desc="{self.counts.get("db", 0)} queries"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(category: str) -> Iterator[None]:
+    """Add the block's duration to the current request (no-op outside a timed request)"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(category, time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    starts = conn.info.get(_QUERY_START_KEY)
+    if timings is None or not starts:
+        return
+    timings.add("db", time.perf_counter() - starts.pop())
+    timings.statements[" ".join(statement.split())[:_STATEMENT_PREVIEW_CHARS]] += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement of the engine (cursor events run in the request's context)"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def install_request_timing(app: FastAPI, engine: AsyncEngine) -> None:
+    """Add the middleware and DB instrumentation (call only when REQUEST_TIMING_ENABLED)"""
+    instrument_engine(engine)
+
+    @app.middleware("http")
+    async def request_timing_middleware(request: Request, call_next):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+
+        response.headers["Server-Timing"] = timings.server_timing()
+        _log_request(request, response.status_code, timings)
+        return response
+
+    logger.info("Request timing enabled", slow_ms=settings.REQUEST_TIMING_SLOW_MS)
+
+
+def _log_request(request: Request, status_code: int, timings: RequestTimings) -> None:
+    breakdown = timings.breakdown()
+    route = request.scope.get("route")
+    fields = {
+        "method": request.method,
+        "path": getattr(route, "path", request.url.path),
+        "status_code": status_code,
+        "timings_ms": breakdown,
+        "queries": timings.counts.get("db", 0),
+    }
+
+    if breakdown["total"] >= settings.REQUEST_TIMING_SLOW_MS and random.random() < settings.REQUEST_TIMING_SLOW_SAMPLE_RATE:
+        logger.warning("Slow request", **fields, top_statements=timings.statements.most_common(5))
+    else:
+        logger.info("Request timing", **fields)
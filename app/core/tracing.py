@@ -0,0 +1,190 @@
+"""
+Pipeline tracing
+
+A render crosses the API, the hospup-video-generator Lambda, MediaConvert,
+the mediaconvert-callback Lambda, SQS, the ECS FFmpeg worker and our
+callbacks. One W3C trace context (`traceparent`) is carried through all of
+them: in the Lambda payload, MediaConvert UserMetadata, the SQS message
+body and the callback body (aws-lambda/pipeline_tracing.py is the
+component-side counterpart of this module).
+
+Spans are plain OTLP/JSON span records (traceId, spanId, parentSpanId,
+startTimeUnixNano, ...) so any OpenTelemetry backend can ingest them. With
+TRACE_EXPORT_PATH they are appended to that file as JSON lines (tests,
+local runs); otherwise they are logged.
+
+    with start_span("lambda.invoke", function="hospup-video-generator") as span:
+        payload["traceparent"] = span.traceparent
+"""
+
+import contextvars
+import functools
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import structlog
+from fastapi import HTTPException
+
+from .config import settings
+
+logger = structlog.get_logger(__name__)
+
+SERVICE_NAME = "hospup-api"
+TRACEPARENT_KEY = "traceparent"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, parent span_id) from a `00-<trace>-<span>-<flags>` header, None if malformed"""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if set(parts[1]) == {"0"} or set(parts[2]) == {"0"}:
+        return None
+    return parts[1], parts[2]
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    return f"00-{trace_id}-{span_id}-01"
+
+
+class Span:
+    """One timed operation; exported when ended"""
+
+    def __init__(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        context = parse_traceparent(traceparent) if traceparent else None
+        if context:
+            self.trace_id, self.parent_span_id = context
+        elif parent is not None:
+            self.trace_id, self.parent_span_id = parent.trace_id, parent.span_id
+        else:
+            self.trace_id, self.parent_span_id = secrets.token_hex(16), None
+        self.span_id = secrets.token_hex(8)
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return format_traceparent(self.trace_id, self.span_id)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            export_span(self.to_otlp())
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items() if value is not None
+            ],
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def export_span(record: Dict[str, Any]) -> None:
+    """Append the span to TRACE_EXPORT_PATH, or log it"""
+    if not settings.TRACING_ENABLED:
+        return
+    if settings.TRACE_EXPORT_PATH:
+        try:
+            line = json.dumps(record)
+            with _export_lock, open(settings.TRACE_EXPORT_PATH, "a", encoding="utf-8") as export_file:
+                export_file.write(line + "\n")
+            return
+        except OSError as e:
+            logger.warning("Span export failed", path=settings.TRACE_EXPORT_PATH, error=str(e))
+    logger.info("Span", trace_id=record["traceId"], span=record["name"],
+                duration_ms=round((int(record["endTimeUnixNano"]) - int(record["startTimeUnixNano"])) / 1e6, 1))
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def current_traceparent() -> Optional[str]:
+    span = _current_span.get()
+    return span.traceparent if span else None
+
+
+@contextmanager
+def start_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Child of `traceparent` when given (remote parent), else of the current span.
+
+    The span is current inside the block and ended (exported) on exit.
+    """
+    span = Span(name, traceparent=traceparent, parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except HTTPException as e:
+        if e.status_code >= 500:
+            span.set_error(str(e.detail))
+        span.set_attribute("http.status_code", e.status_code)
+        raise
+    except Exception as e:
+        span.set_error(str(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name: str) -> Callable:
+    """Run an async route handler in its own span (signature kept for FastAPI)"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with start_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,157 @@
+"""
+Async AWS client facade
+
+boto3 is blocking. Calling it from `async def` handlers stalls the event loop
+for every request on the worker. This facade keeps one long-lived boto3
+client per service (keep-alive connection pool, bounded botocore timeouts)
+and runs calls on a dedicated bounded thread pool with a per-call timeout.
+
+Created in the application lifespan; scripts and Celery tasks get a lazily
+created instance on first use.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Type
+
+import boto3
+import structlog
+from botocore.config import Config
+
+from ...core.config import settings
+from ...core.request_timing import timed
+from ...shared.exceptions import ExternalServiceError
+
+logger = structlog.get_logger(__name__)
+
+
+class AsyncAWSClients:
+    """Shared boto3 clients driven through a bounded executor"""
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pool_connections: int,
+        connect_timeout: float,
+        read_timeout: float,
+        default_timeout: float
+    ):
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aws")
+        self._config = Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"max_attempts": 3, "mode": "standard"},
+            tcp_keepalive=True
+        )
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def client(self, service: str):
+        """Return the shared boto3 client for a service (thread-safe, created once)"""
+        client = self._clients.get(service)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(service)
+            if client is None:
+                client = boto3.client(service, config=self._config, **self._client_kwargs(service))
+                self._clients[service] = client
+                logger.info("AWS client initialized", service=service)
+            return client
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        error_class: Type[ExternalServiceError] = ExternalServiceError,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run a blocking callable on the AWS executor.
+
+        `timeout` bounds how long the caller waits; the botocore read timeout
+        bounds how long the worker thread can stay busy.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        timeout = timeout or self.default_timeout
+        try:
+            with timed(_service_name(func)):
+                return await asyncio.wait_for(loop.run_in_executor(self._executor, call), timeout)
+        except asyncio.TimeoutError:
+            name = getattr(func, "__name__", repr(func))
+            logger.error("AWS call timed out", operation=name, timeout=timeout)
+            raise error_class(f"AWS call {name} timed out after {timeout}s")
+
+    async def call(
+        self,
+        service: str,
+        operation: str,
+        timeout: Optional[float] = None,
+        **params: Any
+    ) -> Any:
+        """Invoke a client operation, e.g. call("lambda", "invoke", FunctionName=...)"""
+        client = self.client(service)
+        return await self.run(getattr(client, operation), timeout=timeout, **params)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._clients.clear()
+
+    @staticmethod
+    def _client_kwargs(service: str) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"region_name": settings.AWS_REGION}
+
+        # Explicit keys when configured (Railway), default credential chain otherwise (AWS)
+        if settings.S3_ACCESS_KEY_ID and settings.S3_SECRET_ACCESS_KEY:
+            kwargs["aws_access_key_id"] = settings.S3_ACCESS_KEY_ID
+            kwargs["aws_secret_access_key"] = settings.S3_SECRET_ACCESS_KEY
+
+        if service == "s3":
+            kwargs["region_name"] = settings.S3_REGION
+            kwargs["endpoint_url"] = f"https://s3.{settings.S3_REGION}.amazonaws.com"
+
+        return kwargs
+
+
+_aws_clients: Optional[AsyncAWSClients] = None
+
+
+def _service_name(func: Callable[..., Any]) -> str:
+    """AWS service of a bound client method (s3, lambda, sqs...) for request timings"""
+    client = getattr(func, "__self__", None)
+    meta = getattr(client, "meta", None)
+    return meta.service_model.service_name if meta is not None else "aws"
+
+
+def init_aws_clients() -> AsyncAWSClients:
+    """Create the shared AWS clients (application startup)"""
+    global _aws_clients
+    if _aws_clients is None:
+        _aws_clients = AsyncAWSClients(
+            max_workers=settings.AWS_EXECUTOR_MAX_WORKERS,
+            max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.AWS_READ_TIMEOUT_SECONDS,
+            default_timeout=settings.AWS_CALL_TIMEOUT_SECONDS
+        )
+    return _aws_clients
+
+
+def get_aws_clients() -> AsyncAWSClients:
+    """Get the shared AWS clients, creating them if the lifespan has not"""
+    return _aws_clients or init_aws_clients()
+
+
+def shutdown_aws_clients() -> None:
+    """Release executor threads and clients (application shutdown)"""
+    global _aws_clients
+    if _aws_clients is not None:
+        _aws_clients.shutdown()
+        _aws_clients = None
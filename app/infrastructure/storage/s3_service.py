@@ -5,35 +5,95 @@ Single point of truth for all S3 operations.
 Replaces all duplicate S3 client code across the codebase.
 """
 
-import boto3
+import asyncio
+import hashlib
 import structlog
-from typing import Optional, Dict, Any, BinaryIO, Union
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Awaitable, BinaryIO, Callable, Iterable, List, Tuple, Union
 from io import BytesIO
 from datetime import datetime, timedelta
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from ...core.config import settings
 from ...shared.exceptions import StorageError, ConfigurationError
+from ..aws.clients import get_aws_clients
 
 logger = structlog.get_logger(__name__)
 
 
+class PresignedUrlCache:
+    """
+    In-process LRU cache of presigned GET URLs keyed by (key, expires_in, expiry bucket)
+
+    Time is cut into buckets of half the requested lifetime. A URL is only
+    served during the bucket it was signed in, so it always has at least half
+    of its lifetime left, and every view within a bucket gets the same URL
+    (browser and CDN caches keep working).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def bucket(expires_in: int, now: Optional[float] = None) -> int:
+        window = max(expires_in // 2, 1)
+        return int((now if now is not None else time.time()) // window)
+
+    def get(self, key: str, expires_in: int, bucket: int) -> Optional[str]:
+        cache_key = (key, expires_in, bucket)
+        with self._lock:
+            url = self._entries.get(cache_key)
+            if url is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return url
+
+    def set(self, key: str, expires_in: int, bucket: int, url: str) -> None:
+        with self._lock:
+            self._entries[(key, expires_in, bucket)] = url
+            self._entries.move_to_end((key, expires_in, bucket))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
 class S3StorageService:
     """
     Centralized S3 service with all storage operations
 
     Features:
-    - Connection pooling and reuse
+    - Connection pooling and reuse (shared client from the async AWS facade)
+    - Non-blocking async methods (boto3 runs on the bounded AWS executor)
     - Automatic retry with exponential backoff
-    - Presigned URL generation
+    - Presigned URL generation (GET URLs cached per expiry bucket, batch signing)
     - File metadata extraction
     - Error handling and logging
     """
 
     def __init__(self):
-        self._client = None
-        self._bucket_name = settings.S3_BUCKET
+        self._bucket_name = settings.bucket_name
         self._region = settings.S3_REGION
+        self.presign_cache = PresignedUrlCache(settings.S3_PRESIGN_CACHE_MAX_ENTRIES)
 
         # Validate configuration
         if not all([settings.S3_ACCESS_KEY_ID, settings.S3_SECRET_ACCESS_KEY,
@@ -42,29 +102,19 @@ class S3StorageService:
 
     @property
     def client(self):
-        """Get S3 client with connection reuse"""
-        if self._client is None:
-            try:
-                self._client = boto3.client(
-                    's3',
-                    aws_access_key_id=settings.S3_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
-                    region_name=self._region,
-                    endpoint_url=f"https://s3.{self._region}.amazonaws.com",
-                    config=boto3.session.Config(
-                        retries={'max_attempts': 3},
-                        max_pool_connections=50
-                    )
-                )
-                logger.info("S3 client initialized", region=self._region, bucket=self._bucket_name)
-            except NoCredentialsError as e:
-                logger.error("S3 credentials not found", error=str(e))
-                raise ConfigurationError("S3 credentials not configured")
-            except Exception as e:
-                logger.error("Failed to initialize S3 client", error=str(e))
-                raise StorageError(f"S3 initialization failed: {e}")
+        """Get the shared S3 client (keep-alive pool owned by the AWS facade)"""
+        try:
+            return get_aws_clients().client('s3')
+        except NoCredentialsError as e:
+            logger.error("S3 credentials not found", error=str(e))
+            raise ConfigurationError("S3 credentials not configured")
+        except Exception as e:
+            logger.error("Failed to initialize S3 client", error=str(e))
+            raise StorageError(f"S3 initialization failed: {e}")
 
-        return self._client
+    async def _run(self, func, *args, timeout: Optional[float] = None, **kwargs):
+        """Run a blocking S3 call on the AWS executor with a per-call timeout"""
+        return await get_aws_clients().run(func, *args, timeout=timeout, error_class=StorageError, **kwargs)
 
     def upload_file_sync(
         self,
@@ -127,14 +177,12 @@ class S3StorageService:
         metadata: Optional[Dict[str, str]] = None,
         public: bool = True
     ) -> str:
-        """Async wrapper for upload_file_sync"""
-        return self.upload_file_sync(key, content, content_type, metadata)
         """
-        Upload file to S3
+        Upload file to S3 without blocking the event loop
 
         Args:
-            file_content: File content as binary stream
-            file_key: S3 object key (path)
+            key: S3 object key (path)
+            content: File content as bytes or binary stream
             content_type: MIME type of file
             metadata: Custom metadata dict
             public: Make file publicly accessible
@@ -143,8 +191,108 @@ class S3StorageService:
             Public URL of uploaded file
 
         Raises:
-            StorageError: If upload fails
+            StorageError: If upload fails or times out
+        """
+        return await self._run(
+            self.upload_file_sync, key, content, content_type, metadata,
+            timeout=settings.AWS_TRANSFER_TIMEOUT_SECONDS
+        )
+
+    async def upload_stream(
+        self,
+        key: str,
+        read: Callable[[int], Awaitable[bytes]],
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4
+    ) -> Dict[str, Any]:
+        """
+        Stream a file to S3 without holding it in memory
+
+        `read(n)` returns the next chunk (b'' at EOF), e.g. UploadFile.read.
+        Parts are uploaded with at most `max_concurrency` in flight, so peak
+        memory is about (max_concurrency + 1) * part_size whatever the file
+        size. Size and SHA-256 are computed while reading.
+
+        Returns:
+            Dict with 'url', 'size' and 'sha256'
         """
+        digest = hashlib.sha256()
+        first = await read(part_size)
+        digest.update(first)
+
+        # Small file: a single PUT is cheaper than a multipart upload
+        next_chunk = await read(part_size) if len(first) == part_size else b''
+        if not next_chunk:
+            url = await self.upload_file(key, first, content_type, metadata)
+            return {'url': url, 'size': len(first), 'sha256': digest.hexdigest()}
+
+        upload_id = await self.create_multipart_upload(key, content_type, metadata)
+        slots = asyncio.Semaphore(max_concurrency)
+        parts: Dict[int, str] = {}
+        tasks: List[asyncio.Task] = []
+        size = 0
+
+        async def upload_part(part_number: int, body: bytes) -> None:
+            try:
+                response = await self._run(
+                    self.client.upload_part,
+                    Bucket=self._bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                    timeout=settings.AWS_TRANSFER_TIMEOUT_SECONDS
+                )
+                parts[part_number] = response['ETag']
+            finally:
+                slots.release()
+
+        def raise_failed_part() -> None:
+            # A failed part frees its slot too: stop before reading the rest of the body
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.exception():
+                    raise task.exception()
+
+        try:
+            chunk, part_number = first, 1
+            while chunk:
+                size += len(chunk)
+                # Wait for a free slot before reading more: bounds buffered chunks
+                await slots.acquire()
+                raise_failed_part()
+                tasks.append(asyncio.create_task(upload_part(part_number, chunk)))
+                if next_chunk:
+                    chunk, next_chunk = next_chunk, b''
+                else:
+                    chunk = await read(part_size)
+                digest.update(chunk)
+                part_number += 1
+
+            await asyncio.gather(*tasks)
+            url = await self.complete_multipart_upload(key, upload_id, parts)
+
+        except (Exception, asyncio.CancelledError) as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.abort_multipart_upload(key, upload_id)
+            logger.error("Streaming upload failed", file_key=key, size=size, error=str(e))
+            if isinstance(e, (StorageError, asyncio.CancelledError)):
+                raise
+            if isinstance(e, ClientError):
+                raise StorageError(f"Upload failed: {e.response['Error']['Code']}")
+            raise StorageError(f"Upload failed: {e}")
+
+        logger.info(
+            "File streamed to S3",
+            file_key=key,
+            size=size,
+            parts=len(parts),
+            content_type=content_type
+        )
+        return {'url': url, 'size': size, 'sha256': digest.hexdigest()}
 
     def download_file_sync(self, key: str) -> bytes:
         """Synchronous version for Celery tasks"""
@@ -162,8 +310,8 @@ class S3StorageService:
             raise StorageError(f"Download failed: {e}")
 
     async def download_file(self, key: str) -> bytes:
-        """Async wrapper for download_file_sync"""
-        return self.download_file_sync(key)
+        """Download file content without blocking the event loop"""
+        return await self._run(self.download_file_sync, key, timeout=settings.AWS_TRANSFER_TIMEOUT_SECONDS)
 
     def delete_file_sync(self, key: str) -> bool:
         """Synchronous version for Celery tasks"""
@@ -183,36 +331,25 @@ class S3StorageService:
             return False
 
     async def delete_file(self, key: str) -> bool:
-        """Async wrapper for delete_file_sync"""
-        return self.delete_file_sync(key)
         """
         Delete file from S3
 
         Args:
-            file_key: S3 object key to delete
+            key: S3 object key to delete
 
         Returns:
             True if deleted successfully
         """
         try:
-            self.client.delete_object(Bucket=self._bucket_name, Key=key)
-            logger.info("File deleted from S3", file_key=key)
-            return True
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            if error_code == 'NoSuchKey':
-                logger.warning("File not found for deletion", file_key=key)
-                return True  # Consider missing file as successful deletion
-            logger.error("S3 deletion failed", file_key=key, error_code=error_code)
-            return False
-        except Exception as e:
-            logger.error("Unexpected S3 deletion error", file_key=key, error=str(e))
+            return await self._run(self.delete_file_sync, key)
+        except StorageError as e:
+            logger.error("S3 deletion failed", file_key=key, error=str(e))
             return False
 
     async def file_exists(self, file_key: str) -> bool:
         """Check if file exists in S3"""
         try:
-            self.client.head_object(Bucket=self._bucket_name, Key=file_key)
+            await self._run(self.client.head_object, Bucket=self._bucket_name, Key=file_key)
             return True
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -224,7 +361,7 @@ class S3StorageService:
     async def get_file_metadata(self, file_key: str) -> Dict[str, Any]:
         """Get file metadata from S3"""
         try:
-            response = self.client.head_object(Bucket=self._bucket_name, Key=file_key)
+            response = await self._run(self.client.head_object, Bucket=self._bucket_name, Key=file_key)
             return {
                 'size': response.get('ContentLength', 0),
                 'content_type': response.get('ContentType', ''),
@@ -255,8 +392,13 @@ class S3StorageService:
         Returns:
             Presigned URL
         """
+        if method == 'get_object':
+            urls = await self.presign_get_urls([file_key], expires_in)
+            return urls[file_key]
+
         try:
-            url = self.client.generate_presigned_url(
+            url = await self._run(
+                self.client.generate_presigned_url,
                 method,
                 Params={'Bucket': self._bucket_name, 'Key': file_key},
                 ExpiresIn=expires_in
@@ -274,6 +416,60 @@ class S3StorageService:
             logger.error("Presigned URL generation failed", file_key=file_key, error=str(e))
             raise StorageError(f"Presigned URL generation failed: {e}")
 
+    def presign_get_urls_sync(self, keys: Iterable[str], expires_in: int = 3600) -> Dict[str, str]:
+        """
+        Presigned GET URLs for many keys, served from the cache when possible
+
+        Signing is local (no S3 round trip), so only cache misses cost CPU.
+        """
+        bucket = PresignedUrlCache.bucket(expires_in)
+        urls: Dict[str, str] = {}
+        try:
+            for key in keys:
+                if key in urls:
+                    continue
+                url = self.presign_cache.get(key, expires_in, bucket)
+                if url is None:
+                    url = self.client.generate_presigned_url(
+                        'get_object',
+                        Params={'Bucket': self._bucket_name, 'Key': key},
+                        ExpiresIn=expires_in
+                    )
+                    self.presign_cache.set(key, expires_in, bucket, url)
+                urls[key] = url
+        except ClientError as e:
+            logger.error("Presigned URL generation failed", count=len(urls), error=str(e))
+            raise StorageError(f"Presigned URL generation failed: {e}")
+        return urls
+
+    async def presign_get_urls(self, keys: List[str], expires_in: int = 3600) -> Dict[str, str]:
+        """
+        Batch version of generate_presigned_url for GET
+
+        Cache hits are answered on the event loop; the misses are signed
+        together in a single executor call.
+        """
+        bucket = PresignedUrlCache.bucket(expires_in)
+        urls: Dict[str, str] = {}
+        missing: List[str] = []
+        for key in keys:
+            url = self.presign_cache.get(key, expires_in, bucket)
+            if url is None:
+                missing.append(key)
+            else:
+                urls[key] = url
+
+        if missing:
+            urls.update(await self._run(self.presign_get_urls_sync, missing, expires_in))
+            logger.info(
+                "Presigned GET URLs generated",
+                signed=len(missing),
+                cached=len(keys) - len(missing),
+                expires_in=expires_in
+            )
+
+        return urls
+
     async def generate_presigned_post(
         self,
         file_key: str,
@@ -294,7 +490,8 @@ class S3StorageService:
             Dict with 'url' and 'fields' for POST form
         """
         try:
-            presigned_post = self.client.generate_presigned_post(
+            presigned_post = await self._run(
+                self.client.generate_presigned_post,
                 Bucket=self._bucket_name,
                 Key=file_key,
                 Fields=fields or {},
@@ -313,11 +510,151 @@ class S3StorageService:
             logger.error("Presigned POST generation failed", file_key=file_key, error=str(e))
             raise StorageError(f"Presigned POST generation failed: {e}")
 
+    # === MULTIPART UPLOADS ===
+
+    async def create_multipart_upload(
+        self,
+        key: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Start a multipart upload and return its UploadId"""
+        params: Dict[str, Any] = {'Bucket': self._bucket_name, 'Key': key}
+        if content_type:
+            params['ContentType'] = content_type
+            params['ContentDisposition'] = 'inline'
+        if metadata:
+            params['Metadata'] = metadata
+        try:
+            response = await self._run(self.client.create_multipart_upload, **params)
+            logger.info("Multipart upload created", file_key=key, upload_id=response['UploadId'])
+            return response['UploadId']
+        except ClientError as e:
+            logger.error("Multipart upload creation failed", file_key=key, error=str(e))
+            raise StorageError(f"Multipart upload creation failed: {e}")
+
+    def presign_upload_parts_sync(
+        self,
+        key: str,
+        upload_id: str,
+        part_numbers: Iterable[int],
+        expires_in: int = 3600
+    ) -> Dict[int, str]:
+        """Presigned PUT URLs for a batch of parts (local signing, no S3 round trip)"""
+        return {
+            part_number: self.client.generate_presigned_url(
+                'upload_part',
+                Params={
+                    'Bucket': self._bucket_name,
+                    'Key': key,
+                    'UploadId': upload_id,
+                    'PartNumber': part_number
+                },
+                ExpiresIn=expires_in
+            )
+            for part_number in part_numbers
+        }
+
+    async def presign_upload_parts(
+        self,
+        key: str,
+        upload_id: str,
+        part_numbers: List[int],
+        expires_in: int = 3600
+    ) -> Dict[int, str]:
+        """Batch of part upload URLs signed in a single executor call"""
+        try:
+            return await self._run(self.presign_upload_parts_sync, key, upload_id, part_numbers, expires_in)
+        except ClientError as e:
+            logger.error("Part URL generation failed", file_key=key, upload_id=upload_id, error=str(e))
+            raise StorageError(f"Part URL generation failed: {e}")
+
+    async def list_uploaded_parts(self, key: str, upload_id: str) -> Dict[int, Tuple[str, int]]:
+        """Parts S3 has received for an upload: {part_number: (etag, size)}"""
+        parts: Dict[int, Tuple[str, int]] = {}
+        params: Dict[str, Any] = {'Bucket': self._bucket_name, 'Key': key, 'UploadId': upload_id}
+        try:
+            while True:
+                response = await self._run(self.client.list_parts, **params)
+                for part in response.get('Parts', []):
+                    parts[part['PartNumber']] = (part['ETag'], part['Size'])
+                if not response.get('IsTruncated'):
+                    return parts
+                params['PartNumberMarker'] = response['NextPartNumberMarker']
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code == 'NoSuchUpload':
+                raise StorageError(f"Multipart upload not found: {upload_id}")
+            raise StorageError(f"List parts failed: {error_code}")
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts: Dict[int, str]) -> str:
+        """Assemble the uploaded parts into the final object and return its public URL"""
+        try:
+            await self._run(
+                self.client.complete_multipart_upload,
+                Bucket=self._bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': number, 'ETag': parts[number]}
+                        for number in sorted(parts)
+                    ]
+                },
+                timeout=settings.AWS_TRANSFER_TIMEOUT_SECONDS
+            )
+            logger.info("Multipart upload completed", file_key=key, upload_id=upload_id, parts=len(parts))
+            return f"https://s3.{self._region}.amazonaws.com/{self._bucket_name}/{key}"
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            logger.error("Multipart upload completion failed", file_key=key, upload_id=upload_id, error_code=error_code)
+            raise StorageError(f"Multipart upload completion failed: {error_code}")
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> bool:
+        """Abort an upload and free its stored parts (missing uploads count as aborted)"""
+        try:
+            await self._run(
+                self.client.abort_multipart_upload,
+                Bucket=self._bucket_name,
+                Key=key,
+                UploadId=upload_id
+            )
+            logger.info("Multipart upload aborted", file_key=key, upload_id=upload_id)
+            return True
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code == 'NoSuchUpload':
+                return True
+            logger.error("Multipart upload abort failed", file_key=key, upload_id=upload_id, error_code=error_code)
+            return False
+
+    async def list_multipart_uploads(self, prefix: str = "") -> List[Dict[str, Any]]:
+        """In-progress multipart uploads under a prefix"""
+        uploads: List[Dict[str, Any]] = []
+        params: Dict[str, Any] = {'Bucket': self._bucket_name, 'Prefix': prefix}
+        try:
+            while True:
+                response = await self._run(self.client.list_multipart_uploads, **params)
+                for upload in response.get('Uploads', []):
+                    uploads.append({
+                        'key': upload['Key'],
+                        'upload_id': upload['UploadId'],
+                        'initiated': upload['Initiated']
+                    })
+                if not response.get('IsTruncated'):
+                    return uploads
+                params['KeyMarker'] = response['NextKeyMarker']
+                params['UploadIdMarker'] = response['NextUploadIdMarker']
+        except ClientError as e:
+            logger.error("List multipart uploads failed", prefix=prefix, error=str(e))
+            raise StorageError(f"List multipart uploads failed: {e}")
+
     async def copy_file(self, source_key: str, dest_key: str) -> bool:
         """Copy file within S3 bucket"""
         try:
             copy_source = {'Bucket': self._bucket_name, 'Key': source_key}
-            self.client.copy_object(
+            await self._run(
+                self.client.copy_object,
                 CopySource=copy_source,
                 Bucket=self._bucket_name,
                 Key=dest_key
@@ -332,7 +669,8 @@ class S3StorageService:
     async def list_files(self, prefix: str = "", max_keys: int = 1000) -> list:
         """List files in bucket with optional prefix filter"""
         try:
-            response = self.client.list_objects_v2(
+            response = await self._run(
+                self.client.list_objects_v2,
                 Bucket=self._bucket_name,
                 Prefix=prefix,
                 MaxKeys=max_keys
@@ -357,20 +695,21 @@ class S3StorageService:
         """Health check for S3 service"""
         try:
             # Test basic connectivity
-            self.client.head_bucket(Bucket=self._bucket_name)
+            await self._run(self.client.head_bucket, Bucket=self._bucket_name)
 
             # Test write/read/delete
             test_key = f"health-check/{datetime.utcnow().isoformat()}"
             test_content = b"health check"
 
-            self.client.upload_fileobj(
+            await self._run(
+                self.client.upload_fileobj,
                 BytesIO(test_content),
                 self._bucket_name,
                 test_key
             )
 
             # Cleanup test file
-            self.client.delete_object(Bucket=self._bucket_name, Key=test_key)
+            await self._run(self.client.delete_object, Bucket=self._bucket_name, Key=test_key)
 
             return {
                 "healthy": True,
@@ -390,8 +729,8 @@ class S3StorageService:
 _s3_service = None
 
 def get_s3_service() -> S3StorageService:
-    """Get singleton S3 service instance"""
+    """Get singleton S3 service instance (created in the application lifespan)"""
     global _s3_service
     if _s3_service is None:
         _s3_service = S3StorageService()
-    return _s3_service
\ No newline at end of file
+    return _s3_service
@@ -9,6 +9,18 @@ from datetime import datetime
 
 from app.core.config import settings
 from app.core.database import engine
+from app.core.redis import close_redis
+from app.infrastructure.aws.clients import init_aws_clients, shutdown_aws_clients
+from app.infrastructure.storage.s3_service import get_s3_service
+from app.core.health import health_monitor
+from app.core.metrics import install_metrics
+from app.core.periodic import PeriodicTask, register_periodic_task, stop_periodic_tasks
+from app.core.request_timing import install_request_timing
+from app.api.video_generation.aws_service import dispatch_fair_renders
+from app.services.multipart_uploads import SWEEPER_LOCK_KEY, sweep_stale_uploads
+from app.services.template_catalog import CHECK_LOCK_KEY as TEMPLATE_CHECK_LOCK_KEY, template_catalog
+from app.services.video_quota import RECONCILE_LOCK_KEY as VIDEO_QUOTA_LOCK_KEY, video_quota
+from app.services.job_events import job_event_broker
 from app.models import Base
 from app.api import api_router
 
@@ -18,6 +30,7 @@ from app.models.property import Property
 from app.models.asset import Asset
 from app.models.video import Video
 from app.models.preset import Preset
+from app.models.render_job import RenderJob
 
 # Configure structured logging
 structlog.configure(
@@ -52,9 +65,54 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("Failed to create database tables", error=str(e))
         # Don't fail startup - tables might already exist
+    # Shared AWS clients (S3, Lambda, SQS) driven through a bounded executor
+    init_aws_clients()
+    # App-scoped storage service (presigned URL cache lives for the whole process)
+    try:
+        get_s3_service()
+        logger.info("S3 storage service initialized")
+    except Exception as e:
+        logger.error("Failed to initialize S3 storage service", error=str(e))
+    # Housekeeping loops
+    register_periodic_task(PeriodicTask(
+        "health_probes",
+        health_monitor.run_probes,
+        interval=settings.HEALTH_PROBE_INTERVAL_SECONDS
+    ))
+    register_periodic_task(PeriodicTask(
+        "multipart_upload_sweeper",
+        sweep_stale_uploads,
+        interval=settings.MULTIPART_SWEEP_INTERVAL_SECONDS,
+        initial_delay=60,
+        lock_key=SWEEPER_LOCK_KEY
+    ))
+    register_periodic_task(PeriodicTask(
+        "template_catalog_change_check",
+        template_catalog.check_for_changes,
+        interval=settings.TEMPLATE_CATALOG_CHANGE_CHECK_SECONDS,
+        lock_key=TEMPLATE_CHECK_LOCK_KEY
+    ))
+    register_periodic_task(PeriodicTask(
+        "video_quota_reconcile",
+        video_quota.reconcile,
+        interval=settings.VIDEO_QUOTA_RECONCILE_INTERVAL_SECONDS,
+        initial_delay=30,
+        lock_key=VIDEO_QUOTA_LOCK_KEY
+    ))
+    if settings.FAIR_SCHEDULING_ENABLED:
+        # Bulk renders queued per tenant; dequeues are atomic, so every process may dispatch
+        register_periodic_task(PeriodicTask(
+            "fair_render_dispatch",
+            dispatch_fair_renders,
+            interval=settings.FAIR_SCHEDULER_DISPATCH_INTERVAL_SECONDS
+        ))
     yield
     # Shutdown
     logger.info("Shutting down Hospup API")
+    await stop_periodic_tasks()
+    await job_event_broker.stop()
+    await close_redis()
+    shutdown_aws_clients()
 
 app = FastAPI(
     title="Hospup API",
@@ -64,6 +122,8 @@ app = FastAPI(
 )
 
 # CORS Configuration - Allow specific origins with credentials
+EXPOSED_HEADERS = ["ETag", "Retry-After", "Server-Timing", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-Total-Count"]
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -75,9 +135,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # Named explicitly: browsers ignore the "*" wildcard on credentialed requests
+    expose_headers=EXPOSED_HEADERS,
 )
 
+# Prometheus /metrics (route latency, DB pool, OpenAI, render queue depth)
+if settings.METRICS_ENABLED:
+    install_metrics(app, engine)
+
+# Server-Timing breakdown (db / s3 / lambda / openai / app), opt-in
+if settings.REQUEST_TIMING_ENABLED:
+    install_request_timing(app, engine)
+
 # Custom exception handler to ensure CORS headers on all errors
 @app.exception_handler(Exception)
 async def universal_exception_handler(request: Request, exc: Exception):
@@ -109,7 +178,7 @@ async def universal_exception_handler(request: Request, exc: Exception):
         response.headers["Access-Control-Allow-Credentials"] = "true"
         response.headers["Access-Control-Allow-Methods"] = "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
         response.headers["Access-Control-Allow-Headers"] = "*"
-        response.headers["Access-Control-Expose-Headers"] = "*"
+        response.headers["Access-Control-Expose-Headers"] = ", ".join(EXPOSED_HEADERS)
 
     logger.error("Unhandled exception", error=str(exc), error_type=type(exc).__name__, path=request.url.path)
 
@@ -118,50 +187,35 @@ async def universal_exception_handler(request: Request, exc: Exception):
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+@app.get("/livez")
+async def liveness():
+    """Liveness: the process serves requests. No I/O, for frequent platform checks."""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness from the last background probe run (database, Redis, S3, render queue)"""
+    from fastapi.responses import JSONResponse
+
+    ready, report = health_monitor.snapshot()
+    return JSONResponse(status_code=200 if ready else 503, content=report)
+
 @app.get("/health")
 async def health_check():
-    """Enhanced health check endpoint with database connectivity"""
-    from app.auth.security import get_password_hash, verify_password
-    from app.core.health import check_database_health
-    
-    overall_status = "healthy"
-    
-    try:
-        # Test basic app components
-        test_hash = get_password_hash("test123")
-        bcrypt_works = verify_password("test123", test_hash)
-        
-        # Test JWT secrets are available
-        jwt_secret_ok = bool(settings.JWT_SECRET and len(settings.JWT_SECRET) > 10)
-        refresh_secret_ok = bool(settings.JWT_REFRESH_SECRET and len(settings.JWT_REFRESH_SECRET) > 10)
-        
-        # Test database connectivity
-        db_health = await check_database_health()
-        
-        # Determine overall status
-        if db_health["database"]["status"] != "healthy":
-            overall_status = "degraded"
-        
-        return {
-            "status": overall_status,
-            "service": "hospup-api", 
-            "timestamp": datetime.now().strftime("%Y-%m-%d-%H:%M:%S"),
-            "components": {
-                "auth": {
-                    "bcrypt_working": bcrypt_works,
-                    "jwt_secret_configured": jwt_secret_ok, 
-                    "refresh_secret_configured": refresh_secret_ok
-                },
-                "database": db_health["database"]
+    """Health report served from the background probes (no per-request I/O)"""
+    ready, report = health_monitor.snapshot()
+    return {
+        **report,
+        "service": "hospup-api",
+        "timestamp": datetime.now().strftime("%Y-%m-%d-%H:%M:%S"),
+        "components": {
+            **report["components"],
+            "auth": {
+                "jwt_secret_configured": bool(settings.JWT_SECRET and len(settings.JWT_SECRET) > 10),
+                "refresh_secret_configured": bool(settings.JWT_REFRESH_SECRET and len(settings.JWT_REFRESH_SECRET) > 10)
             }
         }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "service": "hospup-api", 
-            "error": str(e)[:200],
-            "timestamp": datetime.now().strftime("%Y-%m-%d-%H:%M:%S")
-        }
+    }
 
 @app.get("/")
 async def root():
@@ -9,5 +9,7 @@ from .asset import Asset  # For uploaded content (videos, images, etc.)
 from .video import Video  # For AI-generated videos
 from .template import Template  # For viral video templates
 from .preset import Preset  # For image adjustment presets
+from .render_job import RenderJob  # For video render pipeline tracking
+from .video_quota import VideoQuotaUsage  # For monthly video quota counters
 
-__all__ = ["Base", "User", "Property", "Asset", "Video", "Template", "Preset"]
\ No newline at end of file
+__all__ = ["Base", "User", "Property", "Asset", "Video", "Template", "Preset", "RenderJob", "VideoQuotaUsage"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from . import Base
@@ -17,7 +17,7 @@ class Asset(Base):
     
     # Metadata
     duration = Column(Float)  # Duration in seconds with decimals (e.g., 174.23)
-    file_size = Column(Integer)  # File size in bytes
+    file_size = Column(BigInteger)  # File size in bytes (multipart uploads can exceed 2GB)
     
     # Processing status
     status = Column(String, nullable=False, default="uploaded")  # uploaded, processing, ready, error
@@ -32,6 +32,12 @@ class Asset(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Keyset pagination of asset libraries (newest first)
+    __table_args__ = (
+        Index("ix_assets_user_property_created", user_id, property_id, created_at.desc(), id.desc()),
+        Index("ix_assets_user_created", user_id, created_at.desc(), id.desc()),
+    )
     
     # Relationships
     property = relationship("Property", back_populates="assets")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -20,5 +20,10 @@ class Preset(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Keyset pagination of the preset list (newest first)
+    __table_args__ = (
+        Index("ix_presets_user_created", user_id, created_at.desc(), id.desc()),
+    )
+
     # Relationships
     user = relationship("User", back_populates="presets")
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from . import Base
+
+
+class RenderJob(Base):
+    """One row per video render (Lambda → MediaConvert → ECS FFmpeg)"""
+    __tablename__ = "render_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Identifiers used by callbacks and status polls
+    job_id = Column(String(36), nullable=False)  # Our job id (sent in Lambda payload / UserMetadata)
+    video_id = Column(String, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    mediaconvert_job_id = Column(String(100), nullable=True)  # Known once MediaConvert accepted the job
+    ecs_message_id = Column(String(100), nullable=True)  # SQS message id of the ECS FFmpeg post-processing job
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    property_id = Column(Integer, nullable=True)
+    generation_method = Column(String(50), nullable=True)  # aws_mediaconvert, mediaconvert_ecs
+    quota_period = Column(String(7), nullable=True)  # Month charged to the user's video quota (cleared on refund)
+    trace_id = Column(String(32), nullable=True)  # W3C trace id shared by every pipeline component
+
+    # Component stage timings: [{"stage", "source", "start", "duration_ms"}] ordered by start
+    stage_timeline = Column(JSONB, nullable=False, default=list, server_default="[]")
+
+    # State machine: queued → submitted → mediaconvert → post_processing → completed | failed
+    status = Column(String(30), nullable=False, default="queued")
+    error_message = Column(Text, nullable=True)
+
+    # Per-stage timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    submitted_at = Column(DateTime, nullable=True)
+    mediaconvert_started_at = Column(DateTime, nullable=True)
+    post_processing_started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    failed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_render_jobs_job_id", "job_id", unique=True),
+        Index("uq_render_jobs_mediaconvert_job_id", "mediaconvert_job_id", unique=True),
+        Index("ix_render_jobs_quota_period_user", "quota_period", "user_id"),
+        Index("ix_render_jobs_trace_id", "trace_id", postgresql_where=trace_id.isnot(None)),
+    )
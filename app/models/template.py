@@ -2,13 +2,93 @@
 Template model for viral video templates stored in Supabase.
 """
 
-from sqlalchemy import Column, String, Integer, BigInteger, Numeric, Boolean, DateTime, Text, ARRAY
+from sqlalchemy import Column, String, Integer, BigInteger, Numeric, Boolean, DateTime, Text, ARRAY, Index, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
+from typing import Any, Dict, List, Optional
+import json
+import re
 import uuid
 
 from . import Base
 
+DEFAULT_SLOT_DURATION = 3.0
+
+
+def normalize_script(script: Any) -> Optional[Dict[str, Any]]:
+    """
+    Validate a template script and return it as a {"clips": [...], ...} dict.
+
+    Accepts dicts, bare clip lists and JSON text (Airtable exports sometimes
+    carry leading '=' characters). Returns None for an empty script and
+    raises ValueError for anything that is not a JSON object or list.
+    """
+    if script is None:
+        return None
+    if isinstance(script, (bytes, str)):
+        clean = script.decode() if isinstance(script, bytes) else script
+        clean = clean.strip()
+        while clean.startswith('='):
+            clean = clean[1:].strip()
+        if not clean:
+            return None
+        script = json.loads(clean)
+    if isinstance(script, list):
+        script = {'clips': script}
+    if not isinstance(script, dict):
+        raise ValueError(f"Template script must be a JSON object, got {type(script).__name__}")
+    if not isinstance(script.get('clips', []), list):
+        raise ValueError("Template script 'clips' must be a list")
+    return script
+
+
+_NUMERIC = re.compile(r"^\s*-?\d+(\.\d+)?\s*$")
+
+
+def _clip_number(clip: Dict[str, Any], *keys: str) -> Optional[float]:
+    """First numeric value among keys (numbers or numeric strings), like the SQL trigger"""
+    for key in keys:
+        value = clip.get(key)
+        if isinstance(value, bool) or value is None:
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str) and _NUMERIC.match(value):
+            return float(value)
+    return None
+
+
+def build_slot_descriptors(script: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ordered slots of a normalized script.
+
+    Clips use either start_time/end_time or start/end; missing durations
+    fall back to end - start, then DEFAULT_SLOT_DURATION. Mirrored by the
+    templates_derive_script_columns() trigger, keep both in sync.
+    """
+    slots = []
+    for i, clip in enumerate((script or {}).get('clips', [])):
+        if not isinstance(clip, dict):
+            continue
+        start = _clip_number(clip, 'start_time', 'start') or 0.0
+        end = _clip_number(clip, 'end_time', 'end')
+        duration = _clip_number(clip, 'duration')
+        if duration is None:
+            duration = end - start if end is not None and end > start else DEFAULT_SLOT_DURATION
+        if end is None:
+            end = start + duration
+        slots.append({
+            'id': f"slot_{i}",
+            'order': clip['order'] if clip.get('order') is not None else i + 1,
+            'duration': duration,
+            'description': clip['description'] if clip.get('description') is not None else f'Slot {i + 1}',
+            'start_time': start,
+            'end_time': end
+        })
+    return slots
+
+
 class Template(Base):
     __tablename__ = "templates"
 
@@ -37,22 +117,36 @@ class Template(Base):
     # Video details
     duration = Column(Numeric(8, 2), nullable=True)  # duration in seconds
     
-    # Content and script
-    script = Column(Text, nullable=True)  # Store script as JSON string (from Airtable)
+    # Content and script (validated JSON object, see normalize_script)
+    script = Column(JSONB, nullable=True)
+
+    # Derived from script on every write (set_script below, and the
+    # templates_derive_script_columns() trigger for SQL imports)
     slots = Column(Integer, nullable=True, default=0)  # Number of clips/slots in template
-    
-    def to_dict(self):
-        """Convert template to dictionary for API responses."""
-        import json
+    total_duration = Column(Numeric(8, 2), nullable=True)  # Sum of slot durations in seconds
+    slot_descriptors = Column(JSONB, nullable=False, default=list, server_default='[]')  # Ordered slots
+
+    # Catalog build order and filters (see migrations/manual/add_template_catalog_indexes.sql
+    # and normalize_template_scripts.sql)
+    __table_args__ = (
+        Index("ix_templates_views", views.desc(), id),
+        Index("ix_templates_updated_at", updated_at),
+        Index("ix_templates_slots_duration", slots, total_duration),
+        CheckConstraint("script IS NULL OR jsonb_typeof(script) = 'object'", name="ck_templates_script_object"),
+    )
 
-        # Parse script if it's a string
-        script_data = self.script
-        if isinstance(self.script, str):
-            try:
-                script_data = json.loads(self.script)
-            except:
-                script_data = None
+    @validates('script')
+    def set_script(self, key, value):
+        """Normalize the script and refresh the derived slot columns"""
+        script = normalize_script(value)
+        descriptors = build_slot_descriptors(script)
+        self.slot_descriptors = descriptors
+        self.slots = len(descriptors)
+        self.total_duration = round(sum(s['duration'] for s in descriptors), 2) if descriptors else None
+        return script
 
+    def to_dict(self):
+        """Convert template to dictionary for API responses."""
         return {
             'id': str(self.id),
             'hotel_name': self.hotel_name,
@@ -68,8 +162,9 @@ class Template(Base):
             'comments': int(self.comments) if self.comments else 0,
             'ratio': float(self.ratio) if self.ratio else None,
             'duration': float(self.duration) if self.duration else None,
-            'script': script_data,  # Parsed JSON or None
+            'script': self.script,  # JSON object or None
             'slots': self.slots or 0,
+            'total_duration': float(self.total_duration) if self.total_duration is not None else None,
             # Computed/fallback fields for frontend compatibility
             'title': self.hotel_name,  # Use hotel_name as title
             'description': None,
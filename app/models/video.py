@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -26,6 +26,7 @@ class Video(Base):
     project_name = Column(String(255), nullable=True)  # Custom project name for compositions
     template_id = Column(UUID(as_uuid=False), ForeignKey("templates.id", ondelete="SET NULL"), nullable=True)
     project_data = Column(JSONB, default={})  # Stores: templateSlots, slotAssignments, textOverlays, customScript
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on every project save/patch
 
     # Source tracking
     source_type = Column(String(50), default="upload")  # upload, viral_template_composer, etc.
@@ -44,6 +45,12 @@ class Video(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)  # When video generation completed
 
+    # Keyset pagination: video library (created_at) and project editor list (updated_at)
+    __table_args__ = (
+        Index("ix_videos_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_videos_user_property_source_updated", user_id, property_id, source_type, updated_at.desc(), id.desc()),
+    )
+
     # Relationships
     property = relationship("Property", back_populates="videos")
     user = relationship("User", back_populates="videos")
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, PrimaryKeyConstraint
+from datetime import datetime
+from . import Base
+
+
+class VideoQuotaUsage(Base):
+    """Videos charged to a user's monthly quota (Postgres mirror of the Redis counters)"""
+    __tablename__ = "video_quota_usage"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    period = Column(String(7), nullable=False)  # UTC month, e.g. "2026-10"
+    used = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "period", name="pk_video_quota_usage"),
+    )
@@ -38,7 +38,8 @@ class AssetResponse(AssetBase):
 
 class AssetList(BaseModel):
     assets: List[AssetResponse]
-    total: int
+    total: int  # Assets in this page
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page
     
     class Config:
         from_attributes = True
\ No newline at end of file
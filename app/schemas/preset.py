@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -54,3 +54,10 @@ class PresetResponse(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+
+class PresetList(BaseModel):
+    """One page of presets"""
+    presets: List[PresetResponse]
+    total: int  # Presets in this page
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page
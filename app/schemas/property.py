@@ -87,6 +87,8 @@ class QuotaInfo(BaseModel):
     properties_remaining: int
     can_create_more: bool
     monthly_video_limit: int
+    monthly_videos_used: int = 0
+    monthly_videos_remaining: int = 0
     current_subscription_price_eur: int
 
 
@@ -9,9 +9,14 @@ import os
 import re
 import hashlib
 import random
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from openai import OpenAI
 
+from app.core.metrics import track_openai
+from app.core.request_timing import timed
+from app.models.template import normalize_script
+from app.services.llm_cache import llm_cache
+
 logger = logging.getLogger(__name__)
 
 class AIMatchingService:
@@ -35,23 +40,19 @@ class AIMatchingService:
                 logger.error(f"Failed to initialize OpenAI client: {e}")
                 self.client = "fallback"
         
-    def extract_script_content(self, script: str) -> str:
+    def extract_script_content(self, script: Union[str, Dict[str, Any]]) -> str:
         """
-        Extract meaningful text content from a viral video script JSON.
-        Handles cloud-based template data structure.
+        Extract meaningful text content from a viral video script.
+        Catalog templates carry the script as a dict; JSON text is still accepted.
         """
         if not script:
             return ""
             
         try:
-            # Clean the script JSON (remove markdown formatting)
-            clean_script = script.replace('```json', '').replace('```', '').strip()
-            
-            # Remove any formula prefix if present
-            if clean_script.startswith('='):
-                clean_script = clean_script[1:]
-            
-            script_data = json.loads(clean_script)
+            if isinstance(script, str):
+                # Clean the script JSON (remove markdown formatting)
+                script = script.replace('```json', '').replace('```', '')
+            script_data = normalize_script(script) or {}
             
             content_parts = []
             
@@ -131,29 +132,38 @@ Réponds UNIQUEMENT en JSON avec ce format exact:
         try:
             # Use OpenAI if available, otherwise intelligent fallback
             if isinstance(self.client, OpenAI):
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,  # Low temperature for consistent scoring
-                    max_tokens=150,   # Reduced for cost efficiency
-                    timeout=10        # 10 second timeout for cloud deployment
-                )
-                
-                result_text = response.choices[0].message.content.strip()
-                
-                # Clean potential formatting issues
-                if result_text.startswith('```json'):
-                    result_text = result_text.replace('```json', '').replace('```', '').strip()
-                
-                result = json.loads(result_text)
-                
-                # Normalize score to 0-1 range
-                normalized_score = max(0.0, min(1.0, result['score'] / 10.0))
-                
-                return {
-                    "score": normalized_score,
-                    "reasoning": result.get('reasoning', 'GPT analysis')[:100]  # Limit reasoning length
-                }
+                model = "gpt-3.5-turbo"
+                temperature = 0.1  # Low temperature for consistent scoring
+
+                def score_with_gpt() -> Dict[str, Any]:
+                    with timed("openai"), track_openai("clip_score"):
+                        response = self.client.chat.completions.create(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            temperature=temperature,
+                            max_tokens=150,   # Reduced for cost efficiency
+                            timeout=10        # 10 second timeout for cloud deployment
+                        )
+                    
+                    result_text = response.choices[0].message.content.strip()
+                    
+                    # Clean potential formatting issues
+                    if result_text.startswith('```json'):
+                        result_text = result_text.replace('```json', '').replace('```', '').strip()
+                    
+                    result = json.loads(result_text)
+                    
+                    # Normalize score to 0-1 range
+                    normalized_score = max(0.0, min(1.0, result['score'] / 10.0))
+                    
+                    return {
+                        "score": normalized_score,
+                        "reasoning": result.get('reasoning', 'GPT analysis')[:100]  # Limit reasoning length
+                    }
+
+                # Same request + same template → same score; fallback results are never cached
+                cache_key = llm_cache.make_key("template_score", model, temperature, prompt=prompt)
+                return llm_cache.get_or_compute(cache_key, score_with_gpt)
             else:
                 # Intelligent fallback system
                 return self._intelligent_fallback_analysis(user_description, template_info, script_content)
@@ -0,0 +1,297 @@
+"""
+Per-tenant fair scheduling (deficit round-robin in Redis).
+
+Work from several tenants (users) is queued in one sub-queue per tenant
+instead of a single FIFO, so one hotel group uploading 300 clips or
+rendering 40 videos cannot starve everybody else:
+
+- `{name}:q:{tenant}`: the tenant's items (JSON `{"cost": n, "payload": ...}`)
+- `{name}:ring`: tenants with queued work, in round-robin order
+- `{name}:deficit`: DRR credit per tenant; a tenant gains `quantum` each
+  time its turn passes and spends an item's cost to run it, so costly items
+  (large uploads) take proportionally more turns
+- `{name}:running` / `{name}:leases`: items in flight per tenant; every
+  dequeued item holds a lease (sorted set scored by expiry) until released
+- `{name}:items`: the item behind each lease. When a lease expires (crashed
+  consumer, lost callback) its item goes back to the head of its tenant's
+  queue, so delivery is at-least-once: consumers must tolerate running an
+  item twice (claim it in the database first)
+
+A tenant at `tenant_cap` items in flight is skipped while others have
+runnable work. Caps are soft: when only capped tenants have work, a second
+pass ignores them, so a big tenant alone gets the full `global_cap`
+throughput of an idle system. Dequeues are one Lua script, so several API
+processes or consumers can share the same queues.
+"""
+
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Turns a tenant may be skipped per dequeue before giving up (bounds the script)
+_MAX_ROUNDS = 16
+
+# KEYS[1] tenant queue, KEYS[2] ring, KEYS[3] deficit; ARGV: tenant, item, quantum
+_ENQUEUE_LUA = """
+redis.call('RPUSH', KEYS[1], ARGV[2])
+if redis.call('HEXISTS', KEYS[3], ARGV[1]) == 0 then
+    redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+return redis.call('LLEN', KEYS[1])
+"""
+
+# KEYS[1] ring, KEYS[2] deficit, KEYS[3] running, KEYS[4] leases, KEYS[5] leased items
+# ARGV: queue key prefix, quantum, tenant cap, global cap, now, lease ttl, lease id, max rounds
+# Returns {tenant, lease, item} or nil when nothing may run now.
+_DEQUEUE_LUA = """
+local now = tonumber(ARGV[5])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', now)
+for _, lease in ipairs(expired) do
+    local tenant = string.match(lease, '^(.*)|')
+    if redis.call('HINCRBY', KEYS[3], tenant, -1) <= 0 then
+        redis.call('HDEL', KEYS[3], tenant)
+    end
+    local item = redis.call('HGET', KEYS[5], lease)
+    if item then
+        redis.call('HDEL', KEYS[5], lease)
+        redis.call('LPUSH', ARGV[1] .. tenant, item)
+        if redis.call('HEXISTS', KEYS[2], tenant) == 0 then
+            redis.call('HSET', KEYS[2], tenant, ARGV[2])
+            redis.call('RPUSH', KEYS[1], tenant)
+        end
+    end
+end
+if #expired > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', now)
+end
+
+local global_cap = tonumber(ARGV[4])
+if global_cap > 0 and redis.call('ZCARD', KEYS[4]) >= global_cap then
+    return nil
+end
+
+local quantum = tonumber(ARGV[2])
+local tenant_cap = tonumber(ARGV[3])
+
+local function walk(respect_cap)
+    local skipped = false
+    local steps = redis.call('LLEN', KEYS[1]) * tonumber(ARGV[8])
+    for _ = 1, steps do
+        local tenant = redis.call('LINDEX', KEYS[1], 0)
+        if not tenant then
+            break
+        end
+        local queue = ARGV[1] .. tenant
+        local head = redis.call('LINDEX', queue, 0)
+        if not head then
+            redis.call('LPOP', KEYS[1])
+            redis.call('HDEL', KEYS[2], tenant)
+        elseif respect_cap and tenant_cap > 0
+                and tonumber(redis.call('HGET', KEYS[3], tenant) or '0') >= tenant_cap then
+            skipped = true
+            redis.call('RPUSH', KEYS[1], redis.call('LPOP', KEYS[1]))
+        else
+            local cost = tonumber(cjson.decode(head)['cost']) or 1
+            local deficit = tonumber(redis.call('HGET', KEYS[2], tenant) or '0')
+            if deficit >= cost then
+                redis.call('LPOP', queue)
+                if redis.call('LLEN', queue) == 0 then
+                    redis.call('LPOP', KEYS[1])
+                    redis.call('HDEL', KEYS[2], tenant)
+                else
+                    redis.call('HSET', KEYS[2], tenant, deficit - cost)
+                end
+                local lease = tenant .. '|' .. ARGV[7]
+                redis.call('HINCRBY', KEYS[3], tenant, 1)
+                redis.call('ZADD', KEYS[4], now + tonumber(ARGV[6]), lease)
+                redis.call('HSET', KEYS[5], lease, head)
+                return {tenant, lease, head}
+            end
+            redis.call('HSET', KEYS[2], tenant, deficit + quantum)
+            redis.call('RPUSH', KEYS[1], redis.call('LPOP', KEYS[1]))
+        end
+    end
+    return skipped
+end
+
+local picked = walk(true)
+if picked == true then
+    picked = walk(false)
+end
+if type(picked) == 'table' then
+    return picked
+end
+return nil
+"""
+
+# KEYS[1] leases, KEYS[2] running, KEYS[3] tracking key, KEYS[4] leased items
+# ARGV[1] lease ('' = read KEYS[3])
+_RELEASE_LUA = """
+local lease = ARGV[1]
+if lease == '' then
+    lease = redis.call('GET', KEYS[3])
+    if not lease then
+        return 0
+    end
+end
+redis.call('DEL', KEYS[3])
+redis.call('HDEL', KEYS[4], lease)
+if redis.call('ZREM', KEYS[1], lease) == 0 then
+    return 0
+end
+local tenant = string.match(lease, '^(.*)|')
+if redis.call('HINCRBY', KEYS[2], tenant, -1) <= 0 then
+    redis.call('HDEL', KEYS[2], tenant)
+end
+return 1
+"""
+
+
+@dataclass
+class FairLease:
+    """One dequeued item; release() its `lease_id` when done, or the item is requeued when the lease expires"""
+    tenant: str
+    lease_id: str
+    payload: Any
+
+
+class _FairQueues:
+    """Key layout and script arguments shared by the async and sync schedulers"""
+
+    def __init__(self, name: str, quantum: int, tenant_cap: int, global_cap: int, lease_ttl_seconds: int):
+        self.name = name
+        self.quantum = max(quantum, 1)
+        self.tenant_cap = tenant_cap
+        self.global_cap = global_cap
+        self.lease_ttl_seconds = lease_ttl_seconds
+
+    def _queue_key(self, tenant: str) -> str:
+        return f"{self.name}:q:{tenant}"
+
+    def _tracking_key(self, job_id: str) -> str:
+        return f"{self.name}:lease:{job_id}"
+
+    @property
+    def _ring_key(self) -> str:
+        return f"{self.name}:ring"
+
+    @property
+    def _deficit_key(self) -> str:
+        return f"{self.name}:deficit"
+
+    @property
+    def _running_key(self) -> str:
+        return f"{self.name}:running"
+
+    @property
+    def _leases_key(self) -> str:
+        return f"{self.name}:leases"
+
+    @property
+    def _items_key(self) -> str:
+        return f"{self.name}:items"
+
+    def _enqueue_call(self, tenant: str, payload: Any, cost: int) -> Dict[str, Any]:
+        item = json.dumps({"cost": max(int(cost), 1), "payload": payload})
+        return {
+            "keys": [self._queue_key(tenant), self._ring_key, self._deficit_key],
+            "args": [tenant, item, self.quantum],
+        }
+
+    def _dequeue_call(self) -> Dict[str, Any]:
+        return {
+            "keys": [self._ring_key, self._deficit_key, self._running_key, self._leases_key, self._items_key],
+            "args": [
+                f"{self.name}:q:",
+                self.quantum,
+                self.tenant_cap,
+                self.global_cap,
+                time.time(),
+                self.lease_ttl_seconds,
+                uuid.uuid4().hex,
+                _MAX_ROUNDS,
+            ],
+        }
+
+    def _release_call(self, lease_id: str = "", job_id: str = "") -> Dict[str, Any]:
+        return {
+            "keys": [self._leases_key, self._running_key, self._tracking_key(job_id), self._items_key],
+            "args": [lease_id],
+        }
+
+    @staticmethod
+    def _lease(result) -> Optional[FairLease]:
+        if not result:
+            return None
+        tenant, lease_id, item = result
+        return FairLease(tenant=tenant, lease_id=lease_id, payload=json.loads(item)["payload"])
+
+
+class FairScheduler(_FairQueues):
+    """Async scheduler on the shared API Redis client"""
+
+    async def enqueue(self, tenant: str, payload: Any, cost: int = 1) -> int:
+        """Queue JSON-serializable `payload` for `tenant`; returns the tenant's queue length"""
+        script = get_redis().register_script(_ENQUEUE_LUA)
+        return int(await script(**self._enqueue_call(str(tenant), payload, cost)))
+
+    async def dequeue(self) -> Optional[FairLease]:
+        """Next item in fair order, or None when nothing may run now"""
+        script = get_redis().register_script(_DEQUEUE_LUA)
+        return self._lease(await script(**self._dequeue_call()))
+
+    async def release(self, lease_id: str) -> bool:
+        script = get_redis().register_script(_RELEASE_LUA)
+        return bool(await script(**self._release_call(lease_id=lease_id)))
+
+    async def track(self, job_id: str, lease_id: str) -> None:
+        """Remember a lease by job id, for work finished elsewhere (e.g. a callback)"""
+        await get_redis().set(self._tracking_key(job_id), lease_id, ex=self.lease_ttl_seconds)
+
+    async def release_tracked(self, job_id: str) -> bool:
+        """Release the lease tracked for `job_id` (no-op for jobs never scheduled)"""
+        try:
+            script = get_redis().register_script(_RELEASE_LUA)
+            return bool(await script(**self._release_call(job_id=job_id)))
+        except Exception as e:
+            # The lease expires on its own after lease_ttl_seconds
+            logger.warning(f"⚠️ Fair scheduler release failed for job {job_id}: {str(e)}")
+            return False
+
+
+class SyncFairScheduler(_FairQueues):
+    """Blocking scheduler for worker threads (e.g. the ingest consumer); pass a sync Redis client"""
+
+    def __init__(self, client, name: str, quantum: int, tenant_cap: int, global_cap: int, lease_ttl_seconds: int):
+        super().__init__(name, quantum, tenant_cap, global_cap, lease_ttl_seconds)
+        self._enqueue_script = client.register_script(_ENQUEUE_LUA)
+        self._dequeue_script = client.register_script(_DEQUEUE_LUA)
+        self._release_script = client.register_script(_RELEASE_LUA)
+
+    def enqueue(self, tenant: str, payload: Any, cost: int = 1) -> int:
+        return int(self._enqueue_script(**self._enqueue_call(str(tenant), payload, cost)))
+
+    def dequeue(self) -> Optional[FairLease]:
+        return self._lease(self._dequeue_script(**self._dequeue_call()))
+
+    def release(self, lease_id: str) -> bool:
+        return bool(self._release_script(**self._release_call(lease_id=lease_id)))
+
+
+# Bulk renders (/generate-batch); leases are released by the render callbacks
+render_scheduler = FairScheduler(
+    "fair:renders",
+    quantum=settings.FAIR_SCHEDULER_QUANTUM,
+    tenant_cap=settings.FAIR_SCHEDULER_TENANT_MAX_RENDERS,
+    global_cap=settings.FAIR_SCHEDULER_MAX_RENDERS_IN_FLIGHT,
+    lease_ttl_seconds=settings.FAIR_SCHEDULER_RENDER_LEASE_SECONDS
+)
@@ -0,0 +1,209 @@
+"""
+Event-driven upload ingest.
+
+S3 publishes an ObjectCreated notification to the ingest queue for every
+object under `videos/`. The consumer (tasks/ingest_consumer.py) turns each
+notification into an Asset row keyed by the id in
+`videos/{user_id}/{property_id}/{asset_id}.{ext}` and dispatches analysis.
+
+Every step is idempotent: the upsert never overwrites an existing row's
+status, and analysis is only dispatched by whoever moves the asset from
+`uploaded` to `processing` (or reclaims a `processing` row that went stale),
+so duplicate and redelivered notifications are harmless.
+
+With FAIR_SCHEDULING_ENABLED the consumer records the asset, queues the
+upload per user in the fair scheduler and claims it only when it is picked.
+"""
+
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote_plus
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.asset import Asset
+from app.models.property import Property
+
+logger = logging.getLogger(__name__)
+
+VIDEO_KEY_PATTERN = re.compile(
+    r"^videos/(?P<user_id>\d+)/(?P<property_id>\d+)/(?P<asset_id>[0-9a-fA-F-]{36})\.(?P<ext>[A-Za-z0-9]+)$"
+)
+
+
+@dataclass
+class UploadEvent:
+    """One uploaded video, as described by its S3 key and notification"""
+    s3_key: str
+    user_id: int
+    property_id: int
+    asset_id: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+
+
+def parse_video_key(s3_key: str, size: Optional[int] = None, etag: Optional[str] = None) -> Optional[UploadEvent]:
+    match = VIDEO_KEY_PATTERN.match(s3_key)
+    if not match:
+        return None
+    return UploadEvent(
+        s3_key=s3_key,
+        user_id=int(match.group("user_id")),
+        property_id=int(match.group("property_id")),
+        asset_id=match.group("asset_id"),
+        size=size,
+        etag=etag
+    )
+
+
+def parse_notification(body: Any) -> List[UploadEvent]:
+    """
+    Upload events contained in one queue message body.
+
+    Accepts raw S3 notifications, SNS-wrapped ones (`Message` field) and the
+    `s3:TestEvent` S3 sends when the notification is configured. Keys that do
+    not follow the upload layout are ignored.
+    """
+    if isinstance(body, (str, bytes)):
+        body = json.loads(body)
+    if isinstance(body, dict) and isinstance(body.get("Message"), str):
+        body = json.loads(body["Message"])
+    if not isinstance(body, dict):
+        return []
+
+    events = []
+    for record in body.get("Records", []):
+        if not record.get("eventName", "").startswith("ObjectCreated"):
+            continue
+        s3_object = record.get("s3", {}).get("object", {})
+        # Keys are URL-encoded in notifications (spaces become '+')
+        s3_key = unquote_plus(s3_object.get("key", ""))
+        event = parse_video_key(s3_key, s3_object.get("size"), s3_object.get("eTag"))
+        if event:
+            events.append(event)
+        else:
+            logger.info(f"⏭️ Ignoring object outside upload layout: {s3_key}")
+    return events
+
+
+def upsert_asset(db: Session, event: UploadEvent, title: Optional[str] = None) -> bool:
+    """
+    Create the Asset for an uploaded video if it does not exist yet.
+
+    Returns False when the property does not belong to the user in the key
+    (the object is then left alone). Existing rows only get their size filled in.
+    """
+    owner = db.execute(
+        select(Property.id).where(
+            and_(Property.id == event.property_id, Property.user_id == event.user_id)
+        )
+    ).scalar_one_or_none()
+    if owner is None:
+        logger.warning(f"⚠️ Upload {event.s3_key} does not match an owned property, skipping")
+        return False
+
+    stmt = insert(Asset).values(
+        id=event.asset_id,
+        title=title or f"Video {event.asset_id[:8]}",
+        file_url=f"{settings.STORAGE_PUBLIC_BASE}/{event.s3_key}",
+        file_size=event.size,
+        status="uploaded",
+        asset_type="video",
+        property_id=event.property_id,
+        user_id=event.user_id,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    if event.size is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Asset.id],
+            set_={"file_size": stmt.excluded.file_size}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Asset.id])
+    db.execute(stmt)
+    return True
+
+
+def claim_for_processing(db: Session, asset_id: str) -> bool:
+    """
+    Atomically move an asset to `processing`; only the winner dispatches analysis.
+
+    A `processing` row untouched for INGEST_STALE_PROCESSING_MINUTES is
+    reclaimed, so a consumer crash mid-analysis is retried on redelivery.
+    """
+    stale_before = datetime.utcnow() - timedelta(minutes=settings.INGEST_STALE_PROCESSING_MINUTES)
+    result = db.execute(
+        update(Asset)
+        .where(
+            and_(
+                Asset.id == asset_id,
+                or_(
+                    Asset.status == "uploaded",
+                    and_(Asset.status == "processing", Asset.updated_at < stale_before)
+                )
+            )
+        )
+        .values(status="processing", updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def upload_cost(event: UploadEvent) -> int:
+    """Fair scheduler cost of analysing an upload: 1 per started FAIR_SCHEDULER_INGEST_COST_MB"""
+    if not event.size:
+        return 1
+    return max(math.ceil(event.size / (settings.FAIR_SCHEDULER_INGEST_COST_MB * 1024 * 1024)), 1)
+
+
+def record_upload(db: Session, event: UploadEvent) -> bool:
+    """Upsert only, committed (fair scheduling claims the asset when its tenant's turn comes)"""
+    try:
+        owned = upsert_asset(db, event)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return owned
+
+
+def claim_event(db: Session, event: UploadEvent) -> bool:
+    """Claim an already recorded upload, committed. Returns True if analysis should run."""
+    try:
+        claimed = claim_for_processing(db, event.asset_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if not claimed:
+        logger.info(f"⏭️ Asset {event.asset_id} already claimed, not dispatching")
+    return claimed
+
+
+def ingest_event(db: Session, event: UploadEvent) -> bool:
+    """Upsert + claim in one transaction. Returns True if analysis should be dispatched."""
+    try:
+        if not upsert_asset(db, event):
+            db.commit()
+            return False
+        claimed = claim_for_processing(db, event.asset_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if claimed:
+        logger.info(f"📥 Ingested {event.s3_key} → asset {event.asset_id}")
+    else:
+        logger.info(f"⏭️ Asset {event.asset_id} already ingested, not dispatching")
+    return claimed
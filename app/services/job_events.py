@@ -0,0 +1,143 @@
+"""
+Push-based render job status events.
+
+Callbacks and worker progress reports publish state transitions to Redis
+pub/sub. Each API process holds a single pattern subscription and fans the
+events out to its connected SSE clients through in-memory queues, so an open
+status stream costs no database query after its initial snapshot.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "render_job_events:"
+TERMINAL_EVENT_STATUSES = {"COMPLETED", "FAILED"}
+
+_SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def build_status_event(
+    job_id: Optional[str],
+    video_id: Optional[str],
+    status: Optional[str],
+    progress: Optional[int] = None,
+    file_url: Optional[str] = None,
+    error_message: Optional[str] = None,
+    stage: Optional[str] = None
+) -> Dict[str, Any]:
+    """Status event with the same fields as /video-generation/status/{job_id}"""
+    return {
+        "jobId": job_id,
+        "video_id": video_id,
+        "status": (status or "processing").upper(),
+        "progress": progress,
+        "file_url": file_url,
+        "outputUrl": file_url,
+        "errorMessage": error_message,
+        "stage": stage,
+        "at": datetime.utcnow().isoformat()
+    }
+
+
+async def publish_job_event(event: Dict[str, Any], keys: Iterable[Optional[str]]) -> None:
+    """
+    Publish an event on the channel of every given key (job id, video id).
+
+    Never raises: a Redis outage must not fail the callback that triggered it.
+    """
+    try:
+        redis = get_redis()
+        message = json.dumps(event, default=str)
+        for key in {k for k in keys if k}:
+            await redis.publish(f"{CHANNEL_PREFIX}{key}", message)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to publish job event for {list(keys)}: {str(e)}")
+
+
+class JobEventBroker:
+    """One Redis pattern subscription per process, fanned out to local subscriber queues"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self, key: str) -> AsyncIterator[asyncio.Queue]:
+        """Receive events published for `key` until the context exits"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(key, set()).add(queue)
+        self._ensure_listener()
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(key)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[key]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def stop(self) -> None:
+        if self._listener and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                logger.info("📡 Subscribed to render job events")
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message.get("type") != "pmessage":
+                        continue
+                    self._dispatch(message["channel"][len(CHANNEL_PREFIX):], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Render job event subscription failed: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    def _dispatch(self, key: str, data: str) -> None:
+        queues = self._subscribers.get(key)
+        if not queues:
+            return
+        try:
+            event = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Ignoring malformed job event on {key}")
+            return
+        for queue in list(queues):
+            if queue.full():
+                # Slow client: drop the oldest event, the latest state matters most
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+# Global broker shared by all status streams of this process
+job_event_broker = JobEventBroker()
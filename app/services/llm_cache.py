@@ -0,0 +1,304 @@
+"""
+Shared response cache for LLM-backed endpoints.
+
+Smart matching, template scoring and caption generation send near-identical
+prompts over and over (same assets, same template, same property). This
+cache stores completed responses keyed by a normalized hash of the model,
+the prompt inputs and a temperature bucket, with TTL expiry and LRU
+eviction. Concurrent identical requests are coalesced so only one of them
+reaches OpenAI (single-flight). Followers wait at most LLM_CACHE_LOCK_WAIT_SECONDS
+for the leader; if it is too slow or was cancelled they call OpenAI themselves.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _LeaderCancelled(Exception):
+    """The single-flight leader was cancelled before producing a value"""
+
+
+def _normalize(value: Any) -> Any:
+    """Collapse whitespace in strings so cosmetic prompt differences share a key"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class LLMResponseCache:
+    """In-process TTL + LRU cache with single-flight for LLM responses"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, temperature_bucket: float, lock_wait_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.temperature_bucket = temperature_bucket
+        self.lock_wait_seconds = lock_wait_seconds
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight_sync: Dict[str, threading.Event] = {}
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def make_key(self, namespace: str, model: str, temperature: float, **inputs: Any) -> str:
+        """Build a stable cache key from the model, prompt inputs and temperature bucket"""
+        if self.temperature_bucket > 0:
+            bucket = round(round(temperature / self.temperature_bucket) * self.temperature_bucket, 3)
+        else:
+            bucket = temperature
+        payload = json.dumps(
+            {"model": model, "temperature": bucket, "inputs": _normalize(inputs)},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{namespace}:{digest}"
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or None (counts as hit/miss)"""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is _MISSING:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._set_locked(key, value)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Synchronous single-flight lookup for blocking OpenAI clients"""
+        if not settings.LLM_CACHE_ENABLED:
+            return compute()
+
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            event = self._inflight_sync.get(key)
+            leader = event is None
+            if leader:
+                event = threading.Event()
+                self._inflight_sync[key] = event
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            event.wait(timeout=self.lock_wait_seconds)
+            with self._lock:
+                value = self._get_locked(key)
+            if value is not _MISSING:
+                return value
+            # Leader failed, timed out or produced an uncacheable result: compute ourselves
+            return compute()
+
+        try:
+            value = compute()
+            if cacheable is None or cacheable(value):
+                self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight_sync.pop(key, None)
+            event.set()
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Async single-flight lookup: identical concurrent requests await one call"""
+        if not settings.LLM_CACHE_ENABLED:
+            return await compute()
+
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            future = self._inflight_async.get(key)
+            leader = future is None
+            if leader:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight_async[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            try:
+                # shield: a follower giving up or being cancelled never cancels the leader
+                return await asyncio.wait_for(asyncio.shield(future), timeout=self.lock_wait_seconds)
+            except (_LeaderCancelled, asyncio.TimeoutError):
+                logger.info(f"⏱️ LLM cache leader gone or slow for {key}, computing directly")
+                return await compute()
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            # Followers must not inherit the leader's cancellation
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        else:
+            if cacheable is None or cacheable(value):
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight_async.pop(key, None)
+
+    async def astream_or_compute(self, key: str, stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Single-flight for streamed text responses.
+
+        The leader yields chunks as they arrive and caches the joined text
+        once the stream completes; cache hits and followers get the whole
+        text as one chunk. Shares in-flight calls with aget_or_compute.
+        """
+        if not settings.LLM_CACHE_ENABLED:
+            async for chunk in stream():
+                yield chunk
+            return
+
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                self.hits += 1
+            else:
+                value = None
+                future = self._inflight_async.get(key)
+                leader = future is None
+                if leader:
+                    future = asyncio.get_running_loop().create_future()
+                    self._inflight_async[key] = future
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+
+        if value is not None:
+            yield value
+            return
+
+        if not leader:
+            try:
+                value = await asyncio.wait_for(asyncio.shield(future), timeout=self.lock_wait_seconds)
+            except (_LeaderCancelled, asyncio.TimeoutError):
+                logger.info(f"⏱️ LLM cache leader gone or slow for {key}, streaming directly")
+                async for chunk in stream():
+                    yield chunk
+                return
+            if value:
+                yield value
+            return
+
+        parts = []
+        try:
+            async for chunk in stream():
+                parts.append(chunk)
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client disconnected: followers stream on their own, nothing is cached
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            value = "".join(parts).strip()
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._inflight_async.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": settings.LLM_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "inflight": len(self._inflight_sync) + len(self._inflight_async),
+            }
+
+    def _get_locked(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_locked(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# Global instance shared by matching, scoring and caption endpoints
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    temperature_bucket=settings.LLM_CACHE_TEMPERATURE_BUCKET,
+    lock_wait_seconds=settings.LLM_CACHE_LOCK_WAIT_SECONDS,
+)
@@ -0,0 +1,119 @@
+"""
+Resumable multipart uploads.
+
+Large videos go to S3 in parts uploaded directly by the browser, several in
+parallel. The upload session (owner, key, part size) and the parts reported
+as done live in Redis so an interrupted client can ask what is left and
+resume. Sessions expire after MULTIPART_UPLOAD_TTL_HOURS; the sweeper aborts
+the matching S3 uploads so abandoned parts stop costing storage.
+"""
+
+import json
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.infrastructure.storage.s3_service import get_s3_service
+
+logger = logging.getLogger(__name__)
+
+SESSION_PREFIX = "multipart_upload:"
+SWEEPER_LOCK_KEY = "multipart_upload_sweeper:lock"
+
+# S3 limits
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+# Prefixes where browsers start multipart uploads
+UPLOAD_PREFIXES = ("videos/",)
+
+
+def compute_part_size(file_size: int) -> int:
+    """Configured part size, grown if needed to stay under S3's 10,000 parts"""
+    part_size = max(settings.MULTIPART_PART_SIZE_MB * 1024 * 1024, MIN_PART_SIZE)
+    return max(part_size, math.ceil(file_size / MAX_PARTS))
+
+
+def _session_key(upload_id: str) -> str:
+    return f"{SESSION_PREFIX}{upload_id}"
+
+
+def _parts_key(upload_id: str) -> str:
+    return f"{SESSION_PREFIX}{upload_id}:parts"
+
+
+def _ttl_seconds() -> int:
+    return settings.MULTIPART_UPLOAD_TTL_HOURS * 3600
+
+
+async def save_session(upload_id: str, session: Dict[str, Any]) -> None:
+    await get_redis().set(_session_key(upload_id), json.dumps(session), ex=_ttl_seconds())
+
+
+async def get_session(upload_id: str) -> Optional[Dict[str, Any]]:
+    data = await get_redis().get(_session_key(upload_id))
+    return json.loads(data) if data else None
+
+
+async def record_parts(upload_id: str, parts: Dict[int, str]) -> Dict[int, str]:
+    """Store reported parts (idempotent: re-reporting a part overwrites its ETag)"""
+    redis = get_redis()
+    key = _parts_key(upload_id)
+    if parts:
+        pipe = redis.pipeline()
+        pipe.hset(key, mapping={str(number): etag for number, etag in parts.items()})
+        pipe.expire(key, _ttl_seconds())
+        await pipe.execute()
+    return await get_recorded_parts(upload_id)
+
+
+async def get_recorded_parts(upload_id: str) -> Dict[int, str]:
+    stored = await get_redis().hgetall(_parts_key(upload_id))
+    return {int(number): etag for number, etag in stored.items()}
+
+
+async def delete_session(upload_id: str) -> None:
+    await get_redis().delete(_session_key(upload_id), _parts_key(upload_id))
+
+
+def missing_parts(session: Dict[str, Any], parts: Dict[int, Any]) -> List[int]:
+    return [n for n in range(1, session["part_count"] + 1) if n not in parts]
+
+
+def expected_part_size(session: Dict[str, Any], part_number: int) -> int:
+    """Every part is `part_size` bytes except the last, which holds the remainder"""
+    if part_number < session["part_count"]:
+        return session["part_size"]
+    return session["file_size"] - session["part_size"] * (session["part_count"] - 1)
+
+
+def mismatched_parts(session: Dict[str, Any], sizes: Dict[int, int]) -> List[int]:
+    """
+    Parts whose stored size differs from the layout of the declared file size.
+
+    Part URLs do not bound the request body, so this is what keeps an upload
+    within MULTIPART_MAX_FILE_SIZE_MB and the size it was created with.
+    """
+    return [n for n in sorted(sizes) if sizes[n] != expected_part_size(session, n)]
+
+
+async def sweep_stale_uploads() -> int:
+    """Abort multipart uploads started longer ago than the session TTL"""
+    s3_service = get_s3_service()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.MULTIPART_UPLOAD_TTL_HOURS)
+    aborted = 0
+
+    for prefix in UPLOAD_PREFIXES:
+        for upload in await s3_service.list_multipart_uploads(prefix):
+            if upload["initiated"] >= cutoff:
+                continue
+            if await s3_service.abort_multipart_upload(upload["key"], upload["upload_id"]):
+                await delete_session(upload["upload_id"])
+                aborted += 1
+
+    if aborted:
+        logger.info(f"🧹 Aborted {aborted} stale multipart uploads")
+    return aborted
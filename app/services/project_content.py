@@ -0,0 +1,122 @@
+"""
+Project content references.
+
+Projects used to embed full `contentVideos` objects (URLs, thumbnails,
+descriptions...) copied from `assets` rows. They are now stored as
+references: `{"id": asset_id}` plus per-project overrides (any key that is
+not owned by the asset). Asset-owned fields always come from the asset when
+a project is opened, so renamed or re-thumbnailed assets show up everywhere.
+
+Entries whose asset no longer exists are kept as stored so old projects
+still open. Rows are rewritten by migrations/manual/compact_project_content.sql.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import Asset
+
+logger = logging.getLogger(__name__)
+
+CONTENT_KEY = "contentVideos"
+
+# contentVideo keys owned by the asset row (never stored in projects)
+ASSET_FIELDS = {
+    "title": "title",
+    "description": "description",
+    "file_url": "file_url",
+    "video_url": "file_url",  # Frontend compatibility
+    "thumbnail_url": "thumbnail_url",
+    "duration": "duration",
+    "file_size": "file_size",
+    "status": "status",
+    "asset_type": "asset_type",
+    "property_id": "property_id",
+    "user_id": "user_id",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+def _entries(project_data: Optional[Dict[str, Any]]) -> List[Any]:
+    entries = (project_data or {}).get(CONTENT_KEY)
+    return entries if isinstance(entries, list) else []
+
+
+def content_asset_ids(project_data: Optional[Dict[str, Any]]) -> List[str]:
+    return [
+        str(entry["id"]) for entry in _entries(project_data)
+        if isinstance(entry, dict) and entry.get("id")
+    ]
+
+
+def asset_content_fields(asset: Asset) -> Dict[str, Any]:
+    fields = {}
+    for key, attribute in ASSET_FIELDS.items():
+        value = getattr(asset, attribute)
+        fields[key] = value.isoformat() if hasattr(value, "isoformat") else value
+    return fields
+
+
+async def load_content_assets(
+    db: AsyncSession,
+    user_id: int,
+    projects: Iterable[Optional[Dict[str, Any]]]
+) -> Dict[str, Asset]:
+    """Assets referenced by any of the projects, in one `WHERE id IN` query"""
+    ids = {asset_id for project_data in projects for asset_id in content_asset_ids(project_data)}
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Asset).where(Asset.id.in_(ids), Asset.user_id == user_id)
+    )
+    return {asset.id: asset for asset in result.scalars().all()}
+
+
+def compact_project_data(project_data: Optional[Dict[str, Any]], assets: Dict[str, Asset]) -> Optional[Dict[str, Any]]:
+    """Storage form: contentVideos reduced to asset ids plus overrides"""
+    entries = _entries(project_data)
+    if not entries:
+        return project_data
+
+    compacted = []
+    for entry in entries:
+        if isinstance(entry, dict) and str(entry.get("id")) in assets:
+            compacted.append({k: v for k, v in entry.items() if k not in ASSET_FIELDS})
+        else:
+            compacted.append(entry)
+    return {**project_data, CONTENT_KEY: compacted}
+
+
+def hydrate_project_data(project_data: Optional[Dict[str, Any]], assets: Dict[str, Asset]) -> Optional[Dict[str, Any]]:
+    """API form: asset fields filled in from the referenced assets"""
+    entries = _entries(project_data)
+    if not entries:
+        return project_data
+
+    hydrated = []
+    for entry in entries:
+        asset = assets.get(str(entry.get("id"))) if isinstance(entry, dict) else None
+        if asset is None:
+            hydrated.append(entry)
+            continue
+        overrides = {k: v for k, v in entry.items() if k not in ASSET_FIELDS}
+        hydrated.append({"id": asset.id, **asset_content_fields(asset), **overrides})
+    return {**project_data, CONTENT_KEY: hydrated}
+
+
+async def hydrate_projects(
+    db: AsyncSession,
+    user_id: int,
+    projects: List[Optional[Dict[str, Any]]]
+) -> List[Optional[Dict[str, Any]]]:
+    """Hydrate several projects with a single asset query"""
+    assets = await load_content_assets(db, user_id, projects)
+    return [hydrate_project_data(project_data, assets) for project_data in projects]
+
+
+async def hydrate_project(db: AsyncSession, user_id: int, project_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return (await hydrate_projects(db, user_id, [project_data]))[0]
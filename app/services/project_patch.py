@@ -0,0 +1,158 @@
+"""
+JSON Patch (RFC 6902) for project documents, applied inside Postgres.
+
+Autosave sends a few operations instead of the whole `project_data`. The
+operations are compiled into one jsonb expression (jsonb_set / jsonb_insert
+/ #-), so a patch is a single `UPDATE ... WHERE version = :v`. Each step
+checks its preconditions (paths that must exist, `test` values, array
+indexes) against the document as left by the preceding operations, as
+RFC 6902 requires, and yields NULL when one fails; the UPDATE requires a
+non-NULL result. Each step reads the previous document through a subquery,
+so the SQL grows linearly with the number of operations.
+
+Array indexes must be canonical non-negative integers below the array
+length (up to the length for `add`, or `-` to append); other tokens on an
+array fail the patch instead of reaching jsonb_set with a bad path.
+
+Supported: add, remove, replace, test. Operations on the document root are
+rejected (use POST /projects/save to replace a whole project).
+"""
+
+import json
+import re
+from typing import Any, Callable, List, Sequence, Set, Tuple
+
+from sqlalchemy import Text, and_, case, cast, false, func, literal, select, true
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.sql.elements import ColumnElement
+
+SUPPORTED_OPS = ("add", "remove", "replace", "test")
+MAX_OPERATIONS = 200
+
+# RFC 6901 array index: no sign, no leading zeros
+_ARRAY_INDEX = re.compile(r"^(0|[1-9][0-9]*)$")
+
+
+class PatchError(ValueError):
+    """Malformed patch (bad pointer, unsupported operation)"""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """JSON Pointer (RFC 6901) to path tokens"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _path(tokens: Sequence[str]) -> ColumnElement:
+    return array([literal(token, Text) for token in tokens], type_=Text)
+
+
+def _value(value: Any) -> ColumnElement:
+    return cast(literal(json.dumps(value), Text), JSONB)
+
+
+def _get(document: ColumnElement, tokens: Sequence[str]) -> ColumnElement:
+    if not tokens:
+        return document
+    return document.op("#>", return_type=JSONB)(_path(tokens))
+
+
+def _index_ok(container: ColumnElement, token: str, allow_end: bool) -> ColumnElement:
+    """False when `container` is an array and `token` is not a valid index into it"""
+    if _ARRAY_INDEX.match(token):
+        length = func.jsonb_array_length(container)
+        valid = literal(int(token)) <= length if allow_end else literal(int(token)) < length
+    else:
+        valid = false()
+    # CASE, not OR: jsonb_array_length raises on non-arrays
+    return case((func.jsonb_typeof(container) == "array", valid), else_=true())
+
+
+def _indexes_ok(document: ColumnElement, tokens: Sequence[str], allow_end: bool = False) -> ColumnElement:
+    """Every token addressing an array element is a valid index (the last one may equal the length)"""
+    return and_(*[
+        _index_ok(_get(document, tokens[:position]), token, allow_end and position == len(tokens) - 1)
+        for position, token in enumerate(tokens)
+    ])
+
+
+def _step(document: ColumnElement, build: Callable[[ColumnElement], Tuple[ColumnElement, ColumnElement]]) -> ColumnElement:
+    """Next document state: build(doc) -> (precondition, patched doc); NULL when the precondition fails"""
+    state = select(document.label("doc")).correlate_except(None).subquery()
+    precondition, patched = build(state.c.doc)
+    return select(case((precondition, patched)).label("doc")).scalar_subquery()
+
+
+def _compile_operation(operation: Any, tokens: List[str]) -> Callable[[ColumnElement], Tuple[ColumnElement, ColumnElement]]:
+    value = _value(operation.value) if operation.op in ("add", "replace", "test") else None
+    parent = tokens[:-1]
+
+    if operation.op == "test":
+        return lambda doc: (and_(_indexes_ok(doc, tokens), _get(doc, tokens) == value), doc)
+
+    if operation.op == "remove":
+        return lambda doc: (
+            and_(_indexes_ok(doc, tokens), _get(doc, tokens).isnot(None)),
+            doc.op("#-", return_type=JSONB)(_path(tokens))
+        )
+
+    if operation.op == "replace":
+        return lambda doc: (
+            and_(_indexes_ok(doc, tokens), _get(doc, tokens).isnot(None)),
+            func.jsonb_set(doc, _path(tokens), value, False, type_=JSONB)
+        )
+
+    if tokens[-1] == "-":
+        # Append to an array
+        def append(doc: ColumnElement) -> Tuple[ColumnElement, ColumnElement]:
+            parent_value = _get(doc, parent)
+            appended = parent_value.op("||", return_type=JSONB)(func.jsonb_build_array(value))
+            return (
+                and_(_indexes_ok(doc, parent), func.jsonb_typeof(parent_value) == "array"),
+                func.jsonb_set(doc, _path(parent), appended, False, type_=JSONB) if parent else appended
+            )
+        return append
+
+    # Arrays: insert before the index (or at the end); objects: set the member
+    def add(doc: ColumnElement) -> Tuple[ColumnElement, ColumnElement]:
+        parent_value = _get(doc, parent)
+        return (
+            and_(_indexes_ok(doc, tokens, allow_end=True), func.jsonb_typeof(parent_value).in_(["array", "object"])),
+            case(
+                (
+                    func.jsonb_typeof(parent_value) == "array",
+                    func.jsonb_insert(doc, _path(tokens), value, False, type_=JSONB)
+                ),
+                else_=func.jsonb_set(doc, _path(tokens), value, True, type_=JSONB)
+            )
+        )
+    return add
+
+
+def compile_patch(
+    document: ColumnElement,
+    operations: Sequence[Any]
+) -> Tuple[ColumnElement, List[ColumnElement], Set[str]]:
+    """
+    Compile operations (objects with op/path/value) against a jsonb expression.
+
+    Returns the patched expression, the conditions the UPDATE must require
+    and the top-level keys the patch touches.
+    """
+    if len(operations) > MAX_OPERATIONS:
+        raise PatchError(f"Too many operations (max {MAX_OPERATIONS})")
+
+    touched: Set[str] = set()
+    for operation in operations:
+        if operation.op not in SUPPORTED_OPS:
+            raise PatchError(f"Unsupported operation '{operation.op}'")
+        tokens = parse_pointer(operation.path)
+        if not tokens:
+            raise PatchError(f"'{operation.op}' on the document root is not supported")
+        touched.add(tokens[0])
+        document = _step(document, _compile_operation(operation, tokens))
+
+    return document, [document.isnot(None)], touched
@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from sqlalchemy import select, func
 from ..models.user import User
 from ..models.property import Property
 from ..schemas.property import QuotaInfo
+from ..core.config import settings
+from .video_quota import video_quota
 
 
 # Base subscription pricing and limits
@@ -52,6 +55,7 @@ class QuotaService:
         # Calculate current subscription cost
         current_price = QuotaService.calculate_subscription_price(properties_limit)
         monthly_video_limit = await QuotaService.get_monthly_video_limit(user)
+        monthly_videos_used = await video_quota.used(db, user.id)
         
         return QuotaInfo(
             plan_type=f"SUBSCRIPTION_{properties_limit}P",  # e.g. "SUBSCRIPTION_3P"
@@ -60,6 +64,8 @@ class QuotaService:
             properties_remaining=max(0, properties_limit - properties_used),
             can_create_more=properties_used < properties_limit,
             monthly_video_limit=monthly_video_limit,
+            monthly_videos_used=monthly_videos_used,
+            monthly_videos_remaining=max(0, monthly_video_limit - monthly_videos_used),
             current_subscription_price_eur=current_price
         )
     
@@ -94,9 +100,21 @@ class QuotaService:
     
     @staticmethod
     async def can_generate_video(user: User, db: AsyncSession) -> bool:
-        """Check if user can generate more videos this month"""
+        """Check if user can generate more videos this month (counter lookup, no aggregate)"""
+        if not settings.VIDEO_QUOTA_ENABLED:
+            return True
         monthly_limit = await QuotaService.get_monthly_video_limit(user)
-        
-        # For now, return True - in PR6 we'll implement actual monthly tracking
-        # This would check videos generated in current month vs limit
-        return True
\ No newline at end of file
+        return await video_quota.used(db, user.id) < monthly_limit
+
+    @staticmethod
+    async def reserve_video(user: User, db: AsyncSession) -> Optional[str]:
+        """
+        Charge one video to the user's monthly quota before a render is submitted.
+
+        Returns the charged period (store it on the render job), or None when
+        quotas are disabled. Raises QuotaExceededError at the limit.
+        """
+        if not settings.VIDEO_QUOTA_ENABLED:
+            return None
+        monthly_limit = await QuotaService.get_monthly_video_limit(user)
+        return await video_quota.reserve(db, user.id, monthly_limit)
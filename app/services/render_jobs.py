@@ -0,0 +1,220 @@
+"""
+Render job tracking.
+
+Every video render gets one row in `render_jobs`, keyed by our job_id and
+(once known) the MediaConvert job id. Callbacks and status polls resolve
+jobs through these unique indexes instead of searching video descriptions.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.render_job import RenderJob
+
+logger = logging.getLogger(__name__)
+
+# Allowed state transitions (out-of-order callbacks are ignored)
+RENDER_JOB_TRANSITIONS = {
+    "queued": {"submitted", "mediaconvert", "post_processing", "completed", "failed"},
+    "submitted": {"mediaconvert", "post_processing", "completed", "failed"},
+    "mediaconvert": {"post_processing", "completed", "failed"},
+    "post_processing": {"completed", "failed"},
+    "completed": set(),
+    "failed": set(),
+}
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+# Timestamp column set when entering each state
+_STAGE_TIMESTAMPS = {
+    "submitted": "submitted_at",
+    "mediaconvert": "mediaconvert_started_at",
+    "post_processing": "post_processing_started_at",
+    "completed": "completed_at",
+    "failed": "failed_at",
+}
+
+# Rough progress per stage for status polls
+STAGE_PROGRESS = {
+    "queued": 10,
+    "submitted": 25,
+    "mediaconvert": 50,
+    "post_processing": 75,
+    "completed": 100,
+    "failed": 100,
+}
+
+# Callback status (Lambda / EventBridge / ECS worker) → render job status
+_CALLBACK_STATUSES = {
+    "SUBMITTED": "submitted",
+    "PROGRESSING": "mediaconvert",
+    "POST_PROCESSING": "post_processing",
+    "COMPLETE": "completed",
+    "ERROR": "failed",
+    "FAILED": "failed",
+}
+
+
+def render_status_from_callback(callback_status: str) -> Optional[str]:
+    """Map a callback status string to a render job status"""
+    return _CALLBACK_STATUSES.get((callback_status or "").upper())
+
+
+def create_render_job(
+    db: AsyncSession,
+    job_id: str,
+    video_id: str,
+    user_id: Optional[int] = None,
+    property_id: Optional[int] = None,
+    generation_method: Optional[str] = None,
+    quota_period: Optional[str] = None,
+    trace_id: Optional[str] = None
+) -> RenderJob:
+    """Add a queued render job to the session (committed with the caller's transaction)"""
+    render_job = RenderJob(
+        job_id=job_id,
+        video_id=video_id,
+        user_id=user_id,
+        property_id=property_id,
+        generation_method=generation_method,
+        quota_period=quota_period,
+        trace_id=trace_id,
+        stage_timeline=[],
+        status="queued"
+    )
+    db.add(render_job)
+    return render_job
+
+
+def _select_render_job(for_update: bool):
+    stmt = select(RenderJob)
+    if for_update:
+        # Lock the row and refresh an instance already in the session (expire_on_commit=False)
+        stmt = stmt.with_for_update().execution_options(populate_existing=True)
+    return stmt
+
+
+async def get_render_job(db: AsyncSession, job_id: str, for_update: bool = False) -> Optional[RenderJob]:
+    """
+    Load a render job by our job id.
+
+    Pass `for_update=True` before transition_render_job(): the row is locked
+    until the caller commits or rolls back, and its status is read fresh,
+    so a concurrent callback cannot be overwritten with a stale state.
+    """
+    result = await db.execute(_select_render_job(for_update).where(RenderJob.job_id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def find_render_job(
+    db: AsyncSession,
+    job_id: Optional[str] = None,
+    mediaconvert_job_id: Optional[str] = None,
+    video_id: Optional[str] = None,
+    for_update: bool = False
+) -> Optional[RenderJob]:
+    """
+    Resolve a render job from whatever identifiers a caller has.
+
+    Older Lambdas send the MediaConvert id in `job_id`, so both ids are tried
+    against both unique indexes before falling back to the latest job of the
+    video. `for_update` locks and refreshes the row as in get_render_job().
+    """
+    candidates = [i for i in (job_id, mediaconvert_job_id) if i]
+
+    for candidate in candidates:
+        render_job = await get_render_job(db, candidate, for_update=for_update)
+        if render_job:
+            return render_job
+
+    for candidate in candidates:
+        result = await db.execute(
+            _select_render_job(for_update).where(RenderJob.mediaconvert_job_id == candidate)
+        )
+        render_job = result.scalar_one_or_none()
+        if render_job:
+            return render_job
+
+    if video_id:
+        result = await db.execute(
+            _select_render_job(for_update)
+            .where(RenderJob.video_id == video_id)
+            .order_by(RenderJob.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    return None
+
+
+def transition_render_job(
+    render_job: RenderJob,
+    new_status: str,
+    error_message: Optional[str] = None
+) -> bool:
+    """
+    Move a render job to a new state if the transition is allowed.
+
+    Returns False (and leaves the row untouched) for repeated or out-of-order
+    updates, e.g. a PROGRESSING event arriving after COMPLETE.
+    """
+    current = render_job.status or "queued"
+    if new_status == current:
+        return False
+    if new_status not in RENDER_JOB_TRANSITIONS.get(current, set()):
+        logger.warning(f"⚠️ Ignoring render job {render_job.job_id} transition {current} → {new_status}")
+        return False
+
+    now = datetime.utcnow()
+    render_job.status = new_status
+    timestamp_column = _STAGE_TIMESTAMPS.get(new_status)
+    if timestamp_column:
+        setattr(render_job, timestamp_column, now)
+    if error_message:
+        render_job.error_message = error_message
+    render_job.updated_at = now
+
+    logger.info(f"🔁 Render job {render_job.job_id}: {current} → {new_status}")
+    return True
+
+
+def record_render_stages(
+    render_job: RenderJob,
+    timings: Optional[Dict[str, Any]],
+    source: str
+) -> bool:
+    """
+    Add component stage timings to the job timeline.
+
+    `timings` maps a stage to {"start": epoch_s, "end": epoch_s}, as sent in
+    callbacks by the Lambdas and the ECS worker. Stages already recorded are
+    kept (callbacks may be retried). Returns True when the timeline changed.
+    """
+    entries = list(render_job.stage_timeline or [])
+    known = {entry.get("stage") for entry in entries}
+    added = False
+
+    for stage, window in (timings or {}).items():
+        if stage in known or not isinstance(window, dict):
+            continue
+        try:
+            start, end = float(window["start"]), float(window["end"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"⚠️ Ignoring malformed timing '{stage}' for render job {render_job.job_id}")
+            continue
+        entries.append({
+            "stage": stage,
+            "source": source,
+            "start": datetime.utcfromtimestamp(start).isoformat(),
+            "duration_ms": max(int(round((end - start) * 1000)), 0),
+        })
+        added = True
+
+    if added:
+        # New list so the JSONB column is flagged dirty
+        render_job.stage_timeline = sorted(entries, key=lambda entry: entry["start"])
+    return added
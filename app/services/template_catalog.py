@@ -0,0 +1,225 @@
+"""
+Viral template catalog cache.
+
+The catalog changes rarely (imports from Airtable/Supabase) but every
+/viral-matching/viral-templates call used to load and re-serialize all of it.
+The serialized catalog now lives in Redis under a version number and in each
+process as pre-rendered JSON bytes with a strong ETag:
+
+- template writes bump `template_catalog:version` (template_catalog.invalidate());
+  a periodic fingerprint check (row count + max(updated_at)) catches writes
+  made outside the API, such as SQL imports
+- processes re-read the version at most every TEMPLATE_CATALOG_VERSION_CHECK_SECONDS,
+  so a warm request does no I/O at all
+- filtered pages are rendered once per version and kept in a small LRU
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.template import Template
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "template_catalog:version"
+FINGERPRINT_KEY = "template_catalog:fingerprint"
+DATA_KEY_PREFIX = "template_catalog:data:"
+CHECK_LOCK_KEY = "template_catalog:check:lock"
+
+_DATA_TTL_SECONDS = 86400
+_PAGE_CACHE_SIZE = 256
+
+
+def serialize_template(template: Template) -> Dict[str, Any]:
+    """API representation of a template (duration range added)"""
+    template_dict = template.to_dict()
+    template_dict["script"] = template.script or {}
+    duration = float(template.duration) if template.duration else 30.0
+    template_dict["total_duration_min"] = max(15.0, duration - 5)
+    template_dict["total_duration_max"] = min(60.0, duration + 10)
+    return template_dict
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _render(data: Any) -> Tuple[bytes, str]:
+    body = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return body, _etag(body)
+
+
+@dataclass
+class _Snapshot:
+    version: str
+    templates: List[Dict[str, Any]]
+    body: bytes
+    etag: str
+    loaded_at: float
+    by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    rendered: "OrderedDict[Any, Tuple[bytes, str]]" = field(default_factory=OrderedDict)
+
+    def __post_init__(self):
+        self.by_id = {t["id"]: t for t in self.templates}
+
+    def render_cached(self, key: Any, build) -> Tuple[bytes, str]:
+        cached = self.rendered.get(key)
+        if cached is None:
+            cached = _render(build())
+            self.rendered[key] = cached
+            while len(self.rendered) > _PAGE_CACHE_SIZE:
+                self.rendered.popitem(last=False)
+        else:
+            self.rendered.move_to_end(key)
+        return cached
+
+
+class TemplateCatalog:
+    """Versioned, pre-rendered template catalog shared by all requests of a process"""
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def templates(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        """All templates (views descending) as API dicts. Treat as read-only."""
+        return (await self._get(db)).templates
+
+    async def list_page(
+        self,
+        db: AsyncSession,
+        country: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_views: Optional[int] = None,
+        slots: Optional[int] = None,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Tuple[bytes, str, int]:
+        """Rendered JSON list (body, etag, total matching) for a filter/page"""
+        snapshot = await self._get(db)
+        if not any([country, property_type, min_views, slots, min_duration, max_duration, limit, offset]):
+            return snapshot.body, snapshot.etag, len(snapshot.templates)
+
+        country_key = (country or "").strip().lower()
+        type_key = (property_type or "").strip().lower()
+        matching = [
+            t for t in snapshot.templates
+            if (not country_key or (t.get("country") or "").lower() == country_key)
+            and (not type_key or (t.get("property_type") or "").lower() == type_key)
+            and (not min_views or t.get("views", 0) >= min_views)
+            and (slots is None or t.get("slots") == slots)
+            and (min_duration is None or (t.get("total_duration") or 0) >= min_duration)
+            and (max_duration is None or (t.get("total_duration") or 0) <= max_duration)
+        ]
+        end = offset + limit if limit else None
+        body, etag = snapshot.render_cached(
+            ("list", country_key, type_key, min_views, slots, min_duration, max_duration, limit, offset),
+            lambda: matching[offset:end]
+        )
+        return body, etag, len(matching)
+
+    async def detail(self, db: AsyncSession, template_id: str) -> Optional[Tuple[bytes, str]]:
+        snapshot = await self._get(db)
+        template = snapshot.by_id.get(template_id)
+        if template is None:
+            return None
+        return snapshot.render_cached(("detail", template_id), lambda: template)
+
+    async def invalidate(self) -> None:
+        """Call after writing templates: every process reloads on its next version check"""
+        self._snapshot = None
+        try:
+            await get_redis().incr(VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"⚠️ Template catalog version bump failed: {str(e)}")
+
+    async def check_for_changes(self) -> None:
+        """Bump the version when the templates table changed behind the API's back"""
+        from app.core.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            count, last_update = (await db.execute(
+                select(func.count(Template.id), func.max(Template.updated_at))
+            )).one()
+        fingerprint = f"{count}:{last_update.isoformat() if last_update else ''}"
+
+        redis = get_redis()
+        previous = await redis.getset(FINGERPRINT_KEY, fingerprint)
+        if previous is not None and previous != fingerprint:
+            await redis.incr(VERSION_KEY)
+            logger.info(f"🔄 Templates changed ({previous} → {fingerprint}), catalog invalidated")
+
+    async def _get(self, db: AsyncSession) -> _Snapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot and now - self._checked_at < settings.TEMPLATE_CATALOG_VERSION_CHECK_SECONDS:
+            return snapshot
+
+        async with self._lock:
+            if self._snapshot and time.monotonic() - self._checked_at < settings.TEMPLATE_CATALOG_VERSION_CHECK_SECONDS:
+                return self._snapshot
+
+            version = await self._current_version()
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version or (
+                version.startswith("local") and now - snapshot.loaded_at > settings.TEMPLATE_CATALOG_LOCAL_TTL_SECONDS
+            ):
+                self._snapshot = await self._load(db, version)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    async def _current_version(self) -> str:
+        try:
+            return str(await get_redis().get(VERSION_KEY) or 0)
+        except Exception as e:
+            # Redis down: fall back to a local TTL
+            logger.warning(f"⚠️ Template catalog version unavailable: {str(e)}")
+            return "local"
+
+    async def _load(self, db: AsyncSession, version: str) -> _Snapshot:
+        redis_key = f"{DATA_KEY_PREFIX}{version}"
+        if not version.startswith("local"):
+            try:
+                cached = await get_redis().get(redis_key)
+                if cached:
+                    body = cached.encode()
+                    logger.info(f"📚 Template catalog v{version} loaded from Redis")
+                    return _Snapshot(version, json.loads(cached), body, _etag(body), time.monotonic())
+            except Exception as e:
+                logger.warning(f"⚠️ Template catalog Redis read failed: {str(e)}")
+
+        result = await db.execute(select(Template).order_by(Template.views.desc(), Template.id))
+        templates = []
+        for template in result.scalars().all():
+            try:
+                templates.append(serialize_template(template))
+            except Exception as e:
+                logger.error(f"❌ Error processing template {template.id}: {str(e)}")
+
+        body, etag = _render(templates)
+        if not version.startswith("local"):
+            try:
+                await get_redis().set(redis_key, body.decode(), ex=_DATA_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"⚠️ Template catalog Redis write failed: {str(e)}")
+
+        logger.info(f"📚 Template catalog v{version} built from database ({len(templates)} templates)")
+        return _Snapshot(version, templates, body, etag, time.monotonic())
+
+
+# Global catalog shared by all requests of this process
+template_catalog = TemplateCatalog()
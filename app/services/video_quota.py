@@ -0,0 +1,243 @@
+"""
+Monthly video quota counters.
+
+Each user has one counter per UTC month: `video_quota:{user_id}:{YYYY-MM}`
+in Redis, mirrored in the `video_quota_usage` table. A render submission
+reserves one video:
+
+1. a Lua script checks the Redis counter against the limit and increments
+   it atomically (fast rejection, no SQL);
+2. the Postgres mirror is incremented in the caller's transaction with an
+   `INSERT ... ON CONFLICT DO UPDATE ... WHERE used < limit` upsert, which
+   is the hard guard (also when Redis is unavailable or was flushed).
+
+Both are O(1) whatever the number of videos. The charged month is stored on
+the render job (`render_jobs.quota_period`); a failed render is refunded
+once and the column cleared. Deleting a video does not give the slot back.
+
+Missing Redis counters are seeded from the mirror. The reconciler keeps the
+mirror at least at the number of charged render jobs of the month and
+resets drifted Redis counters to the mirror (e.g. after a crash between the
+Redis increment and the commit).
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.render_job import RenderJob
+from app.models.video_quota import VideoQuotaUsage
+from app.shared.exceptions import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "video_quota:"
+RECONCILE_LOCK_KEY = "video_quota_reconcile:lock"
+
+# KEYS[1] counter; ARGV: limit, cost. Returns {-1, 0} when the counter must be seeded.
+_RESERVE_LUA = """
+local used = redis.call('GET', KEYS[1])
+if not used then
+    return {-1, 0}
+end
+used = tonumber(used)
+local cost = tonumber(ARGV[2])
+if used + cost > tonumber(ARGV[1]) then
+    return {0, used}
+end
+return {1, redis.call('INCRBY', KEYS[1], cost)}
+"""
+
+# KEYS[1] counter; never goes below zero nor recreates an expired counter
+_REFUND_LUA = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+if used <= 0 then
+    return 0
+end
+return redis.call('DECRBY', KEYS[1], 1)
+"""
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    return (now or datetime.utcnow()).strftime("%Y-%m")
+
+
+def _key(user_id: int, period: str) -> str:
+    return f"{KEY_PREFIX}{user_id}:{period}"
+
+
+class VideoQuota:
+    """Per-user monthly video counters (Redis fast path, Postgres mirror)"""
+
+    def __init__(self, key_ttl_seconds: int):
+        self.key_ttl_seconds = key_ttl_seconds
+
+    async def used(self, db: AsyncSession, user_id: int, period: Optional[str] = None) -> int:
+        """Videos charged this period"""
+        period = period or current_period()
+        try:
+            value = await get_redis().get(_key(user_id, period))
+            if value is not None:
+                return int(value)
+        except Exception as e:
+            logger.warning(f"⚠️ Video quota read failed for user {user_id}: {str(e)}")
+        return await self._mirror_used(db, user_id, period)
+
+    async def reserve(self, db: AsyncSession, user_id: int, limit: int) -> str:
+        """
+        Charge one video to the current period; returns the period.
+
+        The mirror increment is part of the caller's transaction: if it rolls
+        back, call cancel_reservation() to give the Redis slot back.
+        Raises QuotaExceededError when the limit is reached.
+        """
+        period = current_period()
+        if limit <= 0:
+            raise QuotaExceededError("video", 0, limit)
+
+        reserved = await self._reserve_redis(db, user_id, period, limit)
+        if reserved is not None and not reserved[0]:
+            raise QuotaExceededError("video", reserved[1], limit)
+
+        now = datetime.utcnow()
+        stmt = pg_insert(VideoQuotaUsage).values(user_id=user_id, period=period, used=1, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            constraint="pk_video_quota_usage",
+            set_={"used": VideoQuotaUsage.used + 1, "updated_at": now},
+            where=VideoQuotaUsage.used < limit
+        ).returning(VideoQuotaUsage.used)
+        used = (await db.execute(stmt)).scalar_one_or_none()
+
+        if used is None:
+            # Redis was behind the mirror (flushed or drifted): the mirror wins
+            if reserved is not None:
+                await self.cancel_reservation(user_id, period)
+            raise QuotaExceededError("video", await self._mirror_used(db, user_id, period), limit)
+
+        logger.info(f"🎟️ Video quota for user {user_id}: {used}/{limit} ({period})")
+        return period
+
+    async def cancel_reservation(self, user_id: int, period: str) -> None:
+        """Undo the Redis increment of a reservation whose transaction rolled back"""
+        try:
+            script = get_redis().register_script(_REFUND_LUA)
+            await script(keys=[_key(user_id, period)])
+        except Exception as e:
+            logger.warning(f"⚠️ Video quota refund failed for user {user_id}: {str(e)}")
+
+    async def refund_render_job(self, db: AsyncSession, render_job: RenderJob) -> bool:
+        """
+        Give back the video charged for a failed render (once).
+
+        The mirror update and the cleared `quota_period` are committed with
+        the caller's transaction.
+        """
+        if not render_job.quota_period or not render_job.user_id:
+            return False
+
+        period = render_job.quota_period
+        render_job.quota_period = None
+        await db.execute(
+            update(VideoQuotaUsage)
+            .where(
+                VideoQuotaUsage.user_id == render_job.user_id,
+                VideoQuotaUsage.period == period,
+                VideoQuotaUsage.used > 0
+            )
+            .values(used=VideoQuotaUsage.used - 1, updated_at=datetime.utcnow())
+        )
+        await self.cancel_reservation(render_job.user_id, period)
+        logger.info(f"↩️ Refunded video quota of user {render_job.user_id} for failed job {render_job.job_id}")
+        return True
+
+    async def reconcile(self) -> Dict[str, int]:
+        """Realign the mirror with charged render jobs and Redis with the mirror (current period)"""
+        from app.core.database import AsyncSessionLocal
+
+        period = current_period()
+        async with AsyncSessionLocal() as db:
+            charged = dict((await db.execute(
+                select(RenderJob.user_id, func.count(RenderJob.id))
+                .where(RenderJob.quota_period == period, RenderJob.user_id.isnot(None))
+                .group_by(RenderJob.user_id)
+            )).all())
+            mirror = dict((await db.execute(
+                select(VideoQuotaUsage.user_id, VideoQuotaUsage.used)
+                .where(VideoQuotaUsage.period == period)
+            )).all())
+
+            # Charges missing from the mirror (never lowered: deleted videos stay charged)
+            raised = 0
+            for user_id, count in charged.items():
+                if count > mirror.get(user_id, 0):
+                    stmt = pg_insert(VideoQuotaUsage).values(
+                        user_id=user_id, period=period, used=count, updated_at=datetime.utcnow()
+                    )
+                    await db.execute(stmt.on_conflict_do_update(
+                        constraint="pk_video_quota_usage",
+                        set_={"used": func.greatest(VideoQuotaUsage.used, count), "updated_at": datetime.utcnow()}
+                    ))
+                    mirror[user_id] = count
+                    raised += 1
+            await db.commit()
+
+        reset = 0
+        if mirror:
+            redis = get_redis()
+            user_ids = list(mirror)
+            values = await redis.mget([_key(user_id, period) for user_id in user_ids])
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id, value in zip(user_ids, values):
+                    # Missing counters are seeded on the next reservation
+                    if value is not None and int(value) != mirror[user_id]:
+                        pipe.set(_key(user_id, period), mirror[user_id], xx=True, ex=self.key_ttl_seconds)
+                        reset += 1
+                if reset:
+                    await pipe.execute()
+
+        if raised or reset:
+            logger.info(f"🧮 Video quota reconciled ({period}): {raised} mirror rows raised, {reset} Redis counters reset")
+        return {"users": len(mirror), "mirror_raised": raised, "redis_reset": reset}
+
+    async def _reserve_redis(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        period: str,
+        limit: int
+    ) -> Optional[Tuple[bool, int]]:
+        """(allowed, used) from the Redis counter, or None when Redis cannot decide"""
+        try:
+            redis = get_redis()
+            script = redis.register_script(_RESERVE_LUA)
+            key = _key(user_id, period)
+            allowed, used = await script(keys=[key], args=[limit, 1])
+            if int(allowed) == -1:
+                seeded = await self._mirror_used(db, user_id, period)
+                await redis.set(key, seeded, nx=True, ex=self.key_ttl_seconds)
+                allowed, used = await script(keys=[key], args=[limit, 1])
+            if int(allowed) == -1:
+                return None
+            return int(allowed) == 1, int(used)
+        except Exception as e:
+            logger.warning(f"⚠️ Video quota counter unavailable for user {user_id}, using Postgres: {str(e)}")
+            return None
+
+    async def _mirror_used(self, db: AsyncSession, user_id: int, period: str) -> int:
+        result = await db.execute(
+            select(VideoQuotaUsage.used).where(
+                VideoQuotaUsage.user_id == user_id,
+                VideoQuotaUsage.period == period
+            )
+        )
+        return result.scalar_one_or_none() or 0
+
+
+# Global counters shared by the API processes
+video_quota = VideoQuota(key_ttl_seconds=settings.VIDEO_QUOTA_KEY_TTL_SECONDS)
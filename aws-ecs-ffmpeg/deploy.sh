@@ -17,6 +17,8 @@ ECS_SERVICE="ffmpeg-worker-service"
 ECR_IMAGE="${AWS_ACCOUNT_ID}.dkr.ecr.${AWS_REGION}.amazonaws.com/${ECR_REPO}:${IMAGE_TAG}"
 
 echo "📦 Building Docker image..."
+# Module de traçage partagé avec les Lambdas (copié dans le contexte de build)
+cp ../aws-lambda/pipeline_tracing.py .
 docker build -t ${ECR_REPO}:${IMAGE_TAG} .
 
 echo "🏷️  Tagging image for ECR..."
@@ -14,16 +14,33 @@ from pathlib import Path
 from typing import List, Dict, Any
 import time
 
+from pipeline_tracing import Span, TRACEPARENT_KEY
+from worker_metrics import (
+    JOBS_IN_FLIGHT, JOBS_TOTAL, METRICS_PORT, BacklogPublisher, observe_realtime_factor, stage_timer,
+    start_metrics_server
+)
+
 # Configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
 AWS_REGION = os.environ.get('AWS_DEFAULT_REGION', 'eu-west-1')
-SQS_QUEUE_URL = os.environ['SQS_QUEUE_URL']
+SQS_QUEUE_URL = os.environ['SQS_QUEUE_URL']  # Voie interactive (clics "générer" de l'éditeur)
+SQS_BULK_QUEUE_URL = os.environ.get('SQS_BULK_QUEUE_URL', '')  # Voie bulk (lots, backfills)
+# Jobs interactifs servis d'affilée avant de donner son tour à la voie bulk
+INTERACTIVE_WEIGHT = int(os.environ.get('INTERACTIVE_WEIGHT', '3'))
 WEBHOOK_URL = os.environ.get('WEBHOOK_URL', '')
+# Progress events (published live to clients, not stored) - defaults to .../videos/worker-progress
+PROGRESS_WEBHOOK_URL = os.environ.get(
+    'PROGRESS_WEBHOOK_URL',
+    WEBHOOK_URL.rsplit('/', 1)[0] + '/worker-progress' if WEBHOOK_URL else ''
+)
+
+TRACE_SERVICE = 'hospup-ffmpeg-worker'
 
 s3_client = boto3.client('s3', region_name=AWS_REGION)
 sqs_client = boto3.client('sqs', region_name=AWS_REGION)
+backlog_metrics = BacklogPublisher(boto3.client('cloudwatch', region_name=AWS_REGION))
 
 # Font mapping - 20 font variants (5 families × 4 variants: Regular, Bold, Italic, BoldItalic)
 FONT_MAP = {
@@ -133,7 +150,8 @@ def download_from_s3(s3_url: str, local_path: str):
         raise ValueError(f"Invalid S3 URL: {s3_url}")
 
     logger.info(f"Downloading s3://{bucket}/{key} to {local_path}")
-    s3_client.download_file(bucket, key, local_path)
+    with stage_timer('download'):
+        s3_client.download_file(bucket, key, local_path)
     return local_path
 
 def upload_to_s3(local_path: str, s3_url: str):
@@ -147,19 +165,31 @@ def upload_to_s3(local_path: str, s3_url: str):
     logger.info(f"Uploading {local_path} to s3://{bucket}/{key}")
 
     # Upload avec Content-Type pour affichage dans le navigateur
-    s3_client.upload_file(
-        local_path,
-        bucket,
-        key,
-        ExtraArgs={
-            'ContentType': 'video/mp4',
-            'ContentDisposition': 'inline'  # Afficher au lieu de télécharger
-        }
-    )
+    with stage_timer('upload'):
+        s3_client.upload_file(
+            local_path,
+            bucket,
+            key,
+            ExtraArgs={
+                'ContentType': 'video/mp4',
+                'ContentDisposition': 'inline'  # Afficher au lieu de télécharger
+            }
+        )
 
     # Return HTTPS URL
     return f"https://s3.{AWS_REGION}.amazonaws.com/{bucket}/{key}"
 
+def probe_duration(path: str) -> float:
+    """Durée d'un fichier vidéo en secondes (0 si ffprobe échoue)"""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=30
+        )
+        return float(result.stdout.strip() or 0)
+    except Exception:
+        return 0.0
+
 def normalize_video(input_path: str, output_path: str, target_duration: float = None):
     """
     Normalise une vidéo source (n'importe quel format) vers un format standardisé
@@ -895,14 +925,18 @@ def build_ffmpeg_command(segments: List[Dict], text_overlays: List[Dict], output
 
     return cmd
 
-def process_job(job_data: Dict[str, Any]) -> Dict[str, Any]:
+def process_job(job_data: Dict[str, Any], span: Span) -> Dict[str, Any]:
     """
     Traite un job de génération vidéo
 
     Supports 2 modes:
     1. OPTIMIZED: base_video_url + text_overlays + presets (MediaConvert output + text overlay + image adjustments)
     2. LEGACY: segments + text_overlays (full pipeline with normalization)
+
+    Chaque étape (préparation/téléchargements, rendu FFmpeg, upload S3) est un
+    span enfant de `span`; leurs fenêtres sont renvoyées dans result['timings'].
     """
+    timings = {}
     job_id = job_data.get('job_id', 'unknown')
     video_id = job_data.get('video_id')
     property_id = job_data.get('property_id', '1')
@@ -961,13 +995,15 @@ def process_job(job_data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     start_time = time.time()
+    send_progress(job_id, video_id, 'rendering', 80)
 
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
             # Output file
             output_file = os.path.join(temp_dir, 'output.mp4')
 
-            # Build FFmpeg command based on mode
+            # Build FFmpeg command based on mode (downloads the inputs)
+            prepare_span = span.child('ffmpeg.prepare', mode=mode)
             if mode == 'optimized':
                 logger.info("🔧 Building OPTIMIZED FFmpeg command (per-clip image adjustments + text overlay)...")
                 cmd = add_text_overlays_to_video(base_video_url, text_overlays, output_file, temp_dir, clips_with_presets)
@@ -975,21 +1011,34 @@ def process_job(job_data: Dict[str, Any]) -> Dict[str, Any]:
                 logger.info("🔧 Building LEGACY FFmpeg command (normalize + concat + text)...")
                 cmd = build_ffmpeg_command(segments, text_overlays, output_file, temp_dir)
 
+            timings['ffmpeg_prepare'] = prepare_span.end()
+
             logger.info(f"🎥 Running FFmpeg command...")
             logger.info(f"   FULL COMMAND: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            render_span = span.child('ffmpeg.render', mode=mode)
+            render_start = time.perf_counter()
+            with stage_timer('ffmpeg'):
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            render_seconds = time.perf_counter() - render_start
 
             if result.returncode != 0:
                 logger.error(f"❌ FFmpeg failed: {result.stderr}")
+                render_span.set_error(result.stderr[:500])
+                timings['ffmpeg_render'] = render_span.end()
                 raise Exception(f"FFmpeg failed: {result.stderr[:500]}")
+            timings['ffmpeg_render'] = render_span.end()
+            observe_realtime_factor(probe_duration(output_file), render_seconds)
 
             logger.info("✅ FFmpeg completed successfully")
+            send_progress(job_id, video_id, 'uploading', 92)
 
             # Upload to S3 - use different filename to not overwrite MediaConvert output
             # MediaConvert output: {video_id}.mp4 (no text)
             # FFmpeg output: {video_id}_with_text.mp4 (with text)
             output_s3_url = f"s3://hospup-files/generated-videos/{property_id}/{video_id}_with_text.mp4"
+            upload_span = span.child('s3.upload')
             final_url = upload_to_s3(output_file, output_s3_url)
+            timings['s3_upload'] = upload_span.end()
             logger.info(f"📤 Uploaded video WITH TEXT to: {final_url}")
 
             processing_time = time.time() - start_time
@@ -1002,7 +1051,8 @@ def process_job(job_data: Dict[str, Any]) -> Dict[str, Any]:
                 'file_url': final_url,
                 'output_url': final_url,
                 'processing_time': f"{processing_time:.1f}s",
-                'mode': mode
+                'mode': mode,
+                'timings': timings
             }
 
         except Exception as e:
@@ -1011,9 +1061,24 @@ def process_job(job_data: Dict[str, Any]) -> Dict[str, Any]:
                 'status': 'ERROR',
                 'job_id': job_id,
                 'video_id': video_id,
-                'error': str(e)
+                'error': str(e),
+                'timings': timings
             }
 
+def send_progress(job_id: str, video_id: str, stage: str, progress: int):
+    """Envoie un événement de progression (best effort, ne bloque jamais le job)"""
+    if not PROGRESS_WEBHOOK_URL:
+        return
+
+    try:
+        requests.post(
+            PROGRESS_WEBHOOK_URL,
+            json={'job_id': job_id, 'video_id': video_id, 'stage': stage, 'progress': progress},
+            timeout=3
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Progress event failed ({stage}): {str(e)}")
+
 def send_webhook(result: Dict[str, Any]):
     """Envoie le résultat au webhook"""
     if not WEBHOOK_URL:
@@ -1022,21 +1087,63 @@ def send_webhook(result: Dict[str, Any]):
 
     try:
         logger.info(f"📤 Sending webhook to {WEBHOOK_URL}")
-        response = requests.post(WEBHOOK_URL, json=result, timeout=30)
+        with stage_timer('webhook'):
+            response = requests.post(WEBHOOK_URL, json=result, timeout=30)
         response.raise_for_status()
         logger.info(f"✅ Webhook sent successfully: {response.status_code}")
     except Exception as e:
         logger.error(f"❌ Webhook failed: {str(e)}")
 
+def receive_message(queue_url: str, wait_seconds: int) -> List[Dict[str, Any]]:
+    return sqs_client.receive_message(
+        QueueUrl=queue_url,
+        MaxNumberOfMessages=1,
+        WaitTimeSeconds=wait_seconds,
+        VisibilityTimeout=900,  # 15 min pour traiter le job
+        AttributeNames=['SentTimestamp']  # Attente en file (timeline du job)
+    ).get('Messages', [])
+
+def receive_next_job(interactive_streak: int):
+    """
+    Prochain job à traiter : (message, queue_url) ou (None, None).
+
+    Un message à la fois, donc la priorité est réévaluée entre chaque job :
+    la voie interactive passe d'abord, sauf après INTERACTIVE_WEIGHT jobs
+    interactifs d'affilée où la voie bulk est servie en premier (jamais
+    affamée). Les deux voies vides : long polling de la voie interactive.
+    """
+    if not SQS_BULK_QUEUE_URL:
+        messages = receive_message(SQS_QUEUE_URL, 20)  # Long polling (20s) - réduit les coûts SQS
+        return (messages[0], SQS_QUEUE_URL) if messages else (None, None)
+
+    lanes = [SQS_QUEUE_URL, SQS_BULK_QUEUE_URL]
+    if interactive_streak >= INTERACTIVE_WEIGHT:
+        lanes.reverse()
+    for queue_url in lanes:
+        messages = receive_message(queue_url, 0)
+        if messages:
+            return messages[0], queue_url
+
+    # Attente courte : un job bulk arrivé entre-temps patiente au plus 10s
+    messages = receive_message(SQS_QUEUE_URL, 10)
+    return (messages[0], SQS_QUEUE_URL) if messages else (None, None)
+
 def main():
     """
     Main worker loop - consomme SQS messages en continu
     """
     logger.info("🚀 ECS Fargate FFmpeg Worker started")
     logger.info(f"   SQS Queue: {SQS_QUEUE_URL}")
+    if SQS_BULK_QUEUE_URL:
+        logger.info(f"   SQS Bulk Queue: {SQS_BULK_QUEUE_URL} (interactive weight {INTERACTIVE_WEIGHT})")
     logger.info(f"   Webhook: {WEBHOOK_URL}")
     logger.info(f"   Region: {AWS_REGION}")
 
+    if start_metrics_server():
+        logger.info(f"📈 Metrics served on :{METRICS_PORT}/metrics")
+    if backlog_metrics.start():
+        logger.info(f"📈 Backlog metrics published to CloudWatch ({backlog_metrics.namespace})")
+
     # Verify fonts
     logger.info("🔤 Checking fonts...")
     for font_name, font_path in FONT_MAP.items():
@@ -1047,48 +1154,70 @@ def main():
 
     logger.info("⏳ Waiting for messages...")
 
+    interactive_streak = 0
     while True:
         try:
-            # Long polling (20s) - réduit les coûts SQS
-            logger.info(f"📡 Polling SQS queue: {SQS_QUEUE_URL}")
+            logger.info(f"📡 Polling SQS queue(s)")
             try:
-                response = sqs_client.receive_message(
-                    QueueUrl=SQS_QUEUE_URL,
-                    MaxNumberOfMessages=1,
-                    WaitTimeSeconds=20,
-                    VisibilityTimeout=900  # 15 min pour traiter le job
-                )
+                message, queue_url = receive_next_job(interactive_streak)
             except Exception as sqs_error:
                 logger.error(f"❌ SQS receive_message ERROR: {type(sqs_error).__name__}: {str(sqs_error)}")
                 time.sleep(5)
                 continue
 
-            messages = response.get('Messages', [])
-            logger.info(f"📬 Received {len(messages)} message(s)")
-
-            if not messages:
+            if message is None:
                 logger.info("⏳ No messages, continuing polling...")
                 continue
 
-            for message in messages:
-                receipt_handle = message['ReceiptHandle']
-                body = json.loads(message['Body'])
-
-                logger.info(f"📩 Received message: {body.get('job_id', 'unknown')}")
-
-                # Process job
-                result = process_job(body)
-
-                # Send webhook
-                send_webhook(result)
-
-                # Delete message from queue
-                sqs_client.delete_message(
-                    QueueUrl=SQS_QUEUE_URL,
-                    ReceiptHandle=receipt_handle
-                )
-
-                logger.info(f"✅ Message processed and deleted")
+            lane = 'bulk' if queue_url == SQS_BULK_QUEUE_URL else 'interactive'
+            interactive_streak = interactive_streak + 1 if lane == 'interactive' else 0
+
+            receipt_handle = message['ReceiptHandle']
+            received_at = time.time()
+            body = json.loads(message['Body'])
+
+            logger.info(f"📩 Received {lane} message: {body.get('job_id', 'unknown')}")
+
+            # Span du job (enfant du callback MediaConvert via le message SQS)
+            span = Span('ecs.ffmpeg_job', TRACE_SERVICE, body.get(TRACEPARENT_KEY),
+                        job_id=body.get('job_id'), video_id=body.get('video_id'), lane=lane)
+            timings = {}
+            queue_wait = None
+            sent_timestamp = message.get('Attributes', {}).get('SentTimestamp')
+            if sent_timestamp:
+                timings['sqs_wait'] = span.child('sqs.wait', start_time=int(sent_timestamp) / 1000).end(received_at)
+                queue_wait = received_at - int(sent_timestamp) / 1000
+
+            # Process job
+            JOBS_IN_FLIGHT.inc()
+            # Seule l'attente interactive compte pour la cible de latence du scaling
+            backlog_metrics.job_started(queue_wait if lane == 'interactive' else None)
+            try:
+                result = process_job(body, span)
+            finally:
+                JOBS_IN_FLIGHT.dec()
+                backlog_metrics.job_finished(time.time() - received_at)
+            JOBS_TOTAL.labels(status=result.get('status', 'ERROR')).inc()
+            timings.update(result.pop('timings', {}))
+            if result.get('status') == 'ERROR':
+                span.set_error(result.get('error', 'unknown error'))
+            span.end()
+
+            result['ecs_message_id'] = message.get('MessageId')
+            result[TRACEPARENT_KEY] = span.traceparent
+            result['timings'] = timings
+            result['source'] = 'ecs-worker'
+
+            # Send webhook
+            send_webhook(result)
+
+            # Delete message from queue
+            sqs_client.delete_message(
+                QueueUrl=queue_url,
+                ReceiptHandle=receipt_handle
+            )
+
+            logger.info(f"✅ Message processed and deleted")
 
         except KeyboardInterrupt:
             logger.info("👋 Worker stopped by user")
@@ -0,0 +1,134 @@
+"""
+📈 Métriques Prometheus du worker FFmpeg
+
+Servies sur METRICS_PORT (défaut 9100, 0 = désactivé) par un thread HTTP :
+
+- hospup_worker_stage_duration_seconds{stage} : download (par fichier S3),
+  ffmpeg (rendu), upload, webhook
+- hospup_worker_jobs_in_flight : jobs en cours sur ce worker
+- hospup_worker_jobs_total{status} : jobs terminés (COMPLETE / ERROR)
+- hospup_worker_ffmpeg_realtime_factor : secondes de vidéo rendues par
+  seconde de rendu (> 1 = plus rapide que le temps réel)
+- hospup_worker_temp_disk_used_bytes / _free_bytes : disque temporaire,
+  lu à chaque scrape
+
+BacklogPublisher envoie en plus à CloudWatch (BACKLOG_METRICS_NAMESPACE) les
+entrées de l'autoscaling "backlog par tâche" du stack CDK : InFlightJobs,
+ProcessingTimeAvg (moyenne mobile exponentielle) et QueueWaitSeconds
+(attente en file max des messages reçus depuis le dernier envoi).
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '9100'))
+BACKLOG_METRICS_NAMESPACE = os.environ.get('BACKLOG_METRICS_NAMESPACE', '')
+BACKLOG_PUBLISH_INTERVAL = int(os.environ.get('BACKLOG_PUBLISH_INTERVAL', '60'))
+PROCESSING_EMA_ALPHA = 0.2
+
+STAGE_SECONDS = Histogram(
+    'hospup_worker_stage_duration_seconds',
+    'Durée des étapes du worker',
+    ['stage'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120, 300, 600),
+)
+JOBS_IN_FLIGHT = Gauge('hospup_worker_jobs_in_flight', 'Jobs en cours sur ce worker')
+JOBS_TOTAL = Counter('hospup_worker_jobs_total', 'Jobs terminés', ['status'])
+FFMPEG_REALTIME_FACTOR = Histogram(
+    'hospup_worker_ffmpeg_realtime_factor',
+    'Secondes de vidéo produites par seconde de rendu FFmpeg',
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16),
+)
+TEMP_DISK_USED = Gauge('hospup_worker_temp_disk_used_bytes', 'Espace utilisé du disque temporaire')
+TEMP_DISK_FREE = Gauge('hospup_worker_temp_disk_free_bytes', 'Espace libre du disque temporaire')
+
+TEMP_DISK_USED.set_function(lambda: shutil.disk_usage(tempfile.gettempdir()).used)
+TEMP_DISK_FREE.set_function(lambda: shutil.disk_usage(tempfile.gettempdir()).free)
+
+
+def start_metrics_server() -> bool:
+    """Démarre le serveur /metrics (thread daemon) ; False si désactivé"""
+    if METRICS_PORT <= 0:
+        return False
+    start_http_server(METRICS_PORT)
+    return True
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Chronomètre une étape (aussi en cas d'erreur)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def observe_realtime_factor(media_seconds: float, render_seconds: float):
+    if media_seconds > 0 and render_seconds > 0:
+        FFMPEG_REALTIME_FACTOR.observe(media_seconds / render_seconds)
+
+
+class BacklogPublisher:
+    """Entrées du scaling par backlog, publiées toutes les BACKLOG_PUBLISH_INTERVAL secondes"""
+
+    def __init__(self, cloudwatch_client, namespace: str = BACKLOG_METRICS_NAMESPACE,
+                 interval: int = BACKLOG_PUBLISH_INTERVAL):
+        self.cloudwatch = cloudwatch_client
+        self.namespace = namespace
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._processing_avg: Optional[float] = None
+        self._max_queue_wait: Optional[float] = None
+
+    def job_started(self, queue_wait_seconds: Optional[float]):
+        with self._lock:
+            self._in_flight += 1
+            if queue_wait_seconds is not None:
+                self._max_queue_wait = max(self._max_queue_wait or 0.0, queue_wait_seconds)
+
+    def job_finished(self, processing_seconds: float):
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            if self._processing_avg is None:
+                self._processing_avg = processing_seconds
+            else:
+                self._processing_avg += PROCESSING_EMA_ALPHA * (processing_seconds - self._processing_avg)
+
+    def start(self) -> bool:
+        """Thread daemon de publication ; False si aucun namespace configuré"""
+        if not self.namespace:
+            return False
+        threading.Thread(target=self._run, name='backlog-metrics', daemon=True).start()
+        return True
+
+    def publish(self):
+        with self._lock:
+            metrics: List[Dict[str, Any]] = [
+                {'MetricName': 'InFlightJobs', 'Value': self._in_flight, 'Unit': 'Count'}
+            ]
+            if self._processing_avg is not None:
+                metrics.append({'MetricName': 'ProcessingTimeAvg', 'Value': self._processing_avg, 'Unit': 'Seconds'})
+            if self._max_queue_wait is not None:
+                metrics.append({'MetricName': 'QueueWaitSeconds', 'Value': self._max_queue_wait, 'Unit': 'Seconds'})
+                self._max_queue_wait = None
+        self.cloudwatch.put_metric_data(Namespace=self.namespace, MetricData=metrics)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.publish()
+            except Exception as e:
+                logger.warning(f"⚠️ Backlog metrics publish failed: {str(e)}")
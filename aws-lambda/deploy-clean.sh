@@ -1,8 +1,21 @@
 #!/bin/bash
 # 🚀 Deploy Clean MediaConvert Solution
 
+set -e
+
 echo "🎬 Deploying Clean MediaConvert Solution..."
 
+# 0. Build the package from the sources (one ZIP for both Lambdas)
+echo "📦 Creating lambda-clean-solution.zip..."
+rm -rf package/
+rm -f lambda-clean-solution.zip
+mkdir -p package
+cp video-generator.py mediaconvert-callback.py package/
+cp pipeline_tracing.py package/  # Traçage partagé (importé par les deux handlers)
+cd package
+zip -r ../lambda-clean-solution.zip .
+cd ..
+
 # 1. Update video-generator Lambda
 echo "📦 Updating video-generator Lambda..."
 ./aws-wrapper.sh lambda update-function-code \
@@ -33,6 +46,10 @@ echo "🔧 Setting callback environment..."
         "RAILWAY_CALLBACK_URL":"https://web-production-b52f.up.railway.app/api/v1/videos/aws-callback"
     }'
 
+# Nettoyer les fichiers temporaires
+rm -rf package/
+rm -f lambda-clean-solution.zip
+
 echo "✅ Clean solution deployed!"
 echo ""
 echo "🎯 SOLUTION RESUMÉ:"
@@ -26,6 +26,7 @@ pip3 install --target ./package -r requirements.txt
 
 # Copier le code Lambda
 cp video-generator.py package/
+cp pipeline_tracing.py package/  # Traçage partagé (importé par video-generator.py)
 
 # Créer l'archive ZIP
 cd package
@@ -225,6 +225,7 @@ mkdir package
 # Installation dépendances
 pip3 install -r requirements.txt -t ./package/
 cp video-generator.py ./package/
+cp pipeline_tracing.py ./package/  # Traçage partagé (importé par video-generator.py)
 
 # Création ZIP
 cd package && zip -r ../hospup-video-generator.zip . -q && cd ..
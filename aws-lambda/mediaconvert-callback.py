@@ -9,12 +9,18 @@ import boto3
 import urllib3
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from pipeline_tracing import Span, TRACEPARENT_KEY
 
 # Configuration
 RAILWAY_CALLBACK_URL = os.environ.get('RAILWAY_CALLBACK_URL', 'https://web-production-b52f.up.railway.app/api/v1/videos/aws-callback')
 S3_BUCKET = os.environ.get('S3_BUCKET_NAME') or os.environ.get('S3_BUCKET', 'hospup-files')
-SQS_QUEUE_URL = os.environ.get('SQS_QUEUE_URL', '')  # ECS FFmpeg queue
+SQS_QUEUE_URL = os.environ.get('SQS_QUEUE_URL', '')  # ECS FFmpeg queue (interactive)
+# Voie bulk (lots / backfills) ; sans elle tout passe par SQS_QUEUE_URL
+SQS_BULK_QUEUE_URL = os.environ.get('SQS_BULK_QUEUE_URL', '')
+
+TRACE_SERVICE = 'hospup-mediaconvert-callback'
 
 # HTTP client pour callback
 http = urllib3.PoolManager()
@@ -26,6 +32,7 @@ def lambda_handler(event, context):
     """
     Gestionnaire principal pour les événements MediaConvert EventBridge
     """
+    span = None
     try:
         print(f"🔄 MediaConvert callback event: {json.dumps(event, indent=2)}")
         
@@ -51,15 +58,24 @@ def lambda_handler(event, context):
         job_id_metadata = user_metadata.get('job_id')  # job_id from video generator
         webhook_url = user_metadata.get('webhook_url')
 
+        # Contexte de trace posé par hospup-video-generator dans UserMetadata
+        span = Span('lambda.mediaconvert_callback', TRACE_SERVICE, user_metadata.get(TRACEPARENT_KEY),
+                    job_id=job_id_metadata, mediaconvert_job_id=job_id, status=status)
+        timings = mediaconvert_timings(detail, span)
+
         # Préparer les données du callback
+        # job_id = notre id de render job (UserMetadata), mediaconvert_job_id = id AWS
         callback_data = {
-            "job_id": job_id,
+            "job_id": job_id_metadata or job_id,
             "mediaconvert_job_id": job_id,
             "video_id": video_id,
             "property_id": property_id,
             "status": status,
             "progress": progress,
-            "processing_time": datetime.utcnow().isoformat()
+            "processing_time": datetime.utcnow().isoformat(),
+            TRACEPARENT_KEY: span.traceparent,
+            "timings": timings,
+            "source": "mediaconvert-callback"
         }
 
         # Si le job est terminé avec succès, extraire les URLs directement de l'événement EventBridge
@@ -83,18 +99,25 @@ def lambda_handler(event, context):
                     print(f"   Custom script S3: {custom_script_s3_key}")
 
                 # Send job to ECS FFmpeg via SQS
-                ecs_success = send_to_ecs_ffmpeg(
+                ecs_message_id = send_to_ecs_ffmpeg(
                     job_id=job_id_metadata or job_id,
                     video_id=video_id,
                     property_id=property_id,
                     base_video_url=output_urls['output_url'],
                     text_overlays_s3_key=text_overlays_s3_key,
-                    custom_script_s3_key=custom_script_s3_key
+                    custom_script_s3_key=custom_script_s3_key,
+                    traceparent=span.traceparent,
+                    priority=user_metadata.get('priority')
                 )
 
-                if ecs_success:
+                if ecs_message_id:
                     print(f"✅ ECS FFmpeg job queued successfully")
-                    # Don't send callback to Railway yet - ECS FFmpeg will do that when done
+                    # Final callback comes from ECS FFmpeg; only record the stage change here
+                    send_callback_to_railway({
+                        **callback_data,
+                        "status": "POST_PROCESSING",
+                        "ecs_message_id": ecs_message_id
+                    })
                     return {
                         'statusCode': 200,
                         'body': json.dumps({
@@ -133,7 +156,35 @@ def lambda_handler(event, context):
             
     except Exception as e:
         print(f"❌ Error processing MediaConvert callback: {str(e)}")
+        if span:
+            span.set_error(str(e))
         return create_error_response(f"Callback processing failed: {str(e)}")
+    finally:
+        if span:
+            span.end()
+
+def mediaconvert_timings(event_detail: Dict[str, Any], parent: Span) -> Dict[str, Dict[str, float]]:
+    """
+    Attente en file et transcodage MediaConvert (detail.timing, en millisecondes),
+    exportés comme spans enfants et renvoyés comme timings du callback
+    """
+    timing = event_detail.get('timing') or {}
+    try:
+        submit_time = float(timing['submitTime']) / 1000 if timing.get('submitTime') else None
+        start_time = float(timing['startTime']) / 1000 if timing.get('startTime') else None
+        finish_time = float(timing['finishTime']) / 1000 if timing.get('finishTime') else None
+    except (TypeError, ValueError):
+        return {}
+
+    timings = {}
+    if submit_time and start_time:
+        timings['mediaconvert_queue'] = parent.child('mediaconvert.queue', start_time=submit_time).end(start_time)
+    if start_time and finish_time:
+        transcode = parent.child('mediaconvert.transcode', start_time=start_time)
+        if event_detail.get('status') == 'ERROR':
+            transcode.set_error(event_detail.get('errorMessage', 'MediaConvert error'))
+        timings['mediaconvert_transcode'] = transcode.end(finish_time)
+    return timings
 
 def extract_output_urls_from_event(event_detail: Dict[str, Any], filename_job_id: str, user_id: str, property_id: str, video_id: str) -> Dict[str, str]:
     """
@@ -192,14 +243,17 @@ def convert_s3_to_https_url(s3_path: str) -> str:
     # Fallback: construire avec le bucket par défaut
     return f"https://s3.eu-west-1.amazonaws.com/{S3_BUCKET}/{s3_path}"
 
-def send_to_ecs_ffmpeg(job_id: str, video_id: str, property_id: str, base_video_url: str, text_overlays_s3_key: str = None, custom_script_s3_key: str = None) -> bool:
+def send_to_ecs_ffmpeg(job_id: str, video_id: str, property_id: str, base_video_url: str, text_overlays_s3_key: str = None, custom_script_s3_key: str = None, traceparent: str = None, priority: str = None) -> Optional[str]:
     """
     Envoyer un job à ECS FFmpeg via SQS pour ajouter les text overlays et/ou appliquer les image adjustments
+    Les jobs `bulk` vont dans la file bulk (si configurée), les autres dans la file interactive.
+    Retourne le MessageId SQS (None en cas d'échec)
     """
     try:
-        if not SQS_QUEUE_URL:
+        queue_url = SQS_BULK_QUEUE_URL if priority == 'bulk' and SQS_BULK_QUEUE_URL else SQS_QUEUE_URL
+        if not queue_url:
             print(f"❌ SQS_QUEUE_URL not configured - cannot send to ECS FFmpeg")
-            return False
+            return None
 
         s3_client = boto3.client('s3', region_name='eu-west-1')
 
@@ -242,26 +296,28 @@ def send_to_ecs_ffmpeg(job_id: str, video_id: str, property_id: str, base_video_
                 'end_time': 999
             }],
             'text_overlays': text_overlays,  # Legacy fallback
-            'custom_script': custom_script  # Contains texts with full styles + image adjustments (presets)
+            'custom_script': custom_script,  # Contains texts with full styles + image adjustments (presets)
+            'priority': priority or 'interactive',
+            TRACEPARENT_KEY: traceparent  # Trace context for the ECS worker spans
         }
 
-        print(f"📤 Sending to SQS: {SQS_QUEUE_URL}")
+        print(f"📤 Sending to SQS: {queue_url}")
         print(f"📦 Message: job_id={job_id}, base_video={base_video_url}, texts={len(text_overlays)}, presets={bool(custom_script.get('presets'))}")
 
         # Send message to SQS
         response = sqs_client.send_message(
-            QueueUrl=SQS_QUEUE_URL,
+            QueueUrl=queue_url,
             MessageBody=json.dumps(message)
         )
 
         print(f"✅ SQS message sent: MessageId={response.get('MessageId')}")
-        return True
+        return response.get('MessageId')
 
     except Exception as e:
         print(f"❌ Error sending to ECS FFmpeg: {str(e)}")
         import traceback
         traceback.print_exc()
-        return False
+        return None
 
 
 def send_callback_to_railway(callback_data: Dict[str, Any]) -> bool:
@@ -0,0 +1,101 @@
+"""
+🔭 Traçage du pipeline vidéo (Lambdas + worker ECS)
+
+Pendant composant de app/core/tracing.py : le contexte W3C `traceparent`
+reçu (payload Lambda, UserMetadata MediaConvert, message SQS) devient le
+parent des spans du composant, et le `traceparent` du span courant est
+transmis à l'étape suivante et dans les callbacks.
+
+Les spans sont des enregistrements OTLP/JSON. Avec TRACE_EXPORT_PATH ils
+sont ajoutés à ce fichier (une ligne JSON par span, pour les tests) ;
+sinon ils sont écrits sur stdout (CloudWatch) préfixés par `TRACE_SPAN`.
+
+Bibliothèque standard uniquement : copié tel quel dans les packages des
+Lambdas et dans l'image du worker ECS.
+"""
+
+import json
+import os
+import secrets
+import time
+from typing import Any, Dict, Optional, Tuple
+
+TRACEPARENT_KEY = 'traceparent'
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', '')
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, span_id parent) d'un `00-<trace>-<span>-<flags>`, None si invalide"""
+    parts = (value or '').strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+class Span:
+    """Opération chronométrée ; exportée par end()"""
+
+    def __init__(self, name: str, service: str, traceparent: Optional[str] = None,
+                 start_time: Optional[float] = None, **attributes: Any):
+        context = parse_traceparent(traceparent)
+        if context:
+            self.trace_id, self.parent_span_id = context
+        else:
+            self.trace_id, self.parent_span_id = secrets.token_hex(16), ''
+        self.span_id = secrets.token_hex(8)
+        self.name = name
+        self.service = service
+        self.attributes = attributes
+        self.start_time = start_time if start_time is not None else time.time()
+        self.end_time: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def child(self, name: str, start_time: Optional[float] = None, **attributes: Any) -> 'Span':
+        return Span(name, self.service, self.traceparent, start_time=start_time, **attributes)
+
+    def set_error(self, message: str):
+        self.error = message
+
+    def end(self, end_time: Optional[float] = None) -> Dict[str, float]:
+        """Exporte le span ; retourne sa fenêtre {"start", "end"} (epoch secondes) pour les timings"""
+        if self.end_time is None:
+            self.end_time = end_time if end_time is not None else time.time()
+            export_span(self.to_otlp())
+        return {'start': self.start_time, 'end': self.end_time}
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_span_id,
+            'name': self.name,
+            'kind': 'SPAN_KIND_INTERNAL',
+            'startTimeUnixNano': str(int(self.start_time * 1e9)),
+            'endTimeUnixNano': str(int((self.end_time or time.time()) * 1e9)),
+            'attributes': [
+                {'key': key, 'value': {'stringValue': str(value)}}
+                for key, value in self.attributes.items() if value is not None
+            ],
+            'status': {'code': 'STATUS_CODE_ERROR', 'message': self.error} if self.error else {'code': 'STATUS_CODE_OK'},
+            'resource': {'service.name': self.service},
+        }
+
+
+def export_span(record: Dict[str, Any]):
+    line = json.dumps(record)
+    if TRACE_EXPORT_PATH:
+        try:
+            with open(TRACE_EXPORT_PATH, 'a', encoding='utf-8') as export_file:
+                export_file.write(line + '\n')
+            return
+        except OSError as e:
+            print(f"⚠️ Span export failed ({TRACE_EXPORT_PATH}): {e}")
+    print(f"TRACE_SPAN {line}")
@@ -9,16 +9,28 @@ import uuid
 import os
 import urllib.request
 import urllib.parse
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from pipeline_tracing import Span, TRACEPARENT_KEY
+
 # Configuration S3
 S3_BUCKET = os.environ.get('S3_BUCKET', 'hospup-files')
 
+TRACE_SERVICE = 'hospup-video-generator'
+
+# Voie de rendu (interactive : clic "générer" de l'éditeur, bulk : lots / backfills)
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BULK = 'bulk'
+# Priorité de la file MediaConvert (-50..50) par voie
+MEDIACONVERT_PRIORITY = {PRIORITY_INTERACTIVE: 10, PRIORITY_BULK: -10}
+
 def lambda_handler(event, context):
     """
     Point d'entrée principal pour la génération vidéo MediaConvert
     """
+    started_at = time.time()
     try:
         print(f"🚀 Starting MediaConvert video generation: {json.dumps(event, indent=2)}")
 
@@ -51,6 +63,8 @@ def lambda_handler(event, context):
         text_overlays = body.get('text_overlays', [])
         total_duration = body.get('total_duration', 30)
         webhook_url = body.get('webhook_url')
+        traceparent = body.get(TRACEPARENT_KEY)
+        priority = PRIORITY_BULK if body.get('priority') == PRIORITY_BULK else PRIORITY_INTERACTIVE
 
         print(f"🔍 CUSTOM SCRIPT DEBUG: {json.dumps(custom_script, indent=2)}")
         print(f"🔍 TEXT OVERLAYS DEBUG: {json.dumps(text_overlays, indent=2)}")
@@ -63,7 +77,8 @@ def lambda_handler(event, context):
         # 🎯 ALWAYS USE MEDIACONVERT
         return process_with_mediaconvert(
             property_id, video_id, job_id, segments, text_overlays,
-            webhook_url, total_duration, custom_script
+            webhook_url, total_duration, custom_script,
+            traceparent=traceparent, started_at=started_at, priority=priority
         )
 
     except json.JSONDecodeError as e:
@@ -74,7 +89,8 @@ def lambda_handler(event, context):
         return create_error_response(500, f"Internal error: {str(e)}")
 
 
-def process_with_mediaconvert(property_id, video_id, job_id, segments, text_overlays, webhook_url, total_duration, custom_script):
+def process_with_mediaconvert(property_id, video_id, job_id, segments, text_overlays, webhook_url, total_duration, custom_script,
+                              traceparent=None, started_at=None, priority=PRIORITY_INTERACTIVE):
     """Process video using AWS MediaConvert with TTML subtitle burn-in"""
     import boto3
     import json
@@ -82,6 +98,10 @@ def process_with_mediaconvert(property_id, video_id, job_id, segments, text_over
     import urllib.parse
     from datetime import datetime
 
+    # Span de la Lambda (enfant de l'appel API) : son traceparent suit le job jusqu'aux callbacks
+    span = Span('lambda.video_generator', TRACE_SERVICE, traceparent, start_time=started_at,
+                job_id=job_id, video_id=video_id)
+
     try:
         print(f"🚀 Starting MediaConvert processing for video {video_id}")
 
@@ -352,7 +372,9 @@ def process_with_mediaconvert(property_id, video_id, job_id, segments, text_over
             'video_id': str(video_id),
             'property_id': str(property_id),
             'job_id': str(job_id),
-            'webhook_url': webhook_url or ''
+            'webhook_url': webhook_url or '',
+            'priority': priority,  # Voie SQS du worker FFmpeg (mediaconvert-callback)
+            TRACEPARENT_KEY: span.traceparent
         }
 
         # Add text_overlays S3 key if exists (for ECS FFmpeg post-processing)
@@ -373,15 +395,36 @@ def process_with_mediaconvert(property_id, video_id, job_id, segments, text_over
             AccelerationSettings={
                 'Mode': 'PREFERRED'  # ⚡ GPU acceleration: 17s → 5s (3-4x faster!)
             },
+            Priority=MEDIACONVERT_PRIORITY[priority],  # Les jobs interactifs passent devant les lots
             UserMetadata=user_metadata
         )
 
         mediaconvert_job_id = response['Job']['Id']
         print(f"✅ MediaConvert job submitted: {mediaconvert_job_id}")
+        span.attributes['mediaconvert_job_id'] = mediaconvert_job_id
+        lambda_window = span.end()
         print(f"ℹ️ MediaConvert will call webhook when job completes via EventBridge")
         print(f"ℹ️ Expected output: s3://{S3_BUCKET}/generated-videos/{property_id}/{video_id}.mp4")
         print(f"ℹ️ Job ID for tracking: {job_id}")
 
+        # Let the backend link its render job to the MediaConvert job id right away
+        if webhook_url:
+            try:
+                submitted_data = {
+                    'video_id': str(video_id),
+                    'job_id': str(job_id),
+                    'mediaconvert_job_id': mediaconvert_job_id,
+                    'status': 'PROGRESSING',
+                    'progress': 0,
+                    TRACEPARENT_KEY: span.traceparent,
+                    'timings': {'lambda_prepare': lambda_window},
+                    'source': 'video-generator'
+                }
+                req = urllib.request.Request(webhook_url, data=json.dumps(submitted_data).encode('utf-8'), headers={'Content-Type': 'application/json'})
+                urllib.request.urlopen(req, timeout=10)
+            except Exception as e:
+                print(f"⚠️ Could not notify webhook of MediaConvert submission: {e}")
+
         return {
             'statusCode': 200,
             'body': json.dumps({
@@ -395,6 +438,8 @@ def process_with_mediaconvert(property_id, video_id, job_id, segments, text_over
 
     except Exception as e:
         print(f"❌ MediaConvert processing failed: {str(e)}")
+        span.set_error(str(e))
+        lambda_window = span.end()
 
         # Call webhook with error status
         if webhook_url:
@@ -404,7 +449,10 @@ def process_with_mediaconvert(property_id, video_id, job_id, segments, text_over
                     'job_id': str(job_id),
                     'status': 'FAILED',
                     'error_message': str(e),
-                    'processing_time': datetime.utcnow().isoformat()
+                    'processing_time': datetime.utcnow().isoformat(),
+                    TRACEPARENT_KEY: span.traceparent,
+                    'timings': {'lambda_prepare': lambda_window},
+                    'source': 'video-generator'
                 }
                 json_data = json.dumps(error_data).encode('utf-8')
                 req = urllib.request.Request(webhook_url, data=json_data, headers={'Content-Type': 'application/json'})
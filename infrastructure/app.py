@@ -23,6 +23,7 @@ env = Environment(
 # Paramètres configurables
 warm_pool_size = int(app.node.try_get_context('warm_pool_size') or 10)
 max_workers = int(app.node.try_get_context('max_workers') or 50)
+queue_wait_target_seconds = int(app.node.try_get_context('queue_wait_target_seconds') or 60)
 
 # Créer le stack
 stack = VideoProcessingStack(
@@ -31,6 +32,7 @@ stack = VideoProcessingStack(
     env=env,
     warm_pool_size=warm_pool_size,
     max_workers=max_workers,
+    queue_wait_target_seconds=queue_wait_target_seconds,
     description="Hospup Video Processing Infrastructure - ECS Fargate FFmpeg with Warm Pool"
 )
 
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+🧪 Simulateur d'autoscaling des workers FFmpeg
+
+Rejoue une trace d'arrivées de jobs contre la politique de scaling du stack
+(stacks/video_processing_stack.py) et mesure l'attente en file et le coût :
+
+    # Trace : un instant d'arrivée (secondes) par ligne, ou CSV dont la 1re colonne l'est
+    python scaling_simulator.py --trace arrivals.csv
+
+    # Trafic synthétique : Poisson à 4 jobs/min avec un pic à 30 jobs/min pendant 10 min
+    python scaling_simulator.py --rate 4 --burst-rate 30 --burst-start 1800 --burst-minutes 10
+
+    # Comparer avec l'ancienne politique par paliers sur les messages visibles
+    python scaling_simulator.py --rate 4 --policy step
+
+Modèle : un job par tâche, file FIFO, démarrage d'une tâche en
+--startup-seconds, métriques à la minute. Le target tracking suit le
+comportement d'Application Auto Scaling : scale out après 3 minutes
+au-dessus de la cible, scale in après 15 minutes sous 90 % de la cible,
+avec les cooldowns du stack. En scale in seules les tâches inactives sont
+arrêtées. Bibliothèque standard uniquement.
+"""
+
+import argparse
+import math
+import random
+import statistics
+from collections import deque
+from typing import Deque, List, Optional
+
+# Valeurs du stack (VideoProcessingStack / backlog_per_task_expression)
+DEFAULT_PROCESSING_SECONDS = 120
+SCALE_OUT_COOLDOWN = 60
+SCALE_IN_COOLDOWN = 300
+SCALE_OUT_DATAPOINTS = 3
+SCALE_IN_DATAPOINTS = 15
+PROCESSING_EMA_ALPHA = 0.2  # aws-ecs-ffmpeg/worker_metrics.py
+
+
+def backlog_per_task(visible: float, inflight: Optional[float], proc: Optional[float],
+                     wait: Optional[float], tasks: float, queue_wait_target: float) -> float:
+    """Même calcul que la métrique math du stack (visible : les deux voies ; FILL -> valeurs par défaut)"""
+    inflight = inflight if inflight is not None else 0.0
+    proc = proc if proc is not None else DEFAULT_PROCESSING_SECONDS
+    wait = wait if wait is not None else 0.0
+    load = inflight + visible * proc / (queue_wait_target * (tasks if tasks > 0 else 1))
+    return max(load, wait / queue_wait_target)
+
+
+def load_trace(path: str) -> List[float]:
+    arrivals = []
+    with open(path, encoding='utf-8') as trace_file:
+        for line in trace_file:
+            value = line.split(',')[0].strip()
+            try:
+                arrivals.append(float(value))
+            except ValueError:
+                continue  # En-tête ou ligne vide
+    arrivals.sort()
+    start = arrivals[0] if arrivals else 0.0
+    return [arrival - start for arrival in arrivals]
+
+
+def poisson_arrivals(rate_per_minute: float, duration_seconds: int, burst_rate: float = 0.0,
+                     burst_start: int = 0, burst_minutes: int = 0, seed: int = 42) -> List[float]:
+    rng = random.Random(seed)
+    arrivals, now = [], 0.0
+    burst_end = burst_start + burst_minutes * 60
+    while now < duration_seconds:
+        rate = burst_rate if burst_minutes and burst_start <= now < burst_end else rate_per_minute
+        if rate <= 0:
+            now += 1
+            continue
+        now += rng.expovariate(rate / 60)
+        if now < duration_seconds:
+            arrivals.append(now)
+    return arrivals
+
+
+class Task:
+    def __init__(self, ready_at: float):
+        self.ready_at = ready_at
+        self.busy_until = 0.0
+        self.draining = False
+
+
+class Simulation:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.tasks: List[Task] = [Task(0.0) for _ in range(args.min_tasks)]
+        self.queue: Deque[float] = deque()
+        self.waits: List[float] = []
+        self.task_seconds = 0.0
+        self.max_tasks = len(self.tasks)
+        self.processing_avg: Optional[float] = None
+        self.minute_max_wait: Optional[float] = None
+        self.above, self.below = 0, 0
+        self.last_scale_out = self.last_scale_in = -math.inf
+
+    def processing_time(self) -> float:
+        # Log-normale autour de la moyenne demandée (queue à droite des rendus longs)
+        sigma = self.args.processing_sigma
+        mu = math.log(self.args.processing_seconds) - sigma ** 2 / 2
+        return self.rng.lognormvariate(mu, sigma)
+
+    def running(self, now: float) -> List[Task]:
+        return [task for task in self.tasks if task.ready_at <= now]
+
+    def step(self, now: float):
+        # Fin des jobs ; les tâches en drain libres s'arrêtent
+        for task in self.running(now):
+            if task.busy_until and task.busy_until <= now:
+                task.busy_until = 0.0
+        self.tasks = [task for task in self.tasks if not (task.draining and task.busy_until == 0.0)]
+
+        # Attribution FIFO aux tâches libres
+        for task in self.running(now):
+            if not self.queue:
+                break
+            if task.busy_until == 0.0 and not task.draining:
+                arrived = self.queue.popleft()
+                wait = now - arrived
+                duration = self.processing_time()
+                self.waits.append(wait)
+                self.minute_max_wait = max(self.minute_max_wait or 0.0, wait)
+                task.busy_until = now + duration
+                # EMA de la durée, comme le worker (connue ici dès l'attribution)
+                self.processing_avg = duration if self.processing_avg is None else \
+                    self.processing_avg + PROCESSING_EMA_ALPHA * (duration - self.processing_avg)
+
+        self.task_seconds += len(self.tasks)
+        self.max_tasks = max(self.max_tasks, len(self.tasks))
+
+    def evaluate(self, now: float):
+        """Une évaluation par minute (période des métriques CloudWatch)"""
+        running = self.running(now)
+        busy = sum(1 for task in running if task.busy_until > now)
+        if self.args.policy == 'step':
+            self.step_policy(now, len(self.queue))
+            return
+
+        metric = backlog_per_task(
+            visible=len(self.queue),
+            inflight=busy / len(running) if running else None,
+            proc=self.processing_avg,
+            wait=self.minute_max_wait,
+            tasks=len(running),
+            queue_wait_target=self.args.queue_wait_target
+        )
+        self.minute_max_wait = None
+        target = self.args.target_load
+        capacity = len([task for task in self.tasks if not task.draining])
+        desired = min(max(math.ceil(capacity * metric / target), self.args.min_tasks), self.args.max_tasks)
+
+        self.above = self.above + 1 if metric > target else 0
+        self.below = self.below + 1 if metric < 0.9 * target else 0
+        if desired > capacity and self.above >= SCALE_OUT_DATAPOINTS and now - self.last_scale_out >= SCALE_OUT_COOLDOWN:
+            self.scale_to(now, desired, capacity)
+            self.last_scale_out = now
+        elif desired < capacity and self.below >= SCALE_IN_DATAPOINTS and now - self.last_scale_in >= SCALE_IN_COOLDOWN \
+                and now - self.last_scale_out >= SCALE_OUT_COOLDOWN:
+            self.scale_to(now, desired, capacity)
+            self.last_scale_in = now
+
+    def step_policy(self, now: float, visible: int):
+        """Ancienne politique : paliers sur ApproximateNumberOfMessagesVisible (cooldown 30 s)"""
+        if now - self.last_scale_out < 30:
+            return
+        capacity = len([task for task in self.tasks if not task.draining])
+        change = -1 if visible == 0 else 10 if visible > 30 else 5 if visible > 10 else 1
+        desired = min(max(capacity + change, self.args.min_tasks), self.args.max_tasks)
+        if desired != capacity:
+            self.scale_to(now, desired, capacity)
+            self.last_scale_out = now
+
+    def scale_to(self, now: float, desired: int, capacity: int):
+        if desired > capacity:
+            self.tasks.extend(Task(now + self.args.startup_seconds) for _ in range(desired - capacity))
+            return
+        to_stop = capacity - desired
+        for task in sorted(self.tasks, key=lambda t: t.busy_until):
+            if to_stop == 0:
+                break
+            if not task.draining:
+                task.draining = True  # Arrêtée dès qu'elle est libre
+                to_stop -= 1
+
+    def run(self, arrivals: List[float]):
+        pending = deque(arrivals)
+        end = (arrivals[-1] if arrivals else 0) + self.args.drain_seconds
+        now = 0
+        while now <= end or self.queue:
+            while pending and pending[0] <= now:
+                self.queue.append(pending.popleft())
+            self.step(now)
+            if now % 60 == 0:
+                self.evaluate(now)
+            now += 1
+        return now
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(math.ceil(pct / 100 * len(ordered))) - 1, len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue des arrivées de jobs contre la politique de scaling")
+    parser.add_argument('--trace', help="Fichier d'instants d'arrivée (secondes, 1re colonne)")
+    parser.add_argument('--rate', type=float, default=4.0, help="Jobs/min (trafic synthétique)")
+    parser.add_argument('--duration-minutes', type=int, default=120)
+    parser.add_argument('--burst-rate', type=float, default=0.0)
+    parser.add_argument('--burst-start', type=int, default=0, help="Début du pic (secondes)")
+    parser.add_argument('--burst-minutes', type=int, default=0)
+    parser.add_argument('--processing-seconds', type=float, default=DEFAULT_PROCESSING_SECONDS)
+    parser.add_argument('--processing-sigma', type=float, default=0.35)
+    parser.add_argument('--startup-seconds', type=int, default=60, help="Démarrage d'une tâche Fargate")
+    parser.add_argument('--min-tasks', type=int, default=10, help="Warm pool")
+    parser.add_argument('--max-tasks', type=int, default=50)
+    parser.add_argument('--queue-wait-target', type=float, default=60)
+    parser.add_argument('--target-load', type=float, default=1.0)
+    parser.add_argument('--policy', choices=['backlog', 'step'], default='backlog')
+    parser.add_argument('--drain-seconds', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.trace:
+        arrivals = load_trace(args.trace)
+    else:
+        arrivals = poisson_arrivals(args.rate, args.duration_minutes * 60, args.burst_rate,
+                                    args.burst_start, args.burst_minutes, args.seed)
+
+    simulation = Simulation(args)
+    elapsed = simulation.run(arrivals)
+    waits = simulation.waits
+    within = sum(1 for wait in waits if wait <= args.queue_wait_target)
+
+    print(f"📊 Policy: {args.policy} | jobs: {len(waits)} | simulated: {elapsed / 60:.0f} min")
+    print(f"   Queue wait p50: {percentile(waits, 50):.0f}s  p95: {percentile(waits, 95):.0f}s  "
+          f"max: {max(waits, default=0):.0f}s (target {args.queue_wait_target:.0f}s)")
+    print(f"   Within target: {within / len(waits) * 100 if waits else 100:.1f}%")
+    print(f"   Tasks avg: {simulation.task_seconds / max(elapsed, 1):.1f}  max: {simulation.max_tasks}  "
+          f"task-hours: {simulation.task_seconds / 3600:.1f}")
+    if waits:
+        print(f"   Mean wait: {statistics.mean(waits):.0f}s")
+
+
+if __name__ == '__main__':
+    main()
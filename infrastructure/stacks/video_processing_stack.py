@@ -10,6 +10,8 @@ from aws_cdk import (
     RemovalPolicy,
     aws_ecr as ecr,
     aws_sqs as sqs,
+    aws_s3 as s3,
+    aws_s3_notifications as s3n,
     aws_ecs as ecs,
     aws_ec2 as ec2,
     aws_iam as iam,
@@ -19,6 +21,27 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+# Métriques publiées par le worker (aws-ecs-ffmpeg/worker_metrics.py)
+WORKER_METRICS_NAMESPACE = "Hospup/VideoWorkers"
+# Durée de traitement supposée tant que les workers n'ont rien publié
+DEFAULT_PROCESSING_SECONDS = 120
+
+
+def backlog_per_task_expression(queue_wait_target_seconds: int) -> str:
+    """
+    Charge par tâche (cible 1.0), en métrique math CloudWatch.
+
+    desired = tâches occupées + messages visibles (deux voies) × durée moyenne / attente cible,
+    divisé par les tâches en cours : le target tracking fait alors
+    capacité × charge / cible ≈ desired. Le second terme (attente réelle /
+    attente cible) force le scale out quand les jobs attendent déjà trop.
+    """
+    target = queue_wait_target_seconds
+    return (
+        f"MAX([FILL(inflight, 0) + (visible + FILL(bulk, 0)) * FILL(proc, {DEFAULT_PROCESSING_SECONDS}) "
+        f"/ ({target} * IF(tasks > 0, tasks, 1)), FILL(wait, 0) / {target}])"
+    )
+
 
 class VideoProcessingStack(Stack):
     """
@@ -31,12 +54,16 @@ class VideoProcessingStack(Stack):
         construct_id: str,
         warm_pool_size: int = 10,
         max_workers: int = 50,
+        queue_wait_target_seconds: int = 60,
+        scaling_target_load: float = 1.0,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
         self.warm_pool_size = warm_pool_size
         self.max_workers = max_workers
+        self.queue_wait_target_seconds = queue_wait_target_seconds
+        self.scaling_target_load = scaling_target_load
 
         # 1. ECR Repository pour image Docker FFmpeg
         self.create_ecr_repository()
@@ -44,6 +71,9 @@ class VideoProcessingStack(Stack):
         # 2. SQS Queue pour jobs vidéo
         self.create_sqs_queue()
 
+        # 2b. Queue d'ingestion alimentée par les notifications S3 (uploads)
+        self.create_ingest_queue()
+
         # 3. VPC (utilise default VPC)
         self.setup_vpc()
 
@@ -56,7 +86,7 @@ class VideoProcessingStack(Stack):
         # 6. ECS Service avec warm pool
         self.create_ecs_service()
 
-        # 7. Autoscaling basé sur SQS
+        # 7. Autoscaling sur le backlog par tâche
         self.setup_autoscaling()
 
         # 8. CloudWatch Dashboard
@@ -103,6 +133,48 @@ class VideoProcessingStack(Stack):
             )
         )
 
+        # Voie bulk (lots, backfills) : servie après la voie interactive par le worker
+        self.bulk_queue = sqs.Queue(
+            self,
+            "VideoJobsBulkQueue",
+            queue_name="hospup-video-jobs-bulk",
+            visibility_timeout=Duration.minutes(15),
+            receive_message_wait_time=Duration.seconds(20),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=3,
+                queue=self.dlq
+            )
+        )
+
+    def create_ingest_queue(self):
+        """Notifications S3 ObjectCreated sur videos/ → queue d'ingestion"""
+        self.ingest_dlq = sqs.Queue(
+            self,
+            "UploadIngestDLQ",
+            queue_name="hospup-upload-ingest-dlq",
+            retention_period=Duration.days(14)
+        )
+
+        self.ingest_queue = sqs.Queue(
+            self,
+            "UploadIngestQueue",
+            queue_name="hospup-upload-ingest",
+            visibility_timeout=Duration.minutes(15),  # Analyse OpenAI Vision + miniature
+            receive_message_wait_time=Duration.seconds(20),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=5,
+                queue=self.ingest_dlq
+            )
+        )
+
+        # Bucket existant (non géré par ce stack) : CDK ajoute seulement la notification
+        files_bucket = s3.Bucket.from_bucket_name(self, "FilesBucket", "hospup-files")
+        files_bucket.add_event_notification(
+            s3.EventType.OBJECT_CREATED,
+            s3n.SqsDestination(self.ingest_queue),
+            s3.NotificationKeyFilter(prefix="videos/")
+        )
+
     def setup_vpc(self):
         """Récupérer le VPC par défaut"""
         self.vpc = ec2.Vpc.from_lookup(
@@ -168,7 +240,17 @@ class VideoProcessingStack(Stack):
                     "sqs:DeleteMessage",
                     "sqs:GetQueueAttributes"
                 ],
-                resources=[self.queue.queue_arn]
+                resources=[self.queue.queue_arn, self.bulk_queue.queue_arn]
+            )
+        )
+
+        # Métriques de backlog publiées par le worker (autoscaling)
+        self.task_role.add_to_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["cloudwatch:PutMetricData"],
+                resources=["*"],
+                conditions={"StringEquals": {"cloudwatch:namespace": WORKER_METRICS_NAMESPACE}}
             )
         )
 
@@ -206,8 +288,13 @@ class VideoProcessingStack(Stack):
             environment={
                 "AWS_DEFAULT_REGION": self.region,
                 "SQS_QUEUE_URL": self.queue.queue_url,
-                "WEBHOOK_URL": "https://web-production-b52f.up.railway.app/api/v1/videos/ffmpeg-callback"
-            }
+                "SQS_BULK_QUEUE_URL": self.bulk_queue.queue_url,
+                "WEBHOOK_URL": "https://web-production-b52f.up.railway.app/api/v1/videos/ffmpeg-callback",
+                "METRICS_PORT": "9100",
+                "BACKLOG_METRICS_NAMESPACE": WORKER_METRICS_NAMESPACE
+            },
+            # Prometheus /metrics du worker (worker_metrics.py)
+            port_mappings=[ecs.PortMapping(container_port=9100)]
         )
 
     def create_ecs_service(self):
@@ -235,33 +322,81 @@ class VideoProcessingStack(Stack):
         )
 
     def setup_autoscaling(self):
-        """Configurer autoscaling basé sur SQS"""
-
-        # Enable autoscaling
-        scaling = self.service.auto_scale_task_count(
+        """
+        Target tracking sur la charge par tâche (backlog_per_task_expression).
+
+        Entrées : messages visibles (SQS), jobs en cours / durée moyenne /
+        attente en file publiés par les workers, tâches en cours (Container
+        Insights). Remplace les paliers sur ApproximateNumberOfMessagesVisible
+        qui ignoraient les jobs en cours et leur durée.
+        infrastructure/scaling_simulator.py rejoue des traces d'arrivée
+        contre cette politique.
+        """
+        self.scalable_target = appscaling.ScalableTarget(
+            self,
+            "WorkerScalableTarget",
+            service_namespace=appscaling.ServiceNamespace.ECS,
+            resource_id=f"service/{self.cluster.cluster_name}/{self.service.service_name}",
+            scalable_dimension="ecs:service:DesiredCount",
             min_capacity=self.warm_pool_size,
             max_capacity=self.max_workers
         )
 
-        # Scale sur nombre de messages SQS
-        # Formule: desired_workers = warm_pool + ceil(messages / target_messages_per_worker)
-        scaling.scale_on_metric(
-            "SQSScaling",
-            metric=self.queue.metric_approximate_number_of_messages_visible(),
-            scaling_steps=[
-                appscaling.ScalingInterval(upper=0, change=-1),  # Scale down si queue vide
-                appscaling.ScalingInterval(lower=1, change=+1),  # +1 worker par message
-                appscaling.ScalingInterval(lower=10, change=+5), # +5 workers si >10 messages
-                appscaling.ScalingInterval(lower=30, change=+10) # +10 workers si >30 messages
-            ],
-            cooldown=Duration.seconds(30),  # Attendre 30s avant nouveau scale out
-            adjustment_type=appscaling.AdjustmentType.CHANGE_IN_CAPACITY
+        def metric_stat(metric_id: str, namespace: str, metric_name: str, stat: str, dimensions=None):
+            return appscaling.CfnScalingPolicy.TargetTrackingMetricDataQueryProperty(
+                id=metric_id,
+                return_data=False,
+                metric_stat=appscaling.CfnScalingPolicy.TargetTrackingMetricStatProperty(
+                    metric=appscaling.CfnScalingPolicy.TargetTrackingMetricProperty(
+                        namespace=namespace,
+                        metric_name=metric_name,
+                        dimensions=[
+                            appscaling.CfnScalingPolicy.TargetTrackingMetricDimensionProperty(name=name, value=value)
+                            for name, value in (dimensions or {}).items()
+                        ]
+                    ),
+                    stat=stat
+                )
+            )
+
+        appscaling.CfnScalingPolicy(
+            self,
+            "BacklogPerTaskScaling",
+            policy_name="hospup-backlog-per-task",
+            policy_type="TargetTrackingScaling",
+            scaling_target_id=self.scalable_target.scalable_target_id,
+            target_tracking_scaling_policy_configuration=appscaling.CfnScalingPolicy.TargetTrackingScalingPolicyConfigurationProperty(
+                target_value=self.scaling_target_load,
+                scale_out_cooldown=60,
+                scale_in_cooldown=300,
+                customized_metric_specification=appscaling.CfnScalingPolicy.CustomizedMetricSpecificationProperty(
+                    metrics=[
+                        metric_stat("visible", "AWS/SQS", "ApproximateNumberOfMessagesVisible", "Average",
+                                    {"QueueName": self.queue.queue_name}),
+                        metric_stat("bulk", "AWS/SQS", "ApproximateNumberOfMessagesVisible", "Average",
+                                    {"QueueName": self.bulk_queue.queue_name}),
+                        metric_stat("inflight", WORKER_METRICS_NAMESPACE, "InFlightJobs", "Average"),
+                        metric_stat("proc", WORKER_METRICS_NAMESPACE, "ProcessingTimeAvg", "Average"),
+                        metric_stat("wait", WORKER_METRICS_NAMESPACE, "QueueWaitSeconds", "Maximum"),
+                        metric_stat("tasks", "ECS/ContainerInsights", "RunningTaskCount", "Average",
+                                    {"ClusterName": self.cluster.cluster_name,
+                                     "ServiceName": self.service.service_name}),
+                        appscaling.CfnScalingPolicy.TargetTrackingMetricDataQueryProperty(
+                            id="load",
+                            label="Backlog per task",
+                            expression=backlog_per_task_expression(self.queue_wait_target_seconds),
+                            return_data=True
+                        )
+                    ]
+                )
+            )
         )
 
         # Scale sur CPU (backup)
-        scaling.scale_on_cpu_utilization(
+        self.scalable_target.scale_to_track_metric(
             "CPUScaling",
-            target_utilization_percent=70,
+            target_value=70,
+            predefined_metric=appscaling.PredefinedMetric.ECS_SERVICE_AVERAGE_CPU_UTILIZATION,
             scale_in_cooldown=Duration.minutes(5),
             scale_out_cooldown=Duration.seconds(30)
         )
@@ -280,6 +415,7 @@ class VideoProcessingStack(Stack):
                 title="SQS Queue Depth",
                 left=[
                     self.queue.metric_approximate_number_of_messages_visible(),
+                    self.bulk_queue.metric_approximate_number_of_messages_visible(label="Bulk visible"),
                     self.queue.metric_number_of_messages_received(),
                     self.queue.metric_number_of_messages_deleted()
                 ]
@@ -291,6 +427,49 @@ class VideoProcessingStack(Stack):
                 ]
             )
         )
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title=f"Backlog per task (cible {self.scaling_target_load})",
+                left=[
+                    cloudwatch.MathExpression(
+                        expression=backlog_per_task_expression(self.queue_wait_target_seconds),
+                        using_metrics={
+                            "visible": self.queue.metric_approximate_number_of_messages_visible(),
+                            "bulk": self.bulk_queue.metric_approximate_number_of_messages_visible(),
+                            "inflight": self._worker_metric("InFlightJobs", "Average"),
+                            "proc": self._worker_metric("ProcessingTimeAvg", "Average"),
+                            "wait": self._worker_metric("QueueWaitSeconds", "Maximum"),
+                            "tasks": cloudwatch.Metric(
+                                namespace="ECS/ContainerInsights",
+                                metric_name="RunningTaskCount",
+                                dimensions_map={
+                                    "ClusterName": self.cluster.cluster_name,
+                                    "ServiceName": self.service.service_name
+                                },
+                                statistic="Average"
+                            )
+                        },
+                        label="Backlog per task",
+                        period=Duration.minutes(1)
+                    )
+                ]
+            ),
+            cloudwatch.GraphWidget(
+                title="Worker queue wait / processing time (s)",
+                left=[
+                    self._worker_metric("QueueWaitSeconds", "Maximum"),
+                    self._worker_metric("ProcessingTimeAvg", "Average")
+                ]
+            )
+        )
+
+    def _worker_metric(self, metric_name: str, statistic: str) -> cloudwatch.Metric:
+        return cloudwatch.Metric(
+            namespace=WORKER_METRICS_NAMESPACE,
+            metric_name=metric_name,
+            statistic=statistic,
+            period=Duration.minutes(1)
+        )
 
     def create_outputs(self):
         """Créer CloudFormation outputs"""
@@ -319,6 +498,22 @@ class VideoProcessingStack(Stack):
             export_name="HospupSQSQueueARN"
         )
 
+        CfnOutput(
+            self,
+            "SQSBulkQueueURL",
+            value=self.bulk_queue.queue_url,
+            description="SQS Queue URL des rendus bulk (SQS_BULK_QUEUE_URL, Lambda mediaconvert-callback)",
+            export_name="HospupSQSBulkQueueURL"
+        )
+
+        CfnOutput(
+            self,
+            "IngestQueueURL",
+            value=self.ingest_queue.queue_url,
+            description="SQS Queue URL des notifications d'upload (INGEST_QUEUE_URL)",
+            export_name="HospupIngestQueueURL"
+        )
+
         CfnOutput(
             self,
             "ECSClusterName",
@@ -0,0 +1,29 @@
+-- Add keyset pagination indexes
+-- Purpose: List endpoints page on (created_at, id) / (updated_at, id) with a
+--          `(sort, id) < (:sort, :id)` cursor; these indexes make every page
+--          a single range scan regardless of library size
+-- Created: 2026-10-18
+
+-- Assets library (GET /assets, with and without ?property_id=)
+CREATE INDEX IF NOT EXISTS ix_assets_user_property_created
+    ON assets(user_id, property_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_assets_user_created
+    ON assets(user_id, created_at DESC, id DESC);
+
+-- Generated videos (GET /videos/)
+CREATE INDEX IF NOT EXISTS ix_videos_user_created
+    ON videos(user_id, created_at DESC, id DESC);
+
+-- Composition projects (GET /projects/list/{property_id}), most recently edited first
+CREATE INDEX IF NOT EXISTS ix_videos_user_property_source_updated
+    ON videos(user_id, property_id, source_type, updated_at DESC, id DESC);
+
+-- Presets (GET /presets/)
+CREATE INDEX IF NOT EXISTS ix_presets_user_created
+    ON presets(user_id, created_at DESC, id DESC);
+
+COMMENT ON INDEX ix_assets_user_property_created IS 'Keyset pagination of a property asset library';
+COMMENT ON INDEX ix_assets_user_created IS 'Keyset pagination of all user assets';
+COMMENT ON INDEX ix_videos_user_created IS 'Keyset pagination of generated videos';
+COMMENT ON INDEX ix_videos_user_property_source_updated IS 'Keyset pagination of composition projects (recently edited first)';
+COMMENT ON INDEX ix_presets_user_created IS 'Keyset pagination of presets';
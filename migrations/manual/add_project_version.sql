@@ -0,0 +1,9 @@
+-- Add project version for optimistic concurrency
+-- Purpose: PATCH /projects/{id} applies JSON Patch operations with
+--          `UPDATE ... WHERE version = :v` and answers 409 when another
+--          save got there first; every save/patch bumps the version
+-- Created: 2026-10-18
+
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+COMMENT ON COLUMN videos.version IS 'Project version, bumped on every save/patch (optimistic concurrency)';
@@ -0,0 +1,15 @@
+-- Add trace id and stage timeline to render_jobs
+-- Purpose: every pipeline component (API, hospup-video-generator, MediaConvert,
+--          mediaconvert-callback, ECS FFmpeg worker) shares one W3C trace id
+--          and reports its stage timings in callbacks; the timeline shows
+--          where a render's time goes (GET /video-generation/jobs/{job_id}/timeline)
+-- Created: 2026-10-18
+
+ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS trace_id VARCHAR(32);
+ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS stage_timeline JSONB NOT NULL DEFAULT '[]'::jsonb;
+
+-- Look up a render from a trace found in the span exports
+CREATE INDEX IF NOT EXISTS ix_render_jobs_trace_id ON render_jobs(trace_id) WHERE trace_id IS NOT NULL;
+
+COMMENT ON COLUMN render_jobs.trace_id IS 'W3C trace id propagated through Lambda payload, MediaConvert UserMetadata, SQS and callbacks';
+COMMENT ON COLUMN render_jobs.stage_timeline IS 'Stage timings reported by pipeline components: [{stage, source, start, duration_ms}]';
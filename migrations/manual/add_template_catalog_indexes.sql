@@ -0,0 +1,17 @@
+-- Add template catalog indexes
+-- Purpose: The catalog cache is rebuilt with `ORDER BY views DESC, id`; the
+--          fingerprint check reads max(updated_at). Country / property type
+--          filters run on the in-memory catalog, so they need no index.
+-- Created: 2026-10-18
+
+CREATE INDEX IF NOT EXISTS ix_templates_views
+    ON templates(views DESC, id);
+CREATE INDEX IF NOT EXISTS ix_templates_updated_at
+    ON templates(updated_at);
+
+-- Expression indexes of an earlier version of this script (no query used them)
+DROP INDEX IF EXISTS ix_templates_country_views;
+DROP INDEX IF EXISTS ix_templates_property_type_views;
+
+COMMENT ON INDEX ix_templates_views IS 'Template catalog build order (most viewed first)';
+COMMENT ON INDEX ix_templates_updated_at IS 'Catalog change detection (max(updated_at))';
@@ -0,0 +1,38 @@
+-- Compact project contentVideos to asset references
+-- Purpose: projects stored full copies of assets in project_data.contentVideos
+--          (URLs, thumbnails, descriptions). Entries whose asset still exists
+--          are reduced to the asset id plus per-project overrides; the API
+--          hydrates them from `assets` when a project is opened
+--          (app/services/project_content.py). Entries without a matching
+--          asset are left untouched.
+-- Created: 2026-10-18
+
+UPDATE videos v
+SET project_data = jsonb_set(v.project_data, '{contentVideos}', compacted.content, false)
+FROM (
+    SELECT
+        v2.id,
+        jsonb_agg(
+            CASE
+                WHEN a.id IS NOT NULL THEN
+                    elem.value - ARRAY[
+                        'title', 'description', 'file_url', 'video_url', 'thumbnail_url',
+                        'duration', 'file_size', 'status', 'asset_type', 'property_id',
+                        'user_id', 'created_at', 'updated_at'
+                    ]::text[]
+                ELSE elem.value
+            END
+            ORDER BY elem.ordinality
+        ) AS content
+    FROM videos v2
+    CROSS JOIN LATERAL jsonb_array_elements(v2.project_data -> 'contentVideos') WITH ORDINALITY AS elem(value, ordinality)
+    LEFT JOIN assets a
+        ON jsonb_typeof(elem.value) = 'object'
+        AND a.id = elem.value ->> 'id'
+        AND a.user_id = v2.user_id
+    WHERE jsonb_typeof(v2.project_data -> 'contentVideos') = 'array'
+      AND jsonb_array_length(v2.project_data -> 'contentVideos') > 0
+    GROUP BY v2.id
+) AS compacted
+WHERE v.id = compacted.id
+  AND v.project_data -> 'contentVideos' IS DISTINCT FROM compacted.content;
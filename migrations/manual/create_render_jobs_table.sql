@@ -0,0 +1,58 @@
+-- Create render_jobs table
+-- Purpose: Track each video render (Lambda → MediaConvert → ECS FFmpeg) by job id,
+--          replacing `videos.description LIKE '%job_id%'` lookups
+-- Created: 2026-10-18
+
+CREATE TABLE IF NOT EXISTS render_jobs (
+    id SERIAL PRIMARY KEY,
+    job_id VARCHAR(36) NOT NULL,
+    video_id VARCHAR NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    mediaconvert_job_id VARCHAR(100),
+    ecs_message_id VARCHAR(100),
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    property_id INTEGER,
+    generation_method VARCHAR(50),
+    status VARCHAR(30) NOT NULL DEFAULT 'queued',
+    error_message TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    submitted_at TIMESTAMP,
+    mediaconvert_started_at TIMESTAMP,
+    post_processing_started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    failed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Lookups by job id / MediaConvert id are unique index hits
+CREATE UNIQUE INDEX IF NOT EXISTS uq_render_jobs_job_id ON render_jobs(job_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_render_jobs_mediaconvert_job_id ON render_jobs(mediaconvert_job_id);
+CREATE INDEX IF NOT EXISTS ix_render_jobs_video_id ON render_jobs(video_id);
+
+-- Backfill jobs whose id was embedded in the video description
+-- ("... [JOB:<uuid>]" and "Optimized: MediaConvert + ECS job <uuid>")
+INSERT INTO render_jobs (job_id, video_id, user_id, property_id, status, created_at, completed_at, failed_at, updated_at)
+SELECT
+    COALESCE(
+        substring(v.description FROM '\[JOB:([0-9a-fA-F-]{36})\]'),
+        substring(v.description FROM 'ECS job ([0-9a-fA-F-]{36})')
+    ) AS job_id,
+    v.id,
+    v.user_id,
+    v.property_id,
+    CASE v.status
+        WHEN 'completed' THEN 'completed'
+        WHEN 'failed' THEN 'failed'
+        ELSE 'submitted'
+    END,
+    COALESCE(v.created_at, NOW()),
+    CASE WHEN v.status = 'completed' THEN v.updated_at END,
+    CASE WHEN v.status = 'failed' THEN v.updated_at END,
+    v.updated_at
+FROM videos v
+WHERE v.description ~ '(\[JOB:|ECS job )[0-9a-fA-F-]{36}'
+ON CONFLICT (job_id) DO NOTHING;
+
+-- Add comments
+COMMENT ON TABLE render_jobs IS 'One row per video render job; callbacks and status polls key on job_id / mediaconvert_job_id';
+COMMENT ON COLUMN render_jobs.status IS 'queued → submitted → mediaconvert → post_processing → completed | failed';
+COMMENT ON COLUMN render_jobs.ecs_message_id IS 'SQS message id of the ECS FFmpeg post-processing job';
@@ -0,0 +1,23 @@
+-- Create video_quota_usage table
+-- Purpose: Monthly video quota counters. Redis holds the hot counters
+--          (video_quota:{user_id}:{YYYY-MM}); this table mirrors them and is
+--          the hard limit checked in the render submission transaction.
+--          render_jobs.quota_period records which month a render was charged
+--          to so a failed render is refunded exactly once.
+-- Created: 2026-10-18
+
+CREATE TABLE IF NOT EXISTS video_quota_usage (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    period VARCHAR(7) NOT NULL,
+    used INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT pk_video_quota_usage PRIMARY KEY (user_id, period)
+);
+
+ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS quota_period VARCHAR(7);
+
+-- Reconciliation counts charged render jobs of the current month per user
+CREATE INDEX IF NOT EXISTS ix_render_jobs_quota_period_user ON render_jobs(quota_period, user_id);
+
+COMMENT ON TABLE video_quota_usage IS 'Videos charged per user and UTC month (mirror of the Redis quota counters)';
+COMMENT ON COLUMN render_jobs.quota_period IS 'Month charged to the user video quota; cleared when a failed render is refunded';
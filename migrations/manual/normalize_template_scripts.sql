@@ -0,0 +1,127 @@
+-- Normalize template scripts
+-- Purpose: Store templates.script as a validated JSONB object instead of JSON
+--          text (sometimes prefixed with '=' by Airtable exports), and keep
+--          slot count, total duration and ordered slot descriptors in columns
+--          derived on every write, so requests stop re-parsing scripts and
+--          templates can be filtered by slots / duration in SQL
+-- Created: 2026-10-18
+
+-- 1. Parse the text scripts. Anything that is not JSON is kept in
+--    script_invalid for manual review and the script is set to NULL.
+CREATE OR REPLACE FUNCTION pg_temp.try_parse_script(value TEXT) RETURNS JSONB AS $$
+DECLARE
+    parsed JSONB;
+BEGIN
+    IF value IS NULL OR btrim(regexp_replace(value, '^[\s=]+', '')) = '' THEN
+        RETURN NULL;
+    END IF;
+    parsed := regexp_replace(value, '^[\s=]+', '')::jsonb;
+    -- Bare clip lists become {"clips": [...]}
+    IF jsonb_typeof(parsed) = 'array' THEN
+        RETURN jsonb_build_object('clips', parsed);
+    END IF;
+    IF jsonb_typeof(parsed) = 'object' THEN
+        RETURN parsed;
+    END IF;
+    RETURN NULL;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+ALTER TABLE templates ADD COLUMN IF NOT EXISTS script_invalid TEXT;
+
+UPDATE templates
+SET script_invalid = script
+WHERE script IS NOT NULL
+  AND btrim(regexp_replace(script, '^[\s=]+', '')) <> ''
+  AND pg_temp.try_parse_script(script) IS NULL;
+
+ALTER TABLE templates
+    ALTER COLUMN script TYPE JSONB USING pg_temp.try_parse_script(script);
+
+ALTER TABLE templates DROP CONSTRAINT IF EXISTS ck_templates_script_object;
+ALTER TABLE templates ADD CONSTRAINT ck_templates_script_object
+    CHECK (script IS NULL OR jsonb_typeof(script) = 'object');
+
+-- 2. Derived columns (slots already exists and becomes derived)
+ALTER TABLE templates ADD COLUMN IF NOT EXISTS total_duration NUMERIC(8, 2);
+ALTER TABLE templates ADD COLUMN IF NOT EXISTS slot_descriptors JSONB NOT NULL DEFAULT '[]'::jsonb;
+
+-- Numbers or numeric strings, NULL otherwise
+CREATE OR REPLACE FUNCTION templates_clip_number(value JSONB) RETURNS NUMERIC AS $$
+    SELECT CASE
+        WHEN jsonb_typeof(value) = 'number' THEN (value #>> '{}')::numeric
+        WHEN jsonb_typeof(value) = 'string' AND (value #>> '{}') ~ '^\s*-?\d+(\.\d+)?\s*$'
+            THEN btrim(value #>> '{}')::numeric
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Mirrors app.models.template.build_slot_descriptors(); keep both in sync
+CREATE OR REPLACE FUNCTION templates_derive_script_columns() RETURNS TRIGGER AS $$
+BEGIN
+    SELECT
+        COALESCE(jsonb_agg(jsonb_build_object(
+            'id', 'slot_' || (s.ord - 1),
+            'order', COALESCE(NULLIF(s.clip -> 'order', 'null'::jsonb), to_jsonb(s.ord)),
+            'duration', s.duration,
+            'description', COALESCE(NULLIF(s.clip -> 'description', 'null'::jsonb), to_jsonb('Slot ' || s.ord)),
+            'start_time', s.start_time,
+            'end_time', COALESCE(s.end_time, s.start_time + s.duration)
+        ) ORDER BY s.ord), '[]'::jsonb),
+        count(*),
+        round(sum(s.duration), 2)
+    INTO NEW.slot_descriptors, NEW.slots, NEW.total_duration
+    FROM (
+        SELECT
+            c.clip,
+            c.ord,
+            t.start_time,
+            t.end_time,
+            COALESCE(
+                templates_clip_number(c.clip -> 'duration'),
+                CASE WHEN t.end_time > t.start_time THEN t.end_time - t.start_time END,
+                3
+            )::float8 AS duration
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(NEW.script -> 'clips') = 'array' THEN NEW.script -> 'clips' ELSE '[]'::jsonb END
+        ) WITH ORDINALITY AS c(clip, ord)
+        CROSS JOIN LATERAL (
+            SELECT
+                COALESCE(
+                    templates_clip_number(c.clip -> 'start_time'),
+                    templates_clip_number(c.clip -> 'start'),
+                    0
+                )::float8 AS start_time,
+                COALESCE(
+                    templates_clip_number(c.clip -> 'end_time'),
+                    templates_clip_number(c.clip -> 'end')
+                )::float8 AS end_time
+        ) t
+        WHERE jsonb_typeof(c.clip) = 'object'
+    ) s;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_templates_derive_script_columns ON templates;
+CREATE TRIGGER trg_templates_derive_script_columns
+    BEFORE INSERT OR UPDATE OF script ON templates
+    FOR EACH ROW EXECUTE FUNCTION templates_derive_script_columns();
+
+-- 3. Backfill (fires the trigger on every row)
+UPDATE templates SET script = script;
+
+-- 4. Filters by slot count and duration
+CREATE INDEX IF NOT EXISTS ix_templates_slots_duration
+    ON templates(slots, total_duration);
+
+COMMENT ON COLUMN templates.script IS 'Template script as a JSON object ({"clips": [...], "texts": [...]})';
+COMMENT ON COLUMN templates.script_invalid IS 'Original script text that could not be parsed during normalization';
+COMMENT ON COLUMN templates.slots IS 'Number of slots in script (derived by trg_templates_derive_script_columns)';
+COMMENT ON COLUMN templates.total_duration IS 'Sum of slot durations in seconds (derived)';
+COMMENT ON COLUMN templates.slot_descriptors IS 'Ordered slots {id, order, duration, description, start_time, end_time} (derived)';
+COMMENT ON INDEX ix_templates_slots_duration IS 'Filter templates by slot count and duration';
+
+-- Verification: scripts that could not be parsed
+-- SELECT id, hotel_name, left(script_invalid, 80) FROM templates WHERE script_invalid IS NOT NULL;
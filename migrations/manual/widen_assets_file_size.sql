@@ -0,0 +1,8 @@
+-- Widen assets.file_size to BIGINT
+-- Purpose: Multipart uploads and S3 ingest notifications can report files
+--          larger than 2GB, which overflow INTEGER
+-- Created: 2026-10-18
+
+ALTER TABLE assets ALTER COLUMN file_size TYPE BIGINT;
+
+COMMENT ON COLUMN assets.file_size IS 'File size in bytes (BIGINT: uploads can exceed 2GB)';
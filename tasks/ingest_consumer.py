@@ -0,0 +1,260 @@
+"""
+Upload ingest consumer
+
+Long-polls the ingest queue fed by S3 ObjectCreated notifications, upserts
+the Asset row of every uploaded video and runs the analysis pipeline
+(process_uploaded_video) on a bounded thread pool. A message is deleted once
+its uploads are ingested and their analysis has finished; if the consumer
+dies first, SQS redelivers it and the stale `processing` claim is retaken.
+
+With FAIR_SCHEDULING_ENABLED, uploads are queued per user in Redis (deficit
+round-robin, app/services/fair_scheduler.py) and the message is deleted once
+they are queued. A dispatcher thread starts analyses in fair order whenever
+a slot is free, at most FAIR_SCHEDULER_TENANT_MAX_INGEST per user across
+consumers unless nobody else is waiting, so one big upload batch no longer
+holds every slot.
+
+Usage:
+    python -m tasks.ingest_consumer                      # consume INGEST_QUEUE_URL
+    python -m tasks.ingest_consumer --replay events/     # local stand-in: replay notification JSON
+    python -m tasks.ingest_consumer --replay - < event.json
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict
+from typing import Iterator, List
+
+import redis
+import structlog
+
+from app.core.config import settings
+from app.core.database import SyncSessionLocal
+from app.infrastructure.aws.clients import get_aws_clients
+from app.services.fair_scheduler import FairLease, SyncFairScheduler
+from app.services.ingest import (
+    UploadEvent,
+    claim_event,
+    ingest_event,
+    parse_notification,
+    record_upload,
+    upload_cost
+)
+
+logger = structlog.get_logger(__name__)
+
+_stop = threading.Event()
+
+FAIR_IDLE_POLL_SECONDS = 1.0
+
+# Backoff after a failed SQS call, doubled up to the max while errors persist
+SQS_ERROR_BACKOFF_SECONDS = 1.0
+SQS_ERROR_BACKOFF_MAX_SECONDS = 60.0
+
+
+def run_analysis(event: UploadEvent) -> None:
+    """Analysis pipeline for one asset (marks the asset failed itself on error)"""
+    from tasks.video_processing_tasks import process_uploaded_video
+
+    try:
+        process_uploaded_video(event.asset_id, event.s3_key)
+    except Exception as e:
+        logger.error(f"❌ Analysis failed for asset {event.asset_id}: {e}")
+
+
+def handle_body(body, executor: ThreadPoolExecutor) -> list:
+    """Ingest every upload in a notification; returns the analysis futures"""
+    futures = []
+    for event in parse_notification(body):
+        db = SyncSessionLocal()
+        try:
+            if ingest_event(db, event):
+                futures.append(executor.submit(run_analysis, event))
+        finally:
+            db.close()
+    return futures
+
+
+def build_ingest_scheduler() -> SyncFairScheduler:
+    return SyncFairScheduler(
+        redis.Redis.from_url(settings.REDIS_URL, decode_responses=True),
+        "fair:ingest",
+        quantum=settings.FAIR_SCHEDULER_QUANTUM,
+        tenant_cap=settings.FAIR_SCHEDULER_TENANT_MAX_INGEST,
+        global_cap=0,  # Bounded by each consumer's slots
+        lease_ttl_seconds=settings.FAIR_SCHEDULER_INGEST_LEASE_SECONDS
+    )
+
+
+def enqueue_body(body, scheduler: SyncFairScheduler) -> int:
+    """Record every upload in a notification and queue it under its user; returns the count queued"""
+    queued = 0
+    for event in parse_notification(body):
+        db = SyncSessionLocal()
+        try:
+            if not record_upload(db, event):
+                continue
+        finally:
+            db.close()
+        scheduler.enqueue(str(event.user_id), asdict(event), cost=upload_cost(event))
+        queued += 1
+    return queued
+
+
+def run_scheduled_analysis(scheduler: SyncFairScheduler, lease: FairLease, slots: threading.Semaphore) -> None:
+    """Claim and analyse one scheduled upload, then give its slot back"""
+    event = UploadEvent(**lease.payload)
+    try:
+        db = SyncSessionLocal()
+        try:
+            claimed = claim_event(db, event)
+        finally:
+            db.close()
+        if claimed:
+            logger.info(f"⚖️ Analysing asset {event.asset_id} for user {lease.tenant}")
+            run_analysis(event)
+    except Exception as e:
+        logger.error(f"❌ Scheduled ingest failed for asset {event.asset_id}: {e}")
+    finally:
+        try:
+            scheduler.release(lease.lease_id)
+        except Exception as e:
+            # The lease expires after FAIR_SCHEDULER_INGEST_LEASE_SECONDS (the requeued upload then fails its claim)
+            logger.warning(f"⚠️ Failed to release ingest lease {lease.lease_id}: {e}")
+        slots.release()
+
+
+def dispatch_scheduled(scheduler: SyncFairScheduler, executor: ThreadPoolExecutor, concurrency: int) -> None:
+    """Dispatcher thread: start analyses in fair order while this consumer has free slots"""
+    slots = threading.Semaphore(concurrency)
+    while not _stop.is_set():
+        if not slots.acquire(timeout=FAIR_IDLE_POLL_SECONDS):
+            continue
+        try:
+            lease = scheduler.dequeue()
+        except Exception as e:
+            logger.error(f"❌ Fair scheduler dequeue failed: {e}")
+            lease = None
+        if lease is None:
+            slots.release()
+            _stop.wait(FAIR_IDLE_POLL_SECONDS)
+            continue
+        executor.submit(run_scheduled_analysis, scheduler, lease, slots)
+
+
+def delete_message(sqs, queue_url: str, message: dict) -> None:
+    """Delete a handled message; failures are logged, not raised"""
+    try:
+        sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=message['ReceiptHandle'])
+    except Exception as e:
+        # Redelivered after the visibility timeout; the asset claim skips finished uploads
+        logger.error(f"❌ Failed to delete message {message.get('MessageId')}: {e}")
+
+
+def consume(queue_url: str, concurrency: int) -> None:
+    sqs = get_aws_clients().client('sqs')
+    logger.info(f"📡 Ingest consumer polling {queue_url} (concurrency {concurrency})")
+
+    scheduler = build_ingest_scheduler() if settings.FAIR_SCHEDULING_ENABLED else None
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as executor:
+        if scheduler:
+            dispatcher = threading.Thread(
+                target=dispatch_scheduled,
+                args=(scheduler, executor, concurrency),
+                name="ingest-dispatch",
+                daemon=True
+            )
+            dispatcher.start()
+
+        backoff = SQS_ERROR_BACKOFF_SECONDS
+        while not _stop.is_set():
+            try:
+                response = sqs.receive_message(
+                    QueueUrl=queue_url,
+                    MaxNumberOfMessages=min(concurrency, 10),
+                    WaitTimeSeconds=20,
+                    VisibilityTimeout=settings.INGEST_VISIBILITY_TIMEOUT_SECONDS
+                )
+                backoff = SQS_ERROR_BACKOFF_SECONDS
+            except Exception as e:
+                # Transient SQS / network errors must not stop ingest
+                logger.error(f"❌ Failed to poll {queue_url}, retrying in {backoff:.0f}s: {e}")
+                _stop.wait(backoff)
+                backoff = min(backoff * 2, SQS_ERROR_BACKOFF_MAX_SECONDS)
+                continue
+
+            pending = []
+            for message in response.get('Messages', []):
+                try:
+                    if scheduler:
+                        # Queued in Redis: the fair scheduler now owns the uploads (requeued if a lease expires)
+                        enqueue_body(message['Body'], scheduler)
+                        delete_message(sqs, queue_url, message)
+                        continue
+                    pending.append((message, handle_body(message['Body'], executor)))
+                except Exception as e:
+                    # Left on the queue: redelivered after the visibility timeout, then DLQ
+                    logger.error(f"❌ Failed to ingest message {message.get('MessageId')}: {e}")
+
+            for message, futures in pending:
+                wait(futures)
+                delete_message(sqs, queue_url, message)
+
+        if scheduler:
+            dispatcher.join()
+
+    logger.info("👋 Ingest consumer stopped")
+
+
+def _replay_sources(path: str) -> Iterator[str]:
+    if path == '-':
+        yield sys.stdin.read()
+    elif os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.json'):
+                with open(os.path.join(path, name)) as f:
+                    yield f.read()
+    else:
+        with open(path) as f:
+            yield f.read()
+
+
+def replay(path: str, concurrency: int) -> None:
+    """Feed notification JSON files through the same ingest path, without SQS"""
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as executor:
+        futures: List = []
+        for raw in _replay_sources(path):
+            data = json.loads(raw)
+            # A file may hold one notification or a list of them
+            for body in (data if isinstance(data, list) else [data]):
+                futures.extend(handle_body(body, executor))
+        wait(futures)
+    logger.info(f"✅ Replay finished: {len(futures)} assets dispatched for analysis")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hospup upload ingest consumer")
+    parser.add_argument('--replay', metavar='PATH', help="replay S3 notification JSON (file, directory or '-')")
+    parser.add_argument('--concurrency', type=int, default=settings.INGEST_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.replay, args.concurrency)
+        return
+
+    if not settings.INGEST_QUEUE_URL:
+        parser.error("INGEST_QUEUE_URL is not configured")
+
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
+    signal.signal(signal.SIGINT, lambda *_: _stop.set())
+    consume(settings.INGEST_QUEUE_URL, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
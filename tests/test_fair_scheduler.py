@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from app.services.fair_scheduler import SyncFairScheduler
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+def make_scheduler(tenant_cap: int = 0, global_cap: int = 0, lease_ttl_seconds: int = 60) -> SyncFairScheduler:
+    client = fakeredis.FakeRedis(decode_responses=True)
+    return SyncFairScheduler(client, "test", quantum=1, tenant_cap=tenant_cap, global_cap=global_cap,
+                             lease_ttl_seconds=lease_ttl_seconds)
+
+
+def drain(scheduler: SyncFairScheduler, release: bool = True):
+    order = []
+    while True:
+        lease = scheduler.dequeue()
+        if lease is None:
+            return order
+        order.append(lease.payload)
+        if release:
+            scheduler.release(lease.lease_id)
+
+
+def test_tenants_take_turns():
+    scheduler = make_scheduler()
+    for i in range(4):
+        scheduler.enqueue("a", f"a{i}")
+    for i in range(2):
+        scheduler.enqueue("b", f"b{i}")
+
+    assert drain(scheduler) == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+def test_costly_items_take_proportionally_more_turns():
+    scheduler = make_scheduler()
+    for i in range(2):
+        scheduler.enqueue("big", f"big{i}", cost=3)
+    for i in range(6):
+        scheduler.enqueue("small", f"small{i}")
+
+    order = drain(scheduler)
+    # Three small items run for every big one while both tenants wait
+    assert order.index("big1") > order.index("small3")
+    assert sorted(order) == sorted([f"big{i}" for i in range(2)] + [f"small{i}" for i in range(6)])
+
+
+def test_capped_tenant_waits_while_others_can_run():
+    scheduler = make_scheduler(tenant_cap=1)
+    for i in range(3):
+        scheduler.enqueue("a", f"a{i}")
+    scheduler.enqueue("b", "b0")
+
+    first = scheduler.dequeue()
+    second = scheduler.dequeue()
+    assert (first.payload, second.payload) == ("a0", "b0")
+
+    # Only the capped tenant has work left: the cap is soft
+    third = scheduler.dequeue()
+    assert third.payload == "a1"
+
+
+def test_global_cap_holds_until_a_lease_is_released():
+    scheduler = make_scheduler(global_cap=2)
+    for i in range(3):
+        scheduler.enqueue("a", f"a{i}")
+
+    first = scheduler.dequeue()
+    assert scheduler.dequeue().payload == "a1"
+    assert scheduler.dequeue() is None
+
+    assert scheduler.release(first.lease_id)
+    assert scheduler.dequeue().payload == "a2"
+
+
+def test_expired_lease_requeues_its_item(monkeypatch):
+    scheduler = make_scheduler(global_cap=1)
+    scheduler.enqueue("a", "a0")
+    scheduler.enqueue("a", "a1")
+
+    lost = scheduler.dequeue()
+    assert lost.payload == "a0"
+
+    later = time.time() + 120
+    monkeypatch.setattr("app.services.fair_scheduler.time.time", lambda: later)
+
+    # The slot is freed and the item runs again, ahead of its tenant's queue
+    retried = scheduler.dequeue()
+    assert retried.payload == "a0"
+    assert not scheduler.release(lost.lease_id)
+    assert scheduler.release(retried.lease_id)
+    assert drain(scheduler) == ["a1"]
+
+
+def test_released_item_is_not_requeued(monkeypatch):
+    scheduler = make_scheduler()
+    scheduler.enqueue("a", "a0")
+    lease = scheduler.dequeue()
+    assert scheduler.release(lease.lease_id)
+
+    later = time.time() + 120
+    monkeypatch.setattr("app.services.fair_scheduler.time.time", lambda: later)
+    assert scheduler.dequeue() is None
@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from tasks import ingest_consumer
+
+
+class FlakySQS:
+    """Fails the first receive, then stops the consumer"""
+
+    def __init__(self):
+        self.receives = 0
+
+    def receive_message(self, **kwargs):
+        self.receives += 1
+        if self.receives == 1:
+            raise ConnectionError("endpoint unreachable")
+        ingest_consumer._stop.set()
+        return {}
+
+
+@pytest.fixture
+def sqs(monkeypatch):
+    client = FlakySQS()
+    monkeypatch.setattr(ingest_consumer, "get_aws_clients", lambda: SimpleNamespace(client=lambda name: client))
+    monkeypatch.setattr(ingest_consumer, "SQS_ERROR_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "FAIR_SCHEDULING_ENABLED", False)
+    ingest_consumer._stop.clear()
+    yield client
+    ingest_consumer._stop.clear()
+
+
+def test_consumer_keeps_polling_after_an_sqs_error(sqs):
+    ingest_consumer.consume("https://sqs.test/ingest", concurrency=1)
+    assert sqs.receives == 2
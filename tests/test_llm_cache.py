@@ -0,0 +1,153 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_cache import LLMResponseCache
+
+
+def make_cache(lock_wait_seconds: float = 5.0) -> LLMResponseCache:
+    return LLMResponseCache(max_entries=10, ttl_seconds=60, temperature_bucket=0.1, lock_wait_seconds=lock_wait_seconds)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_computation():
+    cache = make_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "caption"
+
+    results = await asyncio.gather(*(cache.aget_or_compute("k", compute) for _ in range(5)))
+
+    assert results == ["caption"] * 5
+    assert calls == 1
+    assert cache.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_leader_cancellation_does_not_reach_followers():
+    cache = make_cache()
+    leader_started = asyncio.Event()
+
+    async def slow():
+        leader_started.set()
+        await asyncio.sleep(10)
+        return "never"
+
+    async def fast():
+        return "follower"
+
+    leader = asyncio.create_task(cache.aget_or_compute("k", slow))
+    await leader_started.wait()
+    follower = asyncio.create_task(cache.aget_or_compute("k", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "follower"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_follower_stops_waiting_after_lock_wait():
+    cache = make_cache(lock_wait_seconds=0.05)
+    release = asyncio.Event()
+
+    async def stuck():
+        await release.wait()
+        return "leader"
+
+    async def fast():
+        return "follower"
+
+    leader = asyncio.create_task(cache.aget_or_compute("k", stuck))
+    await asyncio.sleep(0)
+
+    assert await cache.aget_or_compute("k", fast) == "follower"
+    release.set()
+    assert await leader == "leader"
+
+
+def test_sync_follower_computes_when_leader_fails():
+    cache = make_cache(lock_wait_seconds=0.05)
+    entered = threading.Event()
+
+    def failing():
+        entered.set()
+        raise RuntimeError("openai down")
+
+    def leader():
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("k", failing)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    entered.wait()
+    assert cache.get_or_compute("k", lambda: "follower") == "follower"
+    thread.join()
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_stream_follower_gets_the_leader_caption_in_one_chunk():
+    cache = make_cache()
+    calls = 0
+
+    async def stream():
+        nonlocal calls
+        calls += 1
+        for word in ("Sunny ", "suite ", "#travel"):
+            await asyncio.sleep(0.01)
+            yield word
+
+    leader, follower = await asyncio.gather(
+        collect(cache.astream_or_compute("k", stream)),
+        collect(cache.astream_or_compute("k", stream)),
+    )
+
+    assert leader == ["Sunny ", "suite ", "#travel"]
+    assert follower == ["Sunny suite #travel"]
+    assert calls == 1
+    assert await cache.aget_or_compute("k", stream) == "Sunny suite #travel"
+
+
+@pytest.mark.asyncio
+async def test_stream_closed_early_is_not_cached_and_frees_followers():
+    cache = make_cache()
+
+    async def stream():
+        yield "partial"
+        await asyncio.sleep(10)
+        yield "never"
+
+    async def fast():
+        return "follower"
+
+    chunks = cache.astream_or_compute("k", stream)
+    assert await chunks.__anext__() == "partial"
+    follower = asyncio.create_task(cache.aget_or_compute("k", fast))
+    await asyncio.sleep(0)
+    await chunks.aclose()
+
+    assert await follower == "follower"
+    assert cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_bypasses_cache_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    cache = make_cache()
+
+    async def stream():
+        yield "fresh"
+
+    assert await collect(cache.astream_or_compute("k", stream)) == ["fresh"]
+    assert cache.get("k") is None
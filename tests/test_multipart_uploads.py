@@ -0,0 +1,23 @@
+from app.services.multipart_uploads import expected_part_size, mismatched_parts, missing_parts
+
+MB = 1024 * 1024
+SESSION = {"file_size": 25 * MB + 3, "part_size": 10 * MB, "part_count": 3}
+
+
+def test_last_part_holds_the_remainder():
+    assert expected_part_size(SESSION, 1) == 10 * MB
+    assert expected_part_size(SESSION, 2) == 10 * MB
+    assert expected_part_size(SESSION, 3) == 5 * MB + 3
+
+
+def test_parts_matching_the_declared_size_pass():
+    assert mismatched_parts(SESSION, {1: 10 * MB, 2: 10 * MB, 3: 5 * MB + 3}) == []
+
+
+def test_oversized_or_short_parts_are_reported():
+    sizes = {1: 10 * MB, 2: 5 * 1024 * MB, 3: 5 * MB}
+    assert mismatched_parts(SESSION, sizes) == [2, 3]
+
+
+def test_missing_parts_accepts_any_part_values():
+    assert missing_parts(SESSION, {1: ("etag", 10 * MB), 3: ("etag", 5 * MB + 3)}) == [2]
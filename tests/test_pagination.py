@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import PageParams, decode_cursor, encode_cursor, paginate, split_page
+
+items = Table(
+    "items", MetaData(),
+    Column("id", String, primary_key=True),
+    Column("created_at", DateTime, nullable=True),
+    Column("n", Integer),
+)
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 10, 1, 12, 30, 5, 123456)
+    cursor = encode_cursor(created_at, "video-1")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "video-1")
+
+
+def test_cursor_with_null_sort_value():
+    assert decode_cursor(encode_cursor(None, 42)) == (None, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(datetime(2025, 1, 1), None), "W10"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_split_page_builds_next_cursor_from_last_kept_row():
+    page = PageParams(limit=2, cursor=None)
+    rows = [(datetime(2025, 1, 3), "c"), (datetime(2025, 1, 2), "b"), (datetime(2025, 1, 1), "a")]
+
+    kept, next_cursor = split_page(rows, page, lambda row: row)
+
+    assert kept == rows[:2]
+    assert decode_cursor(next_cursor) == (datetime(2025, 1, 2), "b")
+
+
+def test_split_page_last_page_has_no_cursor():
+    page = PageParams(limit=2, cursor=None)
+    assert split_page([(None, "a")], page, lambda row: row) == ([(None, "a")], None)
+
+
+def test_paginate_orders_nulls_first_and_fetches_one_extra_row():
+    sql = compiled(paginate(select(items), items.c.created_at, items.c.id, PageParams(limit=10, cursor=None)))
+
+    assert "ORDER BY items.created_at DESC NULLS FIRST, items.id DESC" in sql
+    assert "LIMIT 11" in sql
+
+
+def test_paginate_after_dated_cursor_uses_row_comparison():
+    cursor = encode_cursor(datetime(2025, 1, 2), "b")
+    sql = compiled(paginate(select(items), items.c.created_at, items.c.id, PageParams(limit=10, cursor=cursor)))
+
+    assert "(items.created_at, items.id) < ('2025-01-02 00:00:00', 'b')" in sql
+
+
+def test_paginate_after_null_cursor_continues_into_dated_rows():
+    cursor = encode_cursor(None, "b")
+    sql = compiled(paginate(select(items), items.c.created_at, items.c.id, PageParams(limit=10, cursor=cursor)))
+
+    assert "items.created_at IS NULL AND items.id < 'b'" in sql
+    assert "items.created_at IS NOT NULL" in sql
@@ -0,0 +1,113 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Text, cast, create_engine, literal, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.services.project_patch import MAX_OPERATIONS, PatchError, compile_patch, parse_pointer
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def op(op, path, value=None):
+    return SimpleNamespace(op=op, path=path, value=value)
+
+
+def document(value) -> object:
+    return cast(literal(json.dumps(value), Text), JSONB)
+
+
+def test_parse_pointer_unescapes_tokens():
+    assert parse_pointer("/a~1b/m~0n/0") == ["a/b", "m~n", "0"]
+    assert parse_pointer("") == []
+
+
+@pytest.mark.parametrize("operations, message", [
+    ([op("replace", "")], "document root"),
+    ([op("add", "textOverlays")], "Invalid JSON pointer"),
+    ([op("move", "/a")], "Unsupported operation"),
+    ([op("test", "/a", 1)] * (MAX_OPERATIONS + 1), "Too many operations"),
+])
+def test_malformed_patches_are_rejected(operations, message):
+    with pytest.raises(PatchError, match=message):
+        compile_patch(document({}), operations)
+
+
+def test_touched_top_level_keys():
+    _, _, touched = compile_patch(document({}), [op("add", "/textOverlays/0", {}), op("remove", "/duration")])
+    assert touched == {"textOverlays", "duration"}
+
+
+def test_sql_grows_linearly_with_operations():
+    def sql_length(count):
+        patched, _, _ = compile_patch(document({"a": []}), [op("add", "/a/0", i) for i in range(count)])
+        return len(str(patched.compile(dialect=postgresql.dialect())))
+
+    assert sql_length(40) < 2.5 * sql_length(20)
+
+
+@pytest.fixture(scope="module")
+def apply_patch():
+    """Evaluate compiled patches in Postgres (set TEST_DATABASE_URL, e.g. a throwaway local server)"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(TEST_DATABASE_URL)
+
+    def run(doc, operations):
+        patched, conditions, _ = compile_patch(document(doc), operations)
+        with engine.connect() as conn:
+            value, ok = conn.execute(select(patched, *conditions)).one()
+        return value if ok else None
+
+    yield run
+    engine.dispose()
+
+
+@pytest.mark.parametrize("doc, operations, expected", [
+    # Objects
+    ({"a": 1}, [op("add", "/b", 2)], {"a": 1, "b": 2}),
+    ({"a": 1}, [op("replace", "/a", 3)], {"a": 3}),
+    ({"a": 1, "b": 2}, [op("remove", "/a")], {"b": 2}),
+    ({"a": {"x": 1}}, [op("test", "/a/x", 1), op("replace", "/a/x", 2)], {"a": {"x": 2}}),
+    # Arrays
+    ({"a": [1, 2]}, [op("add", "/a/0", 0)], {"a": [0, 1, 2]}),
+    ({"a": [1, 2]}, [op("add", "/a/2", 3)], {"a": [1, 2, 3]}),
+    ({"a": [1, 2]}, [op("add", "/a/-", 3)], {"a": [1, 2, 3]}),
+    ({"a": [1, 2]}, [op("replace", "/a/1", 5)], {"a": [1, 5]}),
+    ({"a": [1, 2]}, [op("remove", "/a/0")], {"a": [2]}),
+    ({"a": [{"t": "x"}]}, [op("replace", "/a/0/t", "y")], {"a": [{"t": "y"}]}),
+    # Later operations see the document left by earlier ones
+    ({"a": []}, [op("add", "/a/-", 1), op("test", "/a/0", 1), op("add", "/a/0", 0)], {"a": [0, 1]}),
+])
+def test_valid_patches(apply_patch, doc, operations, expected):
+    assert apply_patch(doc, operations) == expected
+
+
+@pytest.mark.parametrize("doc, operations", [
+    ({"a": 1}, [op("test", "/a", 2)]),
+    ({"a": 1}, [op("replace", "/missing", 1)]),
+    ({"a": 1}, [op("remove", "/missing")]),
+    ({"a": 1}, [op("add", "/missing/x", 1)]),
+    ({"a": "text"}, [op("add", "/a/x", 1)]),
+    # Array tokens that are not indexes never reach jsonb_set / jsonb_insert
+    ({"a": [1, 2]}, [op("add", "/a/x", 3)]),
+    ({"a": [1, 2]}, [op("replace", "/a/x", 3)]),
+    ({"a": [1, 2]}, [op("remove", "/a/x")]),
+    ({"a": [{"t": 1}]}, [op("replace", "/a/x/t", 3)]),
+    # Negative, leading-zero and past-the-end indexes
+    ({"a": [1, 2]}, [op("replace", "/a/-1", 3)]),
+    ({"a": [1, 2]}, [op("remove", "/a/-1")]),
+    ({"a": [1, 2]}, [op("test", "/a/-1", 2)]),
+    ({"a": [1, 2]}, [op("add", "/a/-1", 3)]),
+    ({"a": [1, 2]}, [op("replace", "/a/01", 3)]),
+    ({"a": [1, 2]}, [op("replace", "/a/2", 3)]),
+    ({"a": [1, 2]}, [op("add", "/a/3", 3)]),
+    ({"a": {"b": 1}}, [op("add", "/a/b/-", 3)]),
+    # A failed step fails the whole patch
+    ({"a": [1]}, [op("add", "/a/-", 2), op("test", "/a/5", 2), op("add", "/b", 1)]),
+])
+def test_failed_preconditions(apply_patch, doc, operations):
+    assert apply_patch(doc, operations) is None
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucketLimiter, client_ip
+
+
+def make_request(forwarded=None, peer="10.0.0.5") -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 443)})
+
+
+@pytest.fixture
+def proxy_hops(monkeypatch):
+    def set_hops(hops: int):
+        monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", hops)
+    return set_hops
+
+
+def test_spoofed_leftmost_entry_is_ignored(proxy_hops):
+    proxy_hops(1)
+    assert client_ip(make_request("1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+
+
+def test_entry_at_configured_hop_count(proxy_hops):
+    proxy_hops(2)
+    assert client_ip(make_request("1.2.3.4, 203.0.113.7, 10.1.1.1")) == "203.0.113.7"
+
+
+def test_falls_back_to_peer_address(proxy_hops):
+    proxy_hops(2)
+    assert client_ip(make_request("203.0.113.7")) == "10.0.0.5"
+    assert client_ip(make_request()) == "10.0.0.5"
+
+
+def test_header_ignored_without_trusted_proxy(proxy_hops):
+    proxy_hops(0)
+    assert client_ip(make_request("1.2.3.4")) == "10.0.0.5"
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr("app.core.rate_limit.get_redis", lambda: client)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_enforce_spends_cost_tokens(fake_redis):
+    limiter = TokenBucketLimiter("test", rate_per_minute=1, burst=10)
+    response = Response()
+
+    await limiter.enforce("user:1", response, cost=7)
+    assert response.headers["X-RateLimit-Remaining"] == "3"
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.enforce("user:1", cost=4)
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+    await limiter.enforce("user:1", cost=3)
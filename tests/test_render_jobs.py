@@ -0,0 +1,57 @@
+import os
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import Base
+from app.models.render_job import RenderJob
+from app.services.render_jobs import get_render_job, transition_render_job
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest_asyncio.fixture
+async def sessions():
+    """Two sessions on a throwaway schema (set TEST_DATABASE_URL, e.g. a throwaway local server)"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    engine = create_async_engine(
+        make_url(TEST_DATABASE_URL).set(drivername="postgresql+asyncpg"),
+        connect_args={"server_settings": {"search_path": schema, "session_replication_role": "replica"}}
+    )
+    async with engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as first, factory() as second:
+        yield first, second
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_for_update_reads_a_status_changed_by_another_session(sessions):
+    api, callback = sessions
+    created = RenderJob(job_id="job-1", video_id="video-1", status="queued", stage_timeline=[])
+    api.add(created)
+    await api.commit()
+
+    completed = await get_render_job(callback, "job-1", for_update=True)
+    assert transition_render_job(completed, "completed")
+    await callback.commit()
+
+    # The identity map still holds the row as the API session last saw it
+    assert (await get_render_job(api, "job-1")).status == "queued"
+    assert created.status == "queued"
+
+    render_job = await get_render_job(api, "job-1", for_update=True)
+    assert render_job.status == "completed"
+    assert not transition_render_job(render_job, "submitted")
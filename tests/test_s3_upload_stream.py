@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.storage.s3_service import S3StorageService
+from app.shared.exceptions import StorageError
+
+PART_SIZE = 4
+PARTS = 20
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = S3StorageService.__new__(S3StorageService)
+    service._bucket_name = "test-bucket"
+    service.aborted = []
+
+    def upload_part(PartNumber, **kwargs):
+        if PartNumber == 2:
+            raise StorageError("part 2 lost")
+        return {"ETag": f"etag-{PartNumber}"}
+
+    async def run(func, *args, timeout=None, **kwargs):
+        await asyncio.sleep(0)
+        return func(*args, **kwargs)
+
+    async def create_multipart_upload(key, content_type=None, metadata=None):
+        return "upload-1"
+
+    async def abort_multipart_upload(key, upload_id):
+        service.aborted.append(upload_id)
+        return True
+
+    monkeypatch.setattr(S3StorageService, "client", SimpleNamespace(upload_part=upload_part))
+    service._run = run
+    service.create_multipart_upload = create_multipart_upload
+    service.abort_multipart_upload = abort_multipart_upload
+    return service
+
+
+@pytest.mark.asyncio
+async def test_failed_part_stops_reading_the_body(service):
+    reads = 0
+
+    async def read(size):
+        nonlocal reads
+        reads += 1
+        return b"x" * size if reads <= PARTS else b""
+
+    with pytest.raises(StorageError, match="part 2 lost"):
+        await service.upload_stream("videos/a.mp4", read, part_size=PART_SIZE, max_concurrency=2)
+
+    assert service.aborted == ["upload-1"]
+    assert reads < PARTS
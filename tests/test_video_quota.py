@@ -0,0 +1,39 @@
+import pytest
+
+from app.services.video_quota import _REFUND_LUA, _RESERVE_LUA
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_reserve_asks_for_seeding_when_counter_is_missing(client):
+    reserve = client.register_script(_RESERVE_LUA)
+    assert reserve(keys=["video_quota:1:2026-10"], args=[3, 1]) == [-1, 0]
+    assert client.get("video_quota:1:2026-10") is None
+
+
+def test_reserve_stops_at_the_limit(client):
+    reserve = client.register_script(_RESERVE_LUA)
+    client.set("video_quota:1:2026-10", 1)
+
+    assert reserve(keys=["video_quota:1:2026-10"], args=[3, 1]) == [1, 2]
+    assert reserve(keys=["video_quota:1:2026-10"], args=[3, 1]) == [1, 3]
+    assert reserve(keys=["video_quota:1:2026-10"], args=[3, 1]) == [0, 3]
+    assert client.get("video_quota:1:2026-10") == "3"
+
+
+def test_refund_never_goes_below_zero_nor_recreates_the_counter(client):
+    refund = client.register_script(_REFUND_LUA)
+    client.set("video_quota:1:2026-10", 1)
+
+    assert refund(keys=["video_quota:1:2026-10"]) == 0
+    assert refund(keys=["video_quota:1:2026-10"]) == 0
+    assert client.get("video_quota:1:2026-10") == "0"
+
+    assert refund(keys=["video_quota:2:2026-10"]) == 0
+    assert client.get("video_quota:2:2026-10") is None